@@ -3,17 +3,209 @@ Alert Generation Engine
 Analyzes predictions and generates actionable alerts for farmers
 """
 
-import requests
+import numpy as np
 from pymongo import MongoClient
-from config import MONGO_URI, NODE_BACKEND_URL, PRICE_DROP_THRESHOLD, PRICE_SPIKE_THRESHOLD
+from config import MONGO_URI, PRICE_DROP_THRESHOLD, PRICE_SPIKE_THRESHOLD, DEFAULT_ALERT_CONFIDENCE
 from datetime import datetime
+from services.market_data_loader import MarketDataLoader
+from alert_engine.alert_outbox import AlertOutbox, OutboxDispatcher
+from alert_engine.alert_suppression import AlertSuppressor
+from alert_engine.subscription_index import SubscriptionIndex
 
 class AlertGenerator:
-    def __init__(self):
-        self.client = MongoClient(MONGO_URI)
-        self.db = self.client['test']
+    def __init__(self, db=None, users_db=None):
+        """
+        Args:
+            db: Open alerts database to reuse (default: connect to 'test')
+            users_db: Open database with the users collection for targeting
+                (default: the subscription index connects itself)
+        """
+        self.client = None
+        if db is None:
+            self.client = MongoClient(MONGO_URI)
+            db = self.client['test']
+        self.db = db
         self.prices_col = self.db['marketprices']
         self.alerts_col = self.db['alerts']
+        self.loader = MarketDataLoader(self.db)
+        self.series_prices = {}  # (commodity, state, market) -> (price, date)
+        self.commodity_prices = {}  # commodity -> latest (price, date) of any market
+        self.outbox = AlertOutbox(self.db)
+        self.suppressor = AlertSuppressor(self.db)
+        self.subscriptions = SubscriptionIndex(users_db)
+        self.dispatcher = None
+    
+    def load_current_prices(self, commodities):
+        """Fetch current prices of every series of the commodities in one aggregation"""
+        if not commodities:
+            return
+        prices = self.loader.current_prices(commodities)
+        self.series_prices.update(prices)
+        for commodity in commodities:
+            self.commodity_prices.setdefault(commodity, None)
+        for (commodity, _, _), current in prices.items():
+            latest = self.commodity_prices.get(commodity)
+            if latest is None or current[1] > latest[1]:
+                self.commodity_prices[commodity] = current
+    
+    def current_price(self, key):
+        """The series' own latest price, else the commodity's latest anywhere"""
+        current = self.series_prices.get(key)
+        if current is None:
+            current = self.commodity_prices.get(key[0])
+        return current[0] if current else None
+    
+    @staticmethod
+    def forecast_matrix(forecasts):
+        """
+        Forecast dicts as arrays
+        
+        Returns:
+            (keys, predicted prices (n_series, horizon), confidences), NaN
+            padded where a series has fewer days
+        """
+        keys = list(forecasts)
+        horizon = max((len(preds) for preds in forecasts.values()), default=0)
+        predicted = np.full((len(keys), horizon), np.nan)
+        confidence = np.full((len(keys), horizon), DEFAULT_ALERT_CONFIDENCE)
+        
+        for i, key in enumerate(keys):
+            preds = forecasts[key]
+            predicted[i, :len(preds)] = [pred['predicted_price'] for pred in preds]
+            # Spread of the per-tree forecasts when the model provides one
+            confidence[i, :len(preds)] = [pred.get('confidence', DEFAULT_ALERT_CONFIDENCE) for pred in preds]
+        
+        return keys, predicted, confidence
+    
+    def evaluate(self, forecasts):
+        """
+        Drop/spike thresholds over the whole forecast matrix
+        
+        Args:
+            forecasts: Dict of (commodity, state, market) -> prediction dicts
+        
+        Returns:
+            List of alert dicts (not yet stored)
+        """
+        if not forecasts:
+            return []
+        
+        # One query for every commodity, instead of one per prediction; prices
+        # are reloaded each call since a generator may live across runs
+        self.series_prices.clear()
+        self.commodity_prices.clear()
+        self.load_current_prices(sorted({key[0] for key in forecasts}))
+        
+        keys, predicted, confidence = self.forecast_matrix(forecasts)
+        current = np.array([self.current_price(key) or np.nan for key in keys], dtype=np.float64)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = np.where(current[:, None] > 0, predicted / current[:, None] - 1, np.nan)
+        
+        drop = change <= -PRICE_DROP_THRESHOLD
+        spike = change >= PRICE_SPIKE_THRESHOLD
+        
+        alerts = []
+        now = datetime.now()
+        for i, step in zip(*np.nonzero(drop | spike)):
+            pred = forecasts[keys[i]][step]
+            alerts.append(self._build_alert(
+                'PRICE_DROP' if drop[i, step] else 'PRICE_SPIKE', pred, float(current[i]),
+                float(change[i, step]), float(confidence[i, step]), now
+            ))
+        return alerts
+    
+    @staticmethod
+    def _build_alert(alert_type, pred, current_price, change_pct, confidence, created_at):
+        commodity = pred['commodity']
+        predicted_price = pred['predicted_price']
+        
+        if alert_type == 'PRICE_DROP':
+            alert = {
+                'type': 'PRICE_DROP',
+                'severity': 'HIGH' if change_pct <= -0.15 else 'MEDIUM',
+                'commodity': commodity,
+                'title': f"{commodity} Price Drop Alert",
+                'message': f"{commodity} prices expected to drop {abs(change_pct)*100:.1f}% to ₹{predicted_price}/quintal. Consider selling now.",
+                'messageHindi': f"{commodity} का भाव {abs(change_pct)*100:.1f}% घट सकता है। ₹{predicted_price}/क्विंटल। अभी बेचें।"
+            }
+        else:
+            alert = {
+                'type': 'PRICE_SPIKE',
+                'severity': 'MEDIUM',
+                'commodity': commodity,
+                'title': f"{commodity} Price Increase Alert",
+                'message': f"{commodity} prices expected to rise {change_pct*100:.1f}% to ₹{predicted_price}/quintal. Hold for better rates.",
+                'messageHindi': f"{commodity} का भाव {change_pct*100:.1f}% बढ़ सकता है। ₹{predicted_price}/क्विंटल। बेहतर भाव के लिए रुकें।"
+            }
+        
+        alert.update({
+            'state': pred.get('state'),
+            'market': pred.get('market'),
+            'current_price': current_price,
+            'predicted_price': predicted_price,
+            'change_percentage': round(change_pct * 100, 1),
+            'predicted_range': [pred.get('lower_price'), pred.get('upper_price')],
+            'targetUsers': [],
+            'targetStates': [],
+            'metadata': {
+                'source': 'ML_Prediction',
+                'confidence': confidence,
+                'actionable': True
+            },
+            'createdAt': created_at
+        })
+        return alert
+    
+    def assign_targets(self, alerts):
+        """
+        Fill targetUsers with the farmers growing the commodity in the
+        alert's state and market, and targetStates with that state
+        
+        Alerts nobody subscribes to keep empty targets (broadcast to all,
+        as before).
+        """
+        if not alerts:
+            return
+        
+        self.subscriptions.refresh()
+        resolved = {}
+        for alert in alerts:
+            key = (alert['commodity'], alert.get('state'), alert.get('market'))
+            if key not in resolved:
+                resolved[key] = self.subscriptions.targets(*key)
+            if resolved[key]:
+                alert['targetUsers'] = resolved[key]
+                alert['targetStates'] = [alert['state']]
+    
+    def generate_batch(self, forecasts):
+        """
+        Evaluate every forecast series and store the alerts in one write
+        
+        Args:
+            forecasts: Dict of (commodity, state, market) -> prediction dicts
+        
+        Returns:
+            List of generated alerts
+        """
+        return self.publish(self.evaluate(forecasts))
+    
+    def publish(self, alerts):
+        """
+        Suppress repeats, resolve targets and queue the rest for delivery
+        
+        Returns:
+            Alerts that were stored
+        """
+        # Repeats of the same alert collapse before anything is written
+        alerts = self.suppressor.filter(alerts)
+        self.assign_targets(alerts)
+        
+        self.notify_backend(alerts)
+        # Cooldown starts only once the alerts are safely queued
+        self.suppressor.record(alerts)
+        
+        return alerts
     
     def generate_alerts(self, predictions):
         """
@@ -23,95 +215,34 @@ class AlertGenerator:
         - "टमाटर का भाव ₹1200 से ₹980 हो सकता है। अभी बेचें।"
         - "प्याज की मांग बढ़ रही है। अच्छा समय है बेचने का।"
         """
-        alerts = []
-        
+        forecasts = {}
         for pred in predictions:
-            commodity = pred['commodity']
-            predicted_price = pred['predicted_price']
-            
-            # Get current price
-            current = self.prices_col.find_one(
-                {'commodity': commodity},
-                sort=[('date', -1)]
-            )
-            
-            if not current:
-                continue
-            
-            current_price = current['modal_price']
-            change_pct = (predicted_price - current_price) / current_price
-            
-            alert = None
-            
-            # Price Drop Alert
-            if change_pct <= -PRICE_DROP_THRESHOLD:
-                alert = {
-                    'type': 'PRICE_DROP',
-                    'severity': 'HIGH' if change_pct <= -0.15 else 'MEDIUM',
-                    'commodity': commodity,
-                    'title': f"{commodity} Price Drop Alert",
-                    'message': f"{commodity} prices expected to drop {abs(change_pct)*100:.1f}% to ₹{predicted_price}/quintal. Consider selling now.",
-                    'messageHindi': f"{commodity} का भाव {abs(change_pct)*100:.1f}% घट सकता है। ₹{predicted_price}/क्विंटल। अभी बेचें।",
-                    'current_price': current_price,
-                    'predicted_price': predicted_price,
-                    'change_percentage': round(change_pct * 100, 1),
-                    'targetUsers': [],
-                    'targetStates': [],
-                    'metadata': {
-                        'source': 'ML_Prediction',
-                        'confidence': 0.85,
-                        'actionable': True
-                    },
-                    'createdAt': datetime.now()
-                }
-            
-            # Price Spike Alert
-            elif change_pct >= PRICE_SPIKE_THRESHOLD:
-                alert = {
-                    'type': 'PRICE_SPIKE',
-                    'severity': 'MEDIUM',
-                    'commodity': commodity,
-                    'title': f"{commodity} Price Increase Alert",
-                    'message': f"{commodity} prices expected to rise {change_pct*100:.1f}% to ₹{predicted_price}/quintal. Hold for better rates.",
-                    'messageHindi': f"{commodity} का भाव {change_pct*100:.1f}% बढ़ सकता है। ₹{predicted_price}/क्विंटल। बेहतर भाव के लिए रुकें।",
-                    'current_price': current_price,
-                    'predicted_price': predicted_price,
-                    'change_percentage': round(change_pct * 100, 1),
-                    'targetUsers': [],
-                    'targetStates': [],
-                    'metadata': {
-                        'source': 'ML_Prediction',
-                        'confidence': 0.85,
-                        'actionable': True
-                    },
-                    'createdAt': datetime.now()
-                }
-            
-            if alert:
-                alerts.append(alert)
-                # Save to MongoDB
-                self.alerts_col.insert_one(alert)
-                # Notify Node.js backend
-                self.notify_backend(alert)
+            key = (pred['commodity'], pred.get('state'), pred.get('market'))
+            forecasts.setdefault(key, []).append(pred)
+        return self.generate_batch(forecasts)
+    
+    def notify_backend(self, alerts):
+        """
+        Store alerts with their outbox entries and hand them to the
+        background dispatcher for Socket.io broadcast (never blocks on
+        the Node.js backend)
+        """
+        if not alerts:
+            return
         
-        return alerts
+        self.outbox.enqueue(alerts, archive=self.alerts_col)
+        if self.dispatcher is None:
+            self.dispatcher = OutboxDispatcher(self.outbox).start()
+        self.dispatcher.wake()
     
-    def notify_backend(self, alert):
-        """Send alert to Node.js backend for Socket.io broadcast"""
-        try:
-            response = requests.post(
-                f'{NODE_BACKEND_URL}/api/market-alerts/broadcast',
-                json=alert,
-                timeout=5
-            )
-            
-            if response.status_code == 200 or response.status_code == 201:
-                print(f"✅ Alert broadcasted: {alert['title']}")
-            else:
-                print(f"⚠️ Failed to broadcast alert: {response.status_code}")
-        
-        except Exception as e:
-            print(f"❌ Error notifying backend: {e}")
+    def close(self, timeout=30):
+        """Give queued alerts a last chance to go out, then stop the dispatcher and close connections"""
+        if self.dispatcher is not None:
+            self.dispatcher.stop(timeout, drain=True)
+            self.dispatcher = None
+        for client in (self.client, getattr(self.subscriptions, 'client', None)):
+            if client is not None:
+                client.close()
     
     def create_demand_alert(self, commodity, message):
         """Create manual demand alert"""
@@ -131,8 +262,7 @@ class AlertGenerator:
             'createdAt': datetime.now()
         }
         
-        self.alerts_col.insert_one(alert)
-        self.notify_backend(alert)
+        self.notify_backend([alert])
         return alert
 
 if __name__ == "__main__":
@@ -0,0 +1,256 @@
+"""
+Alert Delivery Outbox
+Alerts are stored with their delivery state in `alertoutbox`; a background
+dispatcher sends them to the Node.js backend in batches and retries until
+they are acknowledged (at-least-once delivery)
+"""
+
+import json
+import random
+import threading
+import uuid
+from datetime import datetime, timedelta
+import requests
+from requests.adapters import HTTPAdapter
+from bson import ObjectId
+from pymongo import MongoClient, UpdateOne, ASCENDING
+from pymongo.errors import OperationFailure, ConfigurationError
+from config import (MONGO_URI, NODE_BACKEND_URL, ALERT_OUTBOX_BATCH_SIZE, ALERT_OUTBOX_POLL_SECONDS,
+                    ALERT_OUTBOX_MAX_ATTEMPTS, ALERT_OUTBOX_BACKOFF_SECONDS, ALERT_OUTBOX_MAX_BACKOFF_SECONDS,
+                    ALERT_OUTBOX_LEASE_SECONDS, ALERT_DELIVERY_TIMEOUT)
+
+PENDING, SENDING, DELIVERED, FAILED = 'pending', 'sending', 'delivered', 'failed'
+BROADCAST_PATH = '/api/market-alerts/broadcast/batch'
+NO_TRANSACTIONS = 20  # IllegalOperation: standalone servers cannot run transactions
+
+
+class AlertOutbox:
+    """
+    `alertoutbox`: one entry per alert holding the broadcast payload and
+    its delivery state (pending -> sending -> delivered, or failed after
+    the last retry). The entry shares its _id with the stored alert and
+    the payload carries it as `outboxId`, so the backend can drop
+    redelivered duplicates.
+    """
+
+    def __init__(self, db=None):
+        if db is None:
+            self.client = MongoClient(MONGO_URI)
+            db = self.client['test']  # same database as AlertGenerator
+        self.db = db
+        self.collection = db['alertoutbox']
+
+    def ensure_indexes(self):
+        """Due-entry scans and claim lookups"""
+        self.collection.create_index([('status', ASCENDING), ('next_attempt_at', ASCENDING)])
+        self.collection.create_index([('claim', ASCENDING)])
+
+    @staticmethod
+    def _entry(alert, now):
+        payload = {k: v for k, v in alert.items() if k != '_id'}
+        payload['outboxId'] = str(alert['_id'])
+        return {
+            '_id': alert['_id'],
+            'payload': payload,
+            'status': PENDING,
+            'attempts': 0,
+            'next_attempt_at': now,
+            'created_at': now,
+            'last_error': None
+        }
+
+    def enqueue(self, alerts, archive=None):
+        """
+        Store alerts for delivery
+
+        The alert copies in `archive` (the alerts collection) and the outbox
+        entries are written in one transaction where the server supports
+        it, so an alert is never stored without its delivery entry.
+
+        Args:
+            alerts: Alert dicts (given an _id if they have none)
+            archive: Collection that also keeps the alerts (optional)
+
+        Returns:
+            Number of entries queued
+        """
+        if not alerts:
+            return 0
+
+        now = datetime.now()
+        for alert in alerts:
+            alert.setdefault('_id', ObjectId())
+        entries = [self._entry(alert, now) for alert in alerts]
+
+        def write(session=None):
+            if archive is not None:
+                archive.insert_many(alerts, ordered=False, session=session)
+            self.collection.insert_many(entries, ordered=False, session=session)
+
+        try:
+            with self.db.client.start_session() as session:
+                session.with_transaction(write)
+        except (OperationFailure, ConfigurationError) as e:
+            if getattr(e, 'code', NO_TRANSACTIONS) != NO_TRANSACTIONS:
+                raise
+            write()
+        return len(entries)
+
+    def claim(self, limit=ALERT_OUTBOX_BATCH_SIZE, lease_seconds=ALERT_OUTBOX_LEASE_SECONDS):
+        """
+        Atomically take up to `limit` due entries for one dispatcher
+
+        Entries stuck in `sending` past the lease (dispatcher died) are due
+        again. Returns the claimed entries.
+        """
+        now = datetime.now()
+        due = {'$or': [
+            {'status': PENDING, 'next_attempt_at': {'$lte': now}},
+            {'status': SENDING, 'claimed_at': {'$lt': now - timedelta(seconds=lease_seconds)}}
+        ]}
+        ids = [doc['_id'] for doc in self.collection.find(due, {'_id': 1}).sort('next_attempt_at', ASCENDING).limit(limit)]
+        if not ids:
+            return []
+
+        token = uuid.uuid4().hex
+        # Re-check the due filter so two dispatchers never claim the same entry
+        self.collection.update_many({'$and': [{'_id': {'$in': ids}}, due]},
+                                    {'$set': {'status': SENDING, 'claim': token, 'claimed_at': now}})
+        return list(self.collection.find({'claim': token}))
+
+    def mark_delivered(self, ids):
+        self.collection.update_many({'_id': {'$in': ids}}, {
+            '$set': {'status': DELIVERED, 'delivered_at': datetime.now(), 'last_error': None},
+            '$inc': {'attempts': 1},
+            '$unset': {'claim': ''}
+        })
+
+    def mark_failed(self, entries, error, max_attempts=ALERT_OUTBOX_MAX_ATTEMPTS,
+                    backoff=ALERT_OUTBOX_BACKOFF_SECONDS, max_backoff=ALERT_OUTBOX_MAX_BACKOFF_SECONDS):
+        """Schedule a retry with exponential backoff, or park the entry as failed"""
+        now = datetime.now()
+        operations = []
+        for entry in entries:
+            attempts = entry['attempts'] + 1
+            delay = min(max_backoff, backoff * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+            operations.append(UpdateOne({'_id': entry['_id']}, {
+                '$set': {'status': FAILED if attempts >= max_attempts else PENDING, 'attempts': attempts,
+                         'next_attempt_at': now + timedelta(seconds=delay), 'last_error': error},
+                '$unset': {'claim': ''}
+            }))
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+
+    def counts(self):
+        """Entries per delivery state"""
+        pipeline = [{'$group': {'_id': '$status', 'n': {'$sum': 1}}}]
+        return {row['_id']: row['n'] for row in self.collection.aggregate(pipeline)}
+
+
+class OutboxDispatcher:
+    """
+    Background sender for the outbox
+
+    One keep-alive requests.Session (pooled connections) posts each claimed
+    batch as a single multi-alert request. The pipeline only waits for the
+    outbox write; `wake()` starts a send right away instead of at the next
+    poll.
+    """
+
+    def __init__(self, outbox=None, url=NODE_BACKEND_URL + BROADCAST_PATH, batch_size=ALERT_OUTBOX_BATCH_SIZE,
+                 poll_seconds=ALERT_OUTBOX_POLL_SECONDS, timeout=ALERT_DELIVERY_TIMEOUT):
+        self.outbox = outbox or AlertOutbox()
+        self.url = url
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.session.headers['Content-Type'] = 'application/json'
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def send(self, entries):
+        """POST one batch; True when the backend acknowledged it"""
+        body = json.dumps({'alerts': [entry['payload'] for entry in entries]}, default=str, ensure_ascii=False)
+        try:
+            response = self.session.post(self.url, data=body.encode('utf-8'), timeout=self.timeout)
+        except requests.RequestException as e:
+            self.outbox.mark_failed(entries, f"{type(e).__name__}: {e}")
+            return False
+
+        if response.status_code in (200, 201):
+            self.outbox.mark_delivered([entry['_id'] for entry in entries])
+            return True
+
+        self.outbox.mark_failed(entries, f"HTTP {response.status_code}")
+        return False
+
+    def dispatch_once(self):
+        """
+        Claim and send one batch
+
+        Returns:
+            Number of alerts delivered (0 when nothing was due or the send failed)
+        """
+        entries = self.outbox.claim(self.batch_size)
+        if not entries:
+            return 0
+        if self.send(entries):
+            print(f"✅ {len(entries)} alerts broadcasted")
+            return len(entries)
+        print(f"⚠️ Failed to broadcast {len(entries)} alerts, will retry")
+        return 0
+
+    def drain(self, timeout=30):
+        """Send due batches until none are left, a send fails, or `timeout` passes"""
+        deadline = datetime.now() + timedelta(seconds=timeout)
+        delivered = 0
+        while datetime.now() < deadline:
+            sent = self.dispatch_once()
+            if not sent:
+                break
+            delivered += sent
+        return delivered
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                while self.dispatch_once() and not self._stop.is_set():
+                    pass
+            except Exception as e:
+                print(f"❌ Alert dispatcher error: {e}")
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self.outbox.ensure_indexes()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='alert-dispatcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self, timeout=None, drain=False):
+        """Stop the thread; with `drain`, first send what is still due from this thread"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if drain:
+            self.drain(timeout or 30)
+        self.session.close()
+
+
+if __name__ == "__main__":
+    # Retry whatever is still pending, then report
+    dispatcher = OutboxDispatcher()
+    print(f"📤 Delivered {dispatcher.drain()} alerts")
+    print(f"📊 Outbox: {dispatcher.outbox.counts()}")
@@ -0,0 +1,115 @@
+"""
+Alert Suppression
+Collapses duplicate alerts within a run and holds back repeats of an alert
+already sent within the cooldown window
+"""
+
+from datetime import datetime, timedelta
+from pymongo import MongoClient, UpdateOne, ASCENDING
+from config import MONGO_URI, ALERT_COOLDOWN_HOURS
+
+SUPPRESSION_FIELDS = ('type', 'commodity', 'state', 'severity')
+
+
+def suppression_key(alert):
+    """(type, commodity, state, severity) of an alert as one string id"""
+    return '|'.join(str(alert.get(field) or '') for field in SUPPRESSION_FIELDS)
+
+
+class AlertSuppressor:
+    """
+    Cooldown index keyed by suppression_key
+
+    Lookups hit an in-memory dict of key -> last sent time. Keys it has
+    no send time for are looked up in the `alertsuppression` collection
+    (one query per batch), so alerts sent by other processes count too.
+    Sends are written back by record() once the alerts are queued, so an
+    alert that failed to queue is not held back.
+    Expired entries are dropped by a TTL index.
+    """
+
+    def __init__(self, db=None, cooldown_hours=ALERT_COOLDOWN_HOURS):
+        if db is None:
+            self.client = MongoClient(MONGO_URI)
+            db = self.client['test']  # same database as AlertGenerator
+        self.collection = db['alertsuppression']
+        self.cooldown = timedelta(hours=cooldown_hours)
+        self.last_sent = {}  # key -> datetime of the last send
+        self._indexed = False
+
+    def ensure_indexes(self):
+        if not self._indexed:
+            self.collection.create_index([('expires_at', ASCENDING)], expireAfterSeconds=0)
+            self._indexed = True
+
+    def _load(self, keys):
+        """Pull keys not known to be cooling down from Mongo in one query"""
+        unknown = [key for key in keys if self.last_sent.get(key) is None]
+        if not unknown:
+            return
+        for doc in self.collection.find({'_id': {'$in': unknown}}, {'last_sent_at': 1}):
+            self.last_sent[doc['_id']] = doc['last_sent_at']
+
+    @staticmethod
+    def collapse(alerts):
+        """
+        One alert per key: the one with the largest predicted change
+
+        Returns:
+            Dict of key -> (alert, number of alerts it stands for)
+        """
+        best = {}
+        for alert in alerts:
+            key = suppression_key(alert)
+            kept, count = best.get(key, (None, 0))
+            if kept is None or abs(alert.get('change_percentage') or 0) > abs(kept.get('change_percentage') or 0):
+                kept = alert
+            best[key] = (kept, count + 1)
+        return best
+
+    def filter(self, alerts, now=None):
+        """
+        Alerts that should go out now (record() them once they are queued)
+
+        Args:
+            alerts: Candidate alert dicts
+
+        Returns:
+            Deduplicated alerts outside their cooldown
+        """
+        if not alerts:
+            return []
+
+        now = now or datetime.now()
+        collapsed = self.collapse(alerts)
+        self._load(list(collapsed))
+
+        kept = []
+        for key, (alert, count) in collapsed.items():
+            last = self.last_sent.get(key)
+            if last is not None and now - last < self.cooldown:
+                continue
+            alert['duplicates_collapsed'] = count - 1
+            kept.append(alert)
+
+        suppressed = len(alerts) - len(kept)
+        if suppressed:
+            print(f"🔕 Suppressed {suppressed} duplicate alerts ({len(kept)} kept)")
+        return kept
+
+    def record(self, alerts, now=None):
+        """Mark alerts as sent, in memory and in Mongo"""
+        keys = {suppression_key(alert) for alert in alerts}
+        if not keys:
+            return
+        now = now or datetime.now()
+        self.ensure_indexes()
+        operations = []
+        for key in keys:
+            self.last_sent[key] = now
+            operations.append(UpdateOne(
+                {'_id': key},
+                {'$set': {'last_sent_at': now, 'expires_at': now + self.cooldown}},
+                upsert=True
+            ))
+        self.collection.bulk_write(operations, ordered=False)
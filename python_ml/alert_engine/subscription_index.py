@@ -0,0 +1,161 @@
+"""
+Subscription Index
+Inverted index from commodity, state and market to the farmers who grow,
+live or sell there, used to target alerts instead of broadcasting them
+"""
+
+import re
+from datetime import datetime, timedelta
+import numpy as np
+from pymongo import MongoClient, ASCENDING
+from config import MONGO_URI, SUBSCRIPTION_REBUILD_HOURS
+
+EMPTY = np.empty(0, dtype=np.int32)
+USER_FIELDS = {'_id': 1, 'state': 1, 'district': 1, 'cropType': 1, 'role': 1, 'updatedAt': 1}
+
+
+def normalize(value):
+    return (value or '').strip().lower()
+
+
+def user_terms(user):
+    """
+    Index terms of one user document
+
+    Returns:
+        (crops tuple, state, district); crops split from a free-text
+        cropType such as "Rice, Wheat"
+    """
+    crops = tuple(sorted({normalize(crop) for crop in re.split(r'[,/;&]', user.get('cropType') or '') if crop.strip()}))
+    return crops, normalize(user.get('state')), normalize(user.get('district'))
+
+
+class SubscriptionIndex:
+    """
+    Farmers keyed by crop, state and district
+
+    Users get dense int32 numbers; every term maps to a sorted int32 array
+    of them, so resolving an alert is an intersection of two or three
+    sorted arrays. Users without a district are posted under the empty
+    district and match every market. `refresh()` applies only users updated since the last
+    call (one query on updatedAt); a full rebuild every
+    SUBSCRIPTION_REBUILD_HOURS drops deleted accounts.
+    """
+
+    def __init__(self, db=None, rebuild_hours=SUBSCRIPTION_REBUILD_HOURS):
+        if db is None:
+            self.client = MongoClient(MONGO_URI)
+            db = self.client['techsprint']  # Match Node.js database name
+        self.collection = db['users']
+        self.rebuild_every = timedelta(hours=rebuild_hours)
+
+        self.user_ids = []  # int -> ObjectId
+        self.numbers = {}  # ObjectId -> int
+        self.terms = {}  # int -> user_terms() currently indexed
+        self.postings = {'crop': {}, 'state': {}, 'district': {}}
+        self.watermark = None
+        self.built_at = None
+
+    def ensure_indexes(self):
+        self.collection.create_index([('updatedAt', ASCENDING)])
+
+    def _number(self, user_id):
+        number = self.numbers.get(user_id)
+        if number is None:
+            number = self.numbers[user_id] = len(self.user_ids)
+            self.user_ids.append(user_id)
+        return number
+
+    @staticmethod
+    def _entries(number, terms):
+        crops, state, district = terms
+        entries = [('crop', crop, number) for crop in crops]
+        if state:
+            entries.append(('state', state, number))
+        if crops:
+            entries.append(('district', district, number))
+        return entries
+
+    def _apply(self, users):
+        """Fold changed user documents into the postings, term by term"""
+        added, removed = {}, {}
+        for user in users:
+            number = self._number(user['_id'])
+            terms = user_terms(user) if user.get('role', 'farmer') == 'farmer' else ((), '', '')
+
+            old = self.terms.get(number)
+            if old == terms:
+                continue
+            for field, term, n in self._entries(number, old or ((), '', '')):
+                removed.setdefault((field, term), []).append(n)
+            for field, term, n in self._entries(number, terms):
+                added.setdefault((field, term), []).append(n)
+            self.terms[number] = terms
+
+        for field, term in set(added) | set(removed):
+            postings = self.postings[field]
+            array = postings.get(term, EMPTY)
+            if (field, term) in removed:
+                array = np.setdiff1d(array, np.array(removed[(field, term)], dtype=np.int32), assume_unique=True)
+            if (field, term) in added:
+                array = np.union1d(array, np.array(added[(field, term)], dtype=np.int32))
+            postings[term] = array.astype(np.int32, copy=False)
+
+    def rebuild(self):
+        """Index every user from scratch"""
+        self.ensure_indexes()
+        self.user_ids, self.numbers, self.terms = [], {}, {}
+        self.postings = {'crop': {}, 'state': {}, 'district': {}}
+        self.built_at = datetime.now()
+        users = list(self.collection.find({}, USER_FIELDS))
+        self._apply(users)
+        self.watermark = max((user['updatedAt'] for user in users if user.get('updatedAt')), default=None)
+        print(f"👥 Subscription index: {len(self.user_ids)} users, "
+              f"{len(self.postings['crop'])} crops, {len(self.postings['state'])} states")
+
+    def refresh(self):
+        """Apply users changed since the last refresh (rebuild when due)"""
+        if self.built_at is None or datetime.now() - self.built_at > self.rebuild_every:
+            return self.rebuild()
+
+        query = {'updatedAt': {'$gt': self.watermark}} if self.watermark else {}
+        changed = list(self.collection.find(query, USER_FIELDS))
+        if changed:
+            self._apply(changed)
+            self.watermark = max([self.watermark or datetime.min]
+                                 + [user['updatedAt'] for user in changed if user.get('updatedAt')])
+
+    def users_for(self, commodity, state=None, market=None):
+        """
+        Farmers matching every given key
+
+        Args:
+            commodity: Crop the user grows
+            state: User's state (None = any)
+            market: Market, matched against the user's district; users
+                with no district match any market (None = any)
+
+        Returns:
+            Sorted int32 array of user numbers
+        """
+        arrays = [self.postings['crop'].get(normalize(commodity), EMPTY)]
+        if state:
+            arrays.append(self.postings['state'].get(normalize(state), EMPTY))
+
+        # Smallest posting first keeps every intersection small
+        arrays.sort(key=len)
+        result = arrays[0]
+        for array in arrays[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, array, assume_unique=True)
+
+        if market and len(result):
+            districts = self.postings['district']
+            result = np.union1d(np.intersect1d(result, districts.get(normalize(market), EMPTY), assume_unique=True),
+                                np.intersect1d(result, districts.get('', EMPTY), assume_unique=True))
+        return result
+
+    def targets(self, commodity, state=None, market=None):
+        """User ObjectIds for an alert's targetUsers"""
+        return [self.user_ids[number] for number in self.users_for(commodity, state, market)]
@@ -0,0 +1,76 @@
+"""
+Feature Engine Benchmark
+Compares the vectorized feature engine with the previous pandas
+groupby/rolling path on synthetic multi-market data
+
+Usage: python benchmarks/bench_feature_engine.py [max_rows]
+"""
+
+import sys
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models.feature_engine import build_features, SERIES_KEYS
+
+
+def legacy_prepare_features(df):
+    """Previous prepare_features, grouped by the full series key"""
+    df = df.sort_values('date')
+
+    df['price_lag_1'] = df.groupby(SERIES_KEYS, observed=True)['modal_price'].shift(1)
+    df['price_lag_7'] = df.groupby(SERIES_KEYS, observed=True)['modal_price'].shift(7)
+    df['price_ma_7'] = df.groupby(SERIES_KEYS, observed=True)['price_lag_1'].rolling(7).mean().reset_index(level=[0, 1, 2], drop=True)
+    df['price_std_7'] = df.groupby(SERIES_KEYS, observed=True)['price_lag_1'].rolling(7).std().reset_index(level=[0, 1, 2], drop=True)
+    df['day_of_week'] = pd.to_datetime(df['date']).dt.dayofweek
+    df['month'] = pd.to_datetime(df['date']).dt.month
+    df['pricechange_pct'] = df.groupby(SERIES_KEYS, observed=True)['modal_price'].pct_change()
+
+    return df.dropna()
+
+
+def make_data(n_rows, days=365, seed=42):
+    """Synthetic price rows spread over n_rows / days market series"""
+    rng = np.random.default_rng(seed)
+    n_series = -(-n_rows // days)
+    series = np.repeat(np.arange(n_series), days)[:n_rows]
+    offset = np.tile(np.arange(days), n_series)[:n_rows]
+
+    df = pd.DataFrame({
+        'date': np.datetime64('2024-01-01') + offset.astype('timedelta64[D]'),
+        'modal_price': (1000 + rng.normal(0, 50, n_rows).cumsum() % 500).astype(np.float32),
+        'commodity': pd.Categorical.from_codes(series % 6, ['Tomato', 'Onion', 'Potato', 'Wheat', 'Rice', 'Cotton']),
+        'state': pd.Categorical.from_codes(series % 5, ['Maharashtra', 'Gujarat', 'Karnataka', 'Uttar Pradesh', 'Punjab']),
+        'market': pd.Categorical([f"Market {i}" for i in series])
+    })
+
+    # Scrapers insert rows in arbitrary order
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def timed(func, df):
+    start = time.perf_counter()
+    result = func(df)
+    return time.perf_counter() - start, len(result)
+
+
+def main():
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    sizes = [n for n in (10_000, 100_000, 500_000, 1_000_000, 2_000_000, 5_000_000) if n <= max_rows]
+
+    print(f"{'rows':>10} {'engine (s)':>12} {'legacy (s)':>12} {'speedup':>9} {'engine ns/row':>14}")
+    for n_rows in sizes:
+        df = make_data(n_rows)
+        engine_time, engine_rows = timed(build_features, df)
+        legacy_time, legacy_rows = timed(legacy_prepare_features, df.copy())
+        assert engine_rows == legacy_rows, (engine_rows, legacy_rows)
+
+        print(f"{n_rows:>10,} {engine_time:>12.3f} {legacy_time:>12.3f} "
+              f"{legacy_time / engine_time:>8.1f}x {engine_time / n_rows * 1e9:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Flat Forest Latency Benchmark
+Per-request latency of the flat-array forest vs RandomForestRegressor.predict
+
+Usage: python benchmarks/bench_flat_forest.py
+"""
+
+import sys
+import time
+from pathlib import Path
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models.flat_forest import FlatForest
+
+
+def latency_us(predict, X, repeats=200):
+    """Median wall time of one predict call in microseconds"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict(X)
+        times.append(time.perf_counter() - start)
+    return np.median(times) * 1e6
+
+
+def main():
+    rng = np.random.default_rng(42)
+    X_train = rng.normal(size=(20_000, 6))
+    y_train = X_train[:, 0] * 100 + np.sin(X_train[:, 1]) * 50 + rng.normal(size=20_000)
+
+    # Same settings as the production forest; n_jobs=1 for a fair per-request comparison
+    model = RandomForestRegressor(n_estimators=100, max_depth=15, random_state=42, n_jobs=1)
+    model.fit(X_train, y_train)
+    flat = FlatForest.from_sklearn(model)
+
+    print(f"{'rows':>6} {'sklearn (us)':>14} {'flat (us)':>11} {'speedup':>9}")
+    for n_rows in (1, 7, 50, 200, 1000, 5000):
+        X = rng.normal(size=(n_rows, 6))
+        sk = latency_us(model.predict, X, repeats=50 if n_rows > 1000 else 200)
+        fl = latency_us(flat.predict, X, repeats=50 if n_rows > 1000 else 200)
+        print(f"{n_rows:>6} {sk:>14.0f} {fl:>11.0f} {sk / fl:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
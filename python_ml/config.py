@@ -61,3 +61,101 @@ DEMAND_KEYWORDS = [
 SCRAPING_DELAY = 2  # seconds between requests
 MAX_RETRIES = 3
 REQUEST_TIMEOUT = 30  # seconds
+
+# Model Registry
+MODEL_CACHE_SIZE = int(os.getenv('MODEL_CACHE_SIZE', 32))  # max models kept in memory
+MODEL_MMAP_MODE = os.getenv('MODEL_MMAP_MODE', 'r') or None  # share tree arrays across workers
+
+# Training data loader
+MARKET_LOADER_BATCH_SIZE = 5000  # documents per cursor batch
+LATEST_ROWS_PER_SERIES = 60  # history per series when no date window is given
+LATEST_ROWS_WINDOW_DAYS = 180  # only series reporting within this window are fetched
+
+# Feature store
+FEATURE_STORE_LOOKBACK_DAYS = 30  # raw history reloaded to refill lag/rolling windows
+
+# Backtesting
+BACKTEST_CACHE_DIR = 'models/backtest_cache'  # cached fold feature matrices
+BACKTEST_WORKERS = os.cpu_count() or 1
+
+# Hyperparameter tuning (successive halving)
+TUNING_CANDIDATES = 16
+TUNING_FOLDS = 9  # rungs use 1, 3, 9 folds with eta=3
+TUNING_ETA = 3
+TUNING_LATENCY_WEIGHT = 0.5  # ₹ of MAE traded per ms of predict time per 1k rows
+
+# Incremental retraining
+INCREMENTAL_TREES = 20  # trees (or boosting rounds) added per incremental update
+INCREMENTAL_MAX_TREES = 300  # full refit once the model would grow past this
+DRIFT_REFIT_RATIO = 1.5  # full refit when MAE on new rows exceeds baseline by this factor
+
+# Global cross-series model
+GLOBAL_MODEL_PARAMS = {
+    'max_iter': 300,
+    'learning_rate': 0.05,
+    'max_leaf_nodes': 63,
+    'min_samples_leaf': 50,
+    'random_state': 42
+}
+GLOBAL_MAX_CATEGORIES = 250  # commodity/state codes kept (HistGradientBoosting limit is 255)
+
+# Flat-array forest inference
+FLAT_FOREST_MAX_ROWS = 500  # predict calls up to this size use the flat forest
+
+# Prediction intervals (from per-tree forest outputs)
+FORECAST_QUANTILES = (0.1, 0.9)  # lower/upper bounds of the forecast band
+DEFAULT_ALERT_CONFIDENCE = 0.85  # used when a forecast carries no interval
+
+# Exogenous features (weather and news joined onto price rows)
+WEATHER_MAX_AGE_HOURS = 48  # older readings count as missing
+NEWS_SENTIMENT_WINDOW_DAYS = 7  # trailing window for news sentiment counts
+
+# Closed-form baseline forecasts (fallback for sparse series)
+BASELINE_HISTORY = 60  # latest prices per series used by the baselines
+BASELINE_SEASON = 7  # weekly seasonality for seasonal-naive
+BASELINE_EWMA_ALPHA = 0.3
+BASELINE_HOLT_ALPHA = 0.3
+BASELINE_HOLT_BETA = 0.1
+BASELINE_HOLT_PHI = 0.9  # trend damping
+BASELINE_BACKTEST_ORIGINS = 2  # held-out horizons used to pick a method per series
+
+# Forecast read API (services/forecast_api.py)
+FORECAST_API_HOST = os.getenv('FORECAST_API_HOST', '127.0.0.1')
+FORECAST_API_PORT = int(os.getenv('FORECAST_API_PORT', 5055))
+FORECAST_API_REFRESH_SECONDS = 30  # how often new snapshots are pulled into memory
+
+# Forecast accuracy monitoring (services/accuracy_monitor.py)
+ACCURACY_EWMA_ALPHA = 0.3  # weight of each new evaluation batch in the recent error
+ACCURACY_DRIFT_MAPE = 0.15  # recent absolute % error that marks a series as drifting
+ACCURACY_MIN_SAMPLES = 5  # evaluated forecasts needed (since last retrain) before flagging
+ACCURACY_HISTORY_DAYS = 365  # history loaded when drift forces a full refit
+
+# Scheduler daemon (services/scheduler.py)
+SCHEDULE_SCRAPE_HOURS = 6  # market price collection
+SCHEDULE_WEATHER_MINUTES = 60
+SCHEDULE_NEWS_MINUTES = 30
+SCHEDULE_FORECAST_AT = os.getenv('SCHEDULE_FORECAST_AT', '02:00')  # daily, local time
+SCHEDULER_STATUS_HOST = os.getenv('SCHEDULER_STATUS_HOST', '127.0.0.1')
+SCHEDULER_STATUS_PORT = int(os.getenv('SCHEDULER_STATUS_PORT', 5056))
+
+# Alert delivery outbox (alert_engine/alert_outbox.py)
+ALERT_OUTBOX_BATCH_SIZE = 50  # alerts per broadcast request
+ALERT_OUTBOX_POLL_SECONDS = 5  # idle wait between outbox scans
+ALERT_OUTBOX_MAX_ATTEMPTS = 8  # then the entry is parked as failed
+ALERT_OUTBOX_BACKOFF_SECONDS = 2  # first retry delay, doubled per attempt
+ALERT_OUTBOX_MAX_BACKOFF_SECONDS = 600
+ALERT_OUTBOX_LEASE_SECONDS = 60  # claimed entries are retried if a dispatcher dies mid-send
+ALERT_DELIVERY_TIMEOUT = 10  # seconds per broadcast request
+
+# Alert suppression (alert_engine/alert_suppression.py)
+ALERT_COOLDOWN_HOURS = float(os.getenv('ALERT_COOLDOWN_HOURS', 24))  # same (type, commodity, state, severity) is not re-sent within this window
+
+# Alert targeting (alert_engine/subscription_index.py)
+SUBSCRIPTION_REBUILD_HOURS = 24  # full rebuild (catches deleted users); incremental refresh in between
+
+# Streaming price alerts (services/price_stream.py)
+STREAM_EWMA_ALPHA = 0.2  # weight of each new price in the running mean/variance
+STREAM_Z_THRESHOLD = 3.0  # deviations beyond this many EW standard deviations can alert
+STREAM_MIN_OBSERVATIONS = 5  # prices seen before a series can alert
+STREAM_BATCH_SIZE = 500  # change events per micro-batch
+STREAM_BATCH_SECONDS = 1.0  # max wait to fill a micro-batch
@@ -3,86 +3,395 @@ Main Pipeline Orchestrator
 Runs the complete ML pipeline: Scrape → Clean → Predict → Alert
 """
 
+import os
 import sys
+import time
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
 import pandas as pd
 from pymongo import MongoClient
 from config import MONGO_URI, COMMODITIES
 from scrapers.demo_scraper import DemoMarketScraper
 from models.price_predictor import PricePredictor
+from services.market_data_loader import MarketDataLoader
+from services.feature_store import FeatureStore
+from services.forecast_store import ForecastStore
+from services.accuracy_monitor import AccuracyMonitor
+from models.tuner import tune
+from models.backtest import limit_worker_threads
+from models.global_model import GlobalPricePredictor
+from models.exogenous_features import ExogenousFeatures
+from models.hierarchy import forecast_hierarchy, level_of, RECONCILE_METHODS
 from alert_engine.alert_generator import AlertGenerator
 
-def run_pipeline(commodity=None, train=False):
+def load_history(loader, commodities, start=None):
+    """History of the commodities in one round trip: a date window, or the latest rows of every series"""
+    if start:
+        return loader.load(commodities=commodities, start=start)
+    return loader.load_latest(commodities=commodities)
+
+def split_by_commodity(df):
+    """Per-commodity frames of a bulk load, with only their own categories"""
+    frames = {}
+    for comm, group in df.groupby('commodity', observed=True, sort=False):
+        group = group.reset_index(drop=True)
+        for column in group.select_dtypes('category'):
+            group[column] = group[column].cat.remove_unused_categories()
+        frames[comm] = group
+    return frames
+
+def train_on_history(predictor, series_data, featurized=False, incremental=False):
+    """
+    Train one model version on every commodity with enough rows
+    
+    Returns:
+        Training results dict, or None when no commodity has 20 rows
+    """
+    trainable = [df for df in series_data.values() if len(df) >= 20]
+    if not trainable:
+        print("⚠️ Not enough data to train on any commodity")
+        return None
+    
+    print(f"\n🎯 Step 2: Training model on {len(trainable)} commodities...")
+    results = predictor.train(pd.concat(trainable, ignore_index=True), featurized=featurized,
+                              incremental=incremental)
+    print(f"✅ Training complete ({results['mode']}, v{results['version']}): "
+          f"MAE=₹{results['mae']:.2f}, R²={results['r2']:.3f}")
+    return results
+
+def forecast_series(predictor, series_data, featurized=False, baselines_only=False,
+                    reconcile=None, version=None, raw_data=None):
+    """
+    7-day forecasts for the loaded series (shared by sequential and worker runs)
+    
+    With featurized rows, raw_data holds the raw prices of the same
+    commodities: the baselines and the hierarchy need every series,
+    including those too short to featurize.
+    """
+    raw_data = series_data if raw_data is None else raw_data
+    predict = predictor.predict_baselines if baselines_only else partial(predictor.predict_batch, version=version)
+    if reconcile:
+        return forecast_hierarchy(predict, raw_data, 7, reconcile)
+    if baselines_only:
+        return predict(raw_data, horizon=7)
+    return predict(series_data, horizon=7, featurized=featurized, baseline_data=raw_data)
+
+def load_commodity(comm, options):
+    """
+    Load one commodity's history in a pool worker
+    
+    Every worker opens its own Mongo client (clients must not cross a
+    fork).
+    
+    Returns:
+        (commodity, DataFrame, raw price DataFrame with the feature store
+         or None, timings dict)
+    """
+    timings = {'rows': 0, 'series': 0}
+    started = time.perf_counter()
+    client = MongoClient(MONGO_URI)
+    db = client['techsprint']  # Match Node.js database name
+    
+    try:
+        raw = None
+        if options['use_feature_store']:
+            store = FeatureStore(db)
+            df = load_history(store, [comm], options['start'])
+            raw = load_history(store.loader, [comm], options['start'])
+        else:
+            df = load_history(MarketDataLoader(db), [comm], options['start'])
+        timings['rows'] = len(df)
+        return comm, df, raw, timings
+    finally:
+        timings['load'] = time.perf_counter() - started
+        client.close()
+
+def forecast_commodity(comm, df, raw, options):
+    """
+    Forecast one commodity in a pool worker with the version the parent
+    trained, using its CPU share instead of n_jobs=-1
+    
+    Returns:
+        (commodity, forecasts dict, seconds)
+    """
+    started = time.perf_counter()
+    predictor = PricePredictor(exogenous=options['exogenous'], n_jobs=options['cpus'])
+    forecasts = forecast_series(predictor, {comm: df} if len(df) else {}, options['use_feature_store'],
+                                options['baselines_only'], options['reconcile'], options['version'], raw)
+    return comm, forecasts, time.perf_counter() - started
+
+def run_commodity_workers(commodities, workers, options, predictor):
+    """
+    Load and forecast commodities in a process pool
+    
+    Workers only load and forecast. Between the two phases the parent
+    trains one version on every commodity, so a worker run saves and
+    forecasts with the same model as a sequential run.
+    
+    Returns:
+        (forecasts dict, per-commodity timings dict, training results or None)
+    """
+    cpus = max(1, (os.cpu_count() or 1) // workers)
+    options = dict(options, cpus=cpus, exogenous=predictor.exogenous)
+    history, raw_history, forecasts, timings = {}, {}, {}, {}
+    results = None
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=limit_worker_threads,
+                             initargs=(cpus,)) as pool:
+        futures = {pool.submit(load_commodity, comm, options): comm for comm in commodities}
+        for future in as_completed(futures):
+            comm = futures[future]
+            try:
+                _, df, raw, timings[comm] = future.result()
+            except Exception as e:
+                print(f"❌ {comm} failed to load in worker: {e}")
+                continue
+            if len(df):
+                history[comm] = df
+            if raw is not None and len(raw):
+                raw_history[comm] = raw
+            if comm not in history and comm not in raw_history:
+                print(f"⚠️ No data for {comm}. Skipping...")
+        
+        # Training uses every core while the workers are idle
+        if options['train'] and not options['baselines_only']:
+            step = time.perf_counter()
+            results = train_on_history(predictor, history, options['use_feature_store'], options['incremental'])
+            print(f"⏱️ Trained in {time.perf_counter() - step:.1f}s")
+        options['version'] = results['version'] if results else None
+        
+        futures = {
+            pool.submit(forecast_commodity, comm, history.get(comm, pd.DataFrame()), raw_history.get(comm), options): comm
+            for comm in history.keys() | raw_history.keys()
+        }
+        for future in as_completed(futures):
+            comm = futures[future]
+            try:
+                _, commodity_forecasts, timings[comm]['predict'] = future.result()
+            except Exception as e:
+                print(f"❌ {comm} failed in worker: {e}")
+                continue
+            forecasts.update(commodity_forecasts)
+            timings[comm]['series'] = len(commodity_forecasts)
+            print(f"✅ {comm}: {len(commodity_forecasts)} series in {timings[comm]['predict']:.1f}s")
+    
+    for t in timings.values():
+        t['total'] = t['load'] + t.get('predict', 0)
+    return forecasts, timings, results
+
+def print_timings(timings, wall_time):
+    """Per-commodity timing report of a worker run"""
+    print(f"\n{'Commodity':<15} {'rows':>7} {'series':>7} {'load':>7} {'predict':>8} {'total':>7}")
+    for comm, t in sorted(timings.items()):
+        print(f"{comm:<15} {t['rows']:>7} {t['series']:>7} {t.get('load', 0):>6.1f}s "
+              f"{t.get('predict', 0):>7.1f}s {t['total']:>6.1f}s")
+    busy = sum(t['total'] for t in timings.values())
+    print(f"⏱️ {wall_time:.1f}s wall for {busy:.1f}s of work ({busy / max(wall_time, 1e-9):.1f}x parallel)")
+
+def run_pipeline(commodity=None, train=False, history_days=None, use_feature_store=False,
+                 tune_model=False, incremental=False, use_global=False, use_exogenous=False,
+                 baselines_only=False, reconcile=None, monitor=False, workers=None, db=None, scrape=True,
+                 alert_gen=None):
     """
     Main pipeline execution
     
     Args:
         commodity: Specific commodity to process (None = all)
         train: Whether to train model (default: False)
+        history_days: Load this many days of history instead of the latest rows of each series
+        use_feature_store: Read precomputed features from the feature store
+        tune_model: Search model settings before training
+        incremental: Extend the current model with new rows instead of refitting
+        use_global: Use one global model over every market series
+        use_exogenous: Add weather and news sentiment features to the model
+        baselines_only: Forecast with the closed-form baselines only (no ML model)
+        reconcile: Also forecast state and national aggregates and reconcile
+            all levels ('bottom_up' or 'mint')
+        monitor: Score stored forecasts against new prices and retrain the
+            model on series whose error has drifted
+        workers: Process commodities in this many worker processes
+        db: Open database to reuse (default: connect for this run)
+        scrape: Run the demo scraper first (the scheduler scrapes separately)
+        alert_gen: AlertGenerator to reuse; it is left open (default: one
+            for this run, closed at the end)
+    
+    Returns:
+        Summary dict: training results (None without training), number of
+        forecast series and of alerts
     """
     print("=" * 50)
     print("🌾 AgriMitra ML Pipeline Starting...")
     print("=" * 50)
     
     # Step 1: Scrape data
-    print("\n📥 Step 1: Scraping market data...")
-    scraper = DemoMarketScraper()
-    scraped_data = scraper.run()
+    if scrape:
+        print("\n📥 Step 1: Scraping market data...")
+        scraper = DemoMarketScraper()
+        scraped_data = scraper.run()
     
     # Step 2: Get historical data from MongoDB
-    client = MongoClient(MONGO_URI)
-    db = client['techsprint']  # Match Node.js database name
+    if db is None:
+        client = MongoClient(MONGO_URI)
+        db = client['techsprint']  # Match Node.js database name
+    loader = MarketDataLoader(db)
+    start = datetime.now() - timedelta(days=history_days) if history_days else None
     
     commodities_to_process = [commodity] if commodity else COMMODITIES
     
-    for comm in commodities_to_process:
-        print(f"\n{'='*50}")
-        print(f"📊 Processing: {comm}")
-        print(f"{'='*50}")
-        
-        # Get data
-        data = list(db.marketprices.find({'commodity': comm}).sort('date', -1).limit(60))
-        
-        if len(data) < 20:
-            print(f"⚠️ Not enough data for {comm} ({len(data)} records). Skipping...")
-            continue
+    if use_feature_store:
+        print("\n🧮 Updating feature store...")
+        store = FeatureStore(db)
+        store.update(commodities=commodities_to_process)
+        loader = store
+    
+    if monitor:
+        print("\n📏 Checking forecast accuracy...")
+        accuracy = AccuracyMonitor(db)
+        report = accuracy.update()
+        if report['drifting'] and not (use_global or baselines_only):
+            accuracy.retrain(report['drifting'])
+    
+    if tune_model:
+        print("\n🔧 Tuning model settings...")
+        tune(loader.load(commodities=commodities_to_process, start=start), featurized=use_feature_store)
+    
+    results = None
+    exogenous = None
+    if use_exogenous and not use_global:
+        print("\n🌦️ Loading weather and news for exogenous features...")
+        exogenous = ExogenousFeatures.load(db, commodities=commodities_to_process, start=start)
+    
+    if use_global:
+        # One columnar load and one model for every market series
+        print("\n🌐 Global model mode")
+        data = loader.load(commodities=[commodity] if commodity else None, start=start)
+        # Raw prices for the baselines and the hierarchy (feature rows omit short series)
+        raw = store.loader.load(commodities=[commodity] if commodity else None, start=start) if use_feature_store else data
+        global_predictor = GlobalPricePredictor()
         
-        df = pd.DataFrame(data)
+        if train:
+            print("\n🎯 Step 2: Training global model...")
+            results = global_predictor.train(data, featurized=use_feature_store)
         
-        # Step 3: Train or Load Model
-        predictor = PricePredictor()
+        print("\n📈 Step 3: Generating 7-day predictions for all series...")
+        if reconcile:
+            forecasts = forecast_hierarchy(global_predictor.predict_batch, raw, 7, reconcile)
+        else:
+            forecasts = global_predictor.predict_batch(data, horizon=7, featurized=use_feature_store, baseline_data=raw)
+    elif workers and workers > 1:
+        print(f"\n⚙️ Processing {len(commodities_to_process)} commodities with {workers} workers...")
+        wall_start = time.perf_counter()
+        forecasts, timings, results = run_commodity_workers(commodities_to_process, workers, {
+            'start': start, 'train': train or '--train' in sys.argv, 'incremental': incremental,
+            'use_feature_store': use_feature_store, 'baselines_only': baselines_only, 'reconcile': reconcile
+        }, PricePredictor(exogenous=exogenous))
+        print_timings(timings, time.perf_counter() - wall_start)
+    else:
+        predictor = PricePredictor(exogenous=exogenous)
+        series_data = {}
         
-        if train or '--train' in sys.argv:
-            print("\n🎯 Step 2: Training model...")
-            results = predictor.train(df)
-            print(f"✅ Training complete: MAE=₹{results['mae']:.2f}, R²={results['r2']:.3f}")
+        # Every commodity's history in one query
+        if not use_feature_store:
+            loader.ensure_indexes()
+        history = split_by_commodity(load_history(loader, commodities_to_process, start))
+        # Feature rows leave out series too short to featurize; the baselines
+        # forecast those from the raw prices
+        raw_history = history
+        if use_feature_store:
+            raw_history = split_by_commodity(load_history(store.loader, commodities_to_process, start))
+        raw_data = {}
         
-        # Step 4: Generate Predictions
-        print("\n📈 Step 3: Generating 7-day predictions...")
-        predictions = predictor.predict_next_7_days(df)
+        for comm in commodities_to_process:
+            print(f"\n{'='*50}")
+            print(f"📊 Processing: {comm}")
+            print(f"{'='*50}")
+            
+            if comm not in raw_history:
+                print(f"⚠️ No data for {comm}. Skipping...")
+                continue
+            
+            raw_data[comm] = raw_history[comm]
+            if comm in history:
+                series_data[comm] = history[comm]
+            
+            n_rows = len(series_data.get(comm, ()))
+            if n_rows < 20:
+                # Still forecast by the baselines, just too little to train on
+                print(f"⚠️ Not enough data to train on {comm} ({n_rows} records), baseline forecast only")
         
-        if predictions:
-            print(f"✅ Generated {len(predictions)} predictions:")
-            for i, pred in enumerate(predictions[:3], 1):
-                print(f"   Day {i}: ₹{pred['predicted_price']}")
+        # Step 3: Train one model version on every commodity
+        version = None
+        if (train or '--train' in sys.argv) and not baselines_only:
+            results = train_on_history(predictor, series_data, use_feature_store, incremental)
+            version = results['version'] if results else None
         
-        # Step 5: Generate Alerts
-        print("\n🚨 Step 4: Generating alerts...")
+        # Step 4: Generate Predictions for every commodity in one batch
+        print(f"\n📈 Step 3: Generating 7-day predictions for {len(raw_data)} commodities...")
+        forecasts = forecast_series(predictor, series_data, use_feature_store, baselines_only, reconcile, version,
+                                    raw_data)
+    
+    # Persist every level for the web app's read API
+    ForecastStore(db).publish(forecasts)
+    
+    for (comm, state, market), predictions in forecasts.items():
+        print(f"\n{'='*50}")
+        print(f"📊 Results: {comm} - {market}, {state}")
+        print(f"{'='*50}")
+        print(f"✅ Generated {len(predictions)} predictions:")
+        for i, pred in enumerate(predictions[:3], 1):
+            print(f"   Day {i}: ₹{pred['predicted_price']}")
+    
+    # Step 5: Generate Alerts for every market series in one batch
+    # (aggregates are for display)
+    print("\n🚨 Step 4: Generating alerts...")
+    owns_alert_gen = alert_gen is None
+    if owns_alert_gen:
         alert_gen = AlertGenerator()
-        alerts = alert_gen.generate_alerts(predictions)
-        
-        if alerts:
-            print(f"✅ Generated {len(alerts)} alerts:")
-            for alert in alerts:
-                print(f"   {alert['type']}: {alert['title']}")
-        else:
-            print("ℹ️ No actionable alerts")
+    alerts = alert_gen.generate_batch({key: preds for key, preds in forecasts.items()
+                                       if level_of(key) == 'market'})
+    
+    if alerts:
+        print(f"✅ Generated {len(alerts)} alerts:")
+        for alert in alerts:
+            print(f"   {alert['type']}: {alert['title']}")
+    else:
+        print("ℹ️ No actionable alerts")
+    # Undelivered alerts stay in the outbox for the next run or the scheduler
+    if owns_alert_gen:
+        alert_gen.close()
     
     print("\n" + "=" * 50)
     print("✅ Pipeline Complete!")
     print("=" * 50)
+    
+    return {'training': results, 'series': len(forecasts), 'alerts': len(alerts)}
 
 if __name__ == "__main__":
+    if '--rollback' in sys.argv:
+        position = sys.argv.index('--rollback') + 1
+        version = int(sys.argv[position]) if position < len(sys.argv) and sys.argv[position].isdigit() else None
+        PricePredictor.rollback(version)
+        sys.exit(0)
+    
     commodity = sys.argv[1] if len(sys.argv) > 1 and not sys.argv[1].startswith('--') else None
     train = '--train' in sys.argv
+    history_days = int(sys.argv[sys.argv.index('--days') + 1]) if '--days' in sys.argv else None
+    use_feature_store = '--feature-store' in sys.argv
+    tune_model = '--tune' in sys.argv
+    incremental = '--incremental' in sys.argv
+    use_global = '--global' in sys.argv
+    use_exogenous = '--exogenous' in sys.argv
+    baselines_only = '--baselines' in sys.argv
+    monitor = '--monitor' in sys.argv
+    workers = int(sys.argv[sys.argv.index('--workers') + 1]) if '--workers' in sys.argv else None
+    reconcile = None
+    if '--hierarchy' in sys.argv:
+        position = sys.argv.index('--hierarchy') + 1
+        reconcile = sys.argv[position] if position < len(sys.argv) and sys.argv[position] in RECONCILE_METHODS else 'mint'
     
-    run_pipeline(commodity=commodity, train=train)
+    run_pipeline(commodity=commodity, train=train or incremental, history_days=history_days,
+                 use_feature_store=use_feature_store, tune_model=tune_model,
+                 incremental=incremental, use_global=use_global, use_exogenous=use_exogenous,
+                 baselines_only=baselines_only, reconcile=reconcile, monitor=monitor,
+                 workers=workers)
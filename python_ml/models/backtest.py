@@ -0,0 +1,268 @@
+"""
+Rolling-Origin Backtesting
+Leak-free evaluation of the price model: every fold trains only on rows
+up to its origin date and forecasts the following 7 days recursively
+"""
+
+import sys
+import os
+import time
+import hashlib
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from threadpoolctl import threadpool_limits
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import BACKTEST_CACHE_DIR, BACKTEST_WORKERS
+from models.feature_engine import build_features, series_bounds, SERIES_KEYS
+from models.price_predictor import PricePredictor, recursive_forecast
+
+
+def rolling_origins(last_date, n_folds=5, horizon=7, step_days=None):
+    """
+    Fold origin dates, most recent last
+
+    The last origin leaves exactly `horizon` days to evaluate; earlier
+    origins are spaced `step_days` apart (default: horizon).
+    """
+    step_days = step_days or horizon
+    last = np.datetime64(last_date, 'D')
+    return [last - horizon - step_days * k for k in range(n_folds - 1, -1, -1)]
+
+
+def _series_ids(df):
+    """Integer id of each row's series in a series-sorted frame"""
+    starts, ends = series_bounds(df)
+    ids = np.zeros(len(df), dtype=np.int64)
+    ids[starts[1:]] = 1
+    return np.cumsum(ids), starts, ends
+
+
+def build_fold(df, series_ids, starts, ends, origin, features, horizon=7,
+               mode='expanding', window_days=None):
+    """
+    Training matrix and evaluation targets for one fold
+
+    Args:
+        df: Feature frame sorted by series and date
+        series_ids, starts, ends: Output of _series_ids(df)
+        origin: Fold origin (datetime64[D]); training uses dates <= origin
+        features: Model feature names
+        horizon: Days evaluated after the origin
+        mode: 'expanding' (all history) or 'sliding' (last window_days)
+
+    Returns:
+        Dict of numpy arrays
+    """
+    days = df['date'].to_numpy(dtype='datetime64[D]')
+    prices = df['modal_price'].to_numpy(dtype=np.float64)
+
+    train_mask = days <= origin
+    if mode == 'sliding':
+        train_mask &= days > origin - window_days
+
+    # Last row at or before the origin for every series, found with one
+    # searchsorted on a (series, day) composite key
+    day_num = days.astype(np.int64)
+    span = day_num.max() - day_num.min() + 1
+    composite = series_ids * span + (day_num - day_num.min())
+    probe = np.arange(len(starts)) * span + (np.int64(origin.astype(np.int64)) - day_num.min())
+    last = np.searchsorted(composite, probe, side='right') - 1
+
+    # Need 7 observed prices before and `horizon` actual prices after
+    usable = (last - 6 >= starts) & (last + horizon <= ends)
+    last = last[usable]
+
+    return {
+        'X_train': df.loc[train_mask, features].to_numpy(dtype=np.float64),
+        'y_train': prices[train_mask],
+        'histories': prices[last[:, None] + np.arange(-6, 1)],
+        'origin': days[last],
+        'actual': prices[last[:, None] + np.arange(1, horizon + 1)],
+        'series': series_ids[last]
+    }
+
+
+def limit_worker_threads(n_threads=1):
+    """Pool initializer: cap BLAS/OpenMP threads per worker process"""
+    threadpool_limits(n_threads)
+
+
+def _predict_ms_per_1k(model, X, repeats=5):
+    """Best-of-N latency of predicting 1,000 rows"""
+    rows = np.resize(X, (1000, X.shape[1]))
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(rows)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _run_fold(fold_path, estimator, features, horizon):
+    """Fit and score one cached fold (runs in a worker process)"""
+    fold = joblib.load(fold_path, mmap_mode='r')
+
+    model = clone(estimator)
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=1)  # the pool already uses every core
+
+    start = time.perf_counter()
+    model.fit(fold['X_train'], fold['y_train'])
+    fit_time = time.perf_counter() - start
+    predict_ms = _predict_ms_per_1k(model, np.asarray(fold['X_train']))
+
+    if len(fold['origin']) == 0:
+        empty = np.empty((0, horizon))
+        return {'abs_error': empty, 'pct_error': empty, 'fit_time': fit_time,
+                'predict_ms_per_1k': predict_ms}
+
+    forecast, _ = recursive_forecast(model, features, np.array(fold['histories']),
+                                     np.array(fold['origin']), horizon)
+    actual = np.array(fold['actual'])
+    abs_error = np.abs(forecast - actual)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct_error = np.where(actual != 0, abs_error / np.abs(actual), np.nan)
+
+    return {'abs_error': abs_error, 'pct_error': pct_error, 'fit_time': fit_time,
+            'predict_ms_per_1k': predict_ms}
+
+
+class Backtester:
+    """
+    Rolling-origin backtest engine
+
+    Fold feature matrices are computed once per (data, fold settings) and
+    cached on disk, so sweeping model settings only pays for fitting.
+    Folds are trained in a process pool and read the cache memory-mapped.
+    """
+
+    def __init__(self, df, n_folds=5, horizon=7, mode='expanding', window_days=365,
+                 step_days=None, featurized=False, features=None,
+                 cache_dir=BACKTEST_CACHE_DIR, workers=BACKTEST_WORKERS):
+        if mode not in ('expanding', 'sliding'):
+            raise ValueError("mode must be 'expanding' or 'sliding'")
+
+        self.df = df if featurized else build_features(df)
+        self.n_folds = n_folds
+        self.horizon = horizon
+        self.mode = mode
+        self.window_days = np.timedelta64(window_days, 'D')
+        self.step_days = step_days
+        self.features = features or PricePredictor().features
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self._fold_paths = None
+
+    def _cache_key(self):
+        """Fingerprint of the feature data and fold settings"""
+        digest = hashlib.sha1()
+        digest.update(pd.util.hash_pandas_object(
+            self.df[SERIES_KEYS + ['date', 'modal_price']], index=False
+        ).to_numpy().tobytes())
+        digest.update(repr((self.n_folds, self.horizon, self.mode, self.window_days,
+                            self.step_days, self.features)).encode())
+        return digest.hexdigest()[:16]
+
+    def fold_paths(self):
+        """Build (or reuse) the cached fold matrices"""
+        if self._fold_paths is not None:
+            return self._fold_paths
+
+        fold_dir = os.path.join(self.cache_dir, self._cache_key())
+        paths = [os.path.join(fold_dir, f'fold_{i}.joblib') for i in range(self.n_folds)]
+
+        if not all(os.path.exists(path) for path in paths):
+            os.makedirs(fold_dir, exist_ok=True)
+            series_ids, starts, ends = _series_ids(self.df)
+            origins = rolling_origins(self.df['date'].max(), self.n_folds, self.horizon, self.step_days)
+
+            for path, origin in zip(paths, origins):
+                fold = build_fold(self.df, series_ids, starts, ends, origin, self.features,
+                                  self.horizon, self.mode, self.window_days)
+                joblib.dump(fold, path)
+
+        self._fold_paths = paths
+        return paths
+
+    def map_folds(self, tasks):
+        """
+        Fit/score (estimator, fold index) pairs, in parallel when possible
+
+        Returns:
+            List of _run_fold results in task order
+        """
+        paths = self.fold_paths()
+        args = [(paths[fold], estimator, self.features, self.horizon) for estimator, fold in tasks]
+
+        if self.workers and self.workers > 1 and len(args) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(args)),
+                                     initializer=limit_worker_threads) as pool:
+                return list(pool.map(_run_fold, *zip(*args)))
+
+        with threadpool_limits(1):
+            return [_run_fold(*arg) for arg in args]
+
+    def run(self, estimator=None, fold_indices=None):
+        """
+        Backtest an (unfitted) estimator
+
+        Args:
+            estimator: sklearn regressor (default: PricePredictor's model)
+            fold_indices: Subset of folds to run (None = all)
+
+        Returns:
+            Report dict with MAE/MAPE per horizon day
+        """
+        estimator = estimator if estimator is not None else PricePredictor().model
+        start = time.perf_counter()
+        fold_indices = range(self.n_folds) if fold_indices is None else fold_indices
+        results = self.map_folds([(estimator, fold) for fold in fold_indices])
+
+        abs_error = np.vstack([r['abs_error'] for r in results])
+        pct_error = np.vstack([r['pct_error'] for r in results])
+
+        if len(abs_error) == 0:
+            print("⚠️ Backtest: no series had enough history around the fold origins")
+            return None
+
+        return {
+            'mae_by_horizon': abs_error.mean(axis=0).round(2).tolist(),
+            'mape_by_horizon': (np.nanmean(pct_error, axis=0) * 100).round(2).tolist(),
+            'mae': float(abs_error.mean()),
+            'mape': float(np.nanmean(pct_error) * 100),
+            'folds': len(results),
+            'forecasts_evaluated': len(abs_error),
+            'fit_time': float(sum(r['fit_time'] for r in results)),
+            'predict_ms_per_1k': float(np.mean([r['predict_ms_per_1k'] for r in results])),
+            'duration': time.perf_counter() - start
+        }
+
+
+def print_report(report):
+    """Pretty-print a backtest report"""
+    print(f"\n📊 Backtest: {report['folds']} folds, {report['forecasts_evaluated']} series forecasts")
+    print(f"{'Day':>5} {'MAE (₹)':>10} {'MAPE (%)':>10}")
+    for day, (mae, mape) in enumerate(zip(report['mae_by_horizon'], report['mape_by_horizon']), 1):
+        print(f"{day:>5} {mae:>10.2f} {mape:>10.2f}")
+    print(f"  Overall: MAE=₹{report['mae']:.2f}, MAPE={report['mape']:.2f}%")
+    print(f"  ⏱️ {report['duration']:.2f}s ({report['fit_time']:.2f}s fitting)")
+
+
+if __name__ == "__main__":
+    from services.market_data_loader import MarketDataLoader
+
+    n_folds = int(sys.argv[sys.argv.index('--folds') + 1]) if '--folds' in sys.argv else 5
+    mode = 'sliding' if '--sliding' in sys.argv else 'expanding'
+
+    data = MarketDataLoader().load()
+    report = Backtester(data, n_folds=n_folds, mode=mode).run()
+
+    if report:
+        print_report(report)
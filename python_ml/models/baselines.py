@@ -0,0 +1,185 @@
+"""
+Closed-Form Baseline Forecasts
+Naive, seasonal-naive, drift, EWMA and damped Holt forecasts for every
+series at once, with a per-series method picked by backtest error. Used
+where the ML model has no forecast (new or sparse markets).
+"""
+
+import numpy as np
+from config import (BASELINE_HISTORY, BASELINE_SEASON, BASELINE_EWMA_ALPHA, BASELINE_HOLT_ALPHA,
+                    BASELINE_HOLT_BETA, BASELINE_HOLT_PHI, BASELINE_BACKTEST_ORIGINS)
+from models.feature_engine import sort_series, series_bounds, SERIES_KEYS
+
+
+def price_matrix(df, history=BASELINE_HISTORY):
+    """
+    Latest prices of every series as a right-aligned matrix
+
+    Args:
+        df: Raw price rows (date, modal_price, commodity, state, market)
+        history: Columns kept per series
+
+    Returns:
+        (keys list, prices (n_series, history) with NaN left padding,
+         last dates datetime64[D])
+    """
+    df, _ = sort_series(df)
+    starts, ends = series_bounds(df)
+    if not len(ends):
+        return [], np.empty((0, history)), np.empty(0, dtype='datetime64[D]')
+
+    index = ends[:, None] + np.arange(-history + 1, 1)
+    prices = df['modal_price'].to_numpy(dtype=np.float64)
+    matrix = np.where(index >= starts[:, None], prices[np.maximum(index, 0)], np.nan)
+
+    keys = list(zip(*(df[key].to_numpy()[ends] for key in SERIES_KEYS)))
+    origin = df['date'].to_numpy(dtype='datetime64[D]')[ends]
+    return keys, matrix, origin
+
+
+def _last(Y):
+    return Y[:, -1]
+
+
+def naive(Y, horizon):
+    """Repeat the last price"""
+    return np.repeat(_last(Y)[:, None], horizon, axis=1)
+
+
+def seasonal_naive(Y, horizon, season=BASELINE_SEASON):
+    """Same weekday last week (naive where a week of history is missing)"""
+    if Y.shape[1] < season:
+        return naive(Y, horizon)
+    columns = Y.shape[1] - season + np.arange(horizon) % season
+    forecast = Y[:, columns]
+    return np.where(np.isnan(forecast), _last(Y)[:, None], forecast)
+
+
+def drift(Y, horizon):
+    """Straight line through the first and last observed price"""
+    observed = ~np.isnan(Y)
+    count = observed.sum(axis=1)
+    first = Y[np.arange(len(Y)), observed.argmax(axis=1)]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.where(count > 1, (_last(Y) - first) / (count - 1), 0.0)
+    return _last(Y)[:, None] + slope[:, None] * np.arange(1, horizon + 1)
+
+
+def _smooth(Y, alpha, beta=None, phi=1.0):
+    """
+    Level (and damped trend) recursions, vectorized over series
+
+    The loop runs over the history columns, not over series.
+    """
+    level = np.full(len(Y), np.nan)
+    trend = np.zeros(len(Y))
+
+    for column in Y.T:
+        has = ~np.isnan(column)
+        start = has & np.isnan(level)
+        update = has & ~start
+        level[start] = column[start]
+
+        previous = level[update]
+        level[update] = alpha * column[update] + (1 - alpha) * (previous + phi * trend[update])
+        if beta is not None:
+            trend[update] = beta * (level[update] - previous) + (1 - beta) * phi * trend[update]
+
+    return level, trend
+
+
+def ewma(Y, horizon, alpha=BASELINE_EWMA_ALPHA):
+    """Simple exponential smoothing: flat forecast at the smoothed level"""
+    level, _ = _smooth(Y, alpha)
+    return np.repeat(level[:, None], horizon, axis=1)
+
+
+def holt(Y, horizon, alpha=BASELINE_HOLT_ALPHA, beta=BASELINE_HOLT_BETA, phi=BASELINE_HOLT_PHI):
+    """Holt's linear trend, damped by phi so long horizons flatten out"""
+    level, trend = _smooth(Y, alpha, beta, phi)
+    damping = np.cumsum(phi ** np.arange(1, horizon + 1))
+    return level[:, None] + trend[:, None] * damping
+
+
+METHODS = {
+    'naive': naive,
+    'seasonal_naive': seasonal_naive,
+    'drift': drift,
+    'ewma': ewma,
+    'holt': holt
+}
+DEFAULT_METHOD = 'naive'  # series too short to backtest
+
+
+class BaselineForecaster:
+    """
+    Per-series choice among the closed-form methods
+
+    Each method forecasts from `n_origins` earlier cut points (the last
+    horizon, 2*horizon, ... prices held out) and the series keeps the
+    method with the lowest mean absolute error on what it could check.
+    Every step is a NumPy expression over the whole (series, history)
+    matrix, so thousands of markets forecast in milliseconds.
+    """
+
+    def __init__(self, history=BASELINE_HISTORY, n_origins=BASELINE_BACKTEST_ORIGINS):
+        self.history = history
+        self.n_origins = n_origins
+        self.methods = list(METHODS)
+
+    def backtest_errors(self, Y, horizon):
+        """
+        Mean absolute error of every method per series
+
+        Returns:
+            Array (n_methods, n_series), NaN where nothing could be checked
+        """
+        errors = np.full((len(self.methods), self.n_origins, len(Y)), np.nan)
+
+        for k in range(1, self.n_origins + 1):
+            cut = Y.shape[1] - k * horizon
+            if cut < 2:
+                break
+            history, actual = Y[:, :cut], Y[:, cut:cut + horizon]
+            checked = ~np.isnan(actual) & ~np.isnan(history[:, -1:])
+
+            for m, name in enumerate(self.methods):
+                abs_error = np.where(checked, np.abs(METHODS[name](history, horizon) - actual), 0.0)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    errors[m, k - 1] = abs_error.sum(axis=1) / checked.sum(axis=1)
+
+        with np.errstate(invalid='ignore'):
+            observed = ~np.isnan(errors)
+            return np.where(observed.any(axis=1),
+                            np.nansum(errors, axis=1) / np.maximum(observed.sum(axis=1), 1), np.nan)
+
+    def select(self, Y, horizon):
+        """Index into self.methods of the best method for each series"""
+        errors = self.backtest_errors(Y, horizon)
+        tested = ~np.isnan(errors).all(axis=0)
+        best = np.argmin(np.where(np.isnan(errors), np.inf, errors), axis=0)
+        return np.where(tested, best, self.methods.index(DEFAULT_METHOD))
+
+    def forecast(self, df, horizon=7):
+        """
+        Forecast every series in the data
+
+        Args:
+            df: Raw price rows for any number of series
+
+        Returns:
+            (keys, forecast (n_series, horizon), target dates, method names)
+        """
+        keys, Y, origin = price_matrix(df, self.history)
+        if not keys:
+            return keys, np.empty((0, horizon)), np.empty((0, horizon), dtype='datetime64[D]'), []
+
+        choice = self.select(Y, horizon)
+        forecast = np.empty((len(Y), horizon))
+        for m, name in enumerate(self.methods):
+            rows = choice == m
+            if rows.any():
+                forecast[rows] = METHODS[name](Y[rows], horizon)
+
+        pred_dates = origin[:, None] + np.arange(1, horizon + 1)
+        return keys, forecast, pred_dates, [self.methods[m] for m in choice]
@@ -0,0 +1,184 @@
+"""
+Exogenous Feature Stage
+Joins state-level weather and rolling per-commodity news sentiment onto
+price feature rows with sorted as-of searches instead of per-row lookups
+"""
+
+import sys
+from datetime import timedelta
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import WEATHER_MAX_AGE_HOURS, NEWS_SENTIMENT_WINDOW_DAYS
+from services.exogenous_loader import ExogenousDataLoader, SENTIMENTS
+
+WEATHER_FEATURES = ['temperature', 'rainfall_1h', 'weather_impact']
+NEWS_FEATURES = [f'news_{name}' for name in SENTIMENTS]
+EXOGENOUS_FEATURES = WEATHER_FEATURES + NEWS_FEATURES
+
+
+def _shared_codes(left_keys, right_keys):
+    """Integer codes for both key arrays over one category list"""
+    categories = pd.Index(pd.unique(np.asarray(right_keys, dtype=object)))
+    left = pd.Categorical(left_keys, categories=categories).codes.astype(np.int64)
+    right = pd.Categorical(right_keys, categories=categories).codes.astype(np.int64)
+    return left, right
+
+
+def _seconds(times):
+    return np.asarray(times, dtype='datetime64[s]').astype(np.int64)
+
+
+class SortedEvents:
+    """
+    Keyed event times packed into one sorted composite array
+
+    key * span + (time - t0) orders events by key then time, so one
+    np.searchsorted answers "last event of this key before t" for every
+    query row at once: O((n + m) log m) for n queries over m events.
+    """
+
+    def __init__(self, keys, times, t0, span):
+        self.t0 = t0
+        self.span = span
+        self.keys = np.asarray(keys, dtype=np.int64)
+        self.composite = self.keys * span + (_seconds(times) - t0)
+        self.order = np.argsort(self.composite, kind='stable')
+        self.composite = self.composite[self.order]
+        self.keys = self.keys[self.order]
+
+    @classmethod
+    def for_queries(cls, keys, times, query_times, pad_seconds=0):
+        """Size the time span to cover both the events and the queries"""
+        event_seconds = _seconds(times)
+        query_seconds = _seconds(query_times)
+        both = np.concatenate([event_seconds, query_seconds])
+        t0 = int(both.min()) - pad_seconds if len(both) else 0
+        span = int(both.max()) - t0 + 1 if len(both) else 1
+        return cls(keys, times, t0, span)
+
+    def position(self, keys, times):
+        """Insertion point of (key, time): events strictly before it come first"""
+        offset = np.clip(_seconds(times) - self.t0, 0, self.span - 1)
+        return np.searchsorted(self.composite, np.asarray(keys, dtype=np.int64) * self.span + offset,
+                               side='left')
+
+    def latest_before(self, keys, times):
+        """Original index of the latest same-key event strictly before each time (-1 if none)"""
+        position = self.position(keys, times) - 1
+        found = position >= 0
+        found[found] = self.keys[position[found]] == np.asarray(keys)[found]
+        return np.where(found, self.order[np.maximum(position, 0)], -1)
+
+
+class ExogenousFeatures:
+    """
+    Weather and news columns for price rows
+
+    Every value is taken strictly before the row's date, so a row never
+    sees information from its own trading day and the same lookup serves
+    forecasting (the target date's features are the latest known ones).
+    Weather older than `max_weather_age_hours` counts as missing; missing
+    weather is filled with the median temperature, no rain and a neutral
+    impact. News counts cover the trailing `news_window_days`.
+    """
+
+    def __init__(self, weather, news, max_weather_age_hours=WEATHER_MAX_AGE_HOURS,
+                 news_window_days=NEWS_SENTIMENT_WINDOW_DAYS):
+        self.weather = weather
+        self.news = news
+        self.max_weather_age = int(max_weather_age_hours * 3600)
+        self.news_window = int(news_window_days * 86400)
+        temperature = weather['temperature'].to_numpy(dtype=np.float64)
+        self.temperature_fill = float(np.nanmedian(temperature)) if np.isfinite(temperature).any() else 0.0
+
+    @classmethod
+    def load(cls, db=None, commodities=None, start=None, **kwargs):
+        """
+        Read weather and news covering price rows from `start` onwards
+
+        Args:
+            db: Mongo database (None = default connection)
+            commodities: Commodities whose news to load (None = all)
+            start: Earliest price date that will be joined (None = all history)
+        """
+        max_age = kwargs.get('max_weather_age_hours', WEATHER_MAX_AGE_HOURS)
+        window = kwargs.get('news_window_days', NEWS_SENTIMENT_WINDOW_DAYS)
+
+        loader = ExogenousDataLoader(db)
+        weather = loader.load_weather(start=start - timedelta(hours=max_age) if start else None)
+        news = loader.load_news(commodities, start=start - timedelta(days=window) if start else None)
+        print(f"🌦️ Loaded {len(weather):,} weather readings and {len(news):,} news items")
+        return cls(weather, news, **kwargs)
+
+    def weather_columns(self, states, times):
+        """Latest fresh weather reading of each row's state before its time"""
+        if not len(self.weather):
+            return {'temperature': np.full(len(times), self.temperature_fill),
+                    'rainfall_1h': np.zeros(len(times)),
+                    'weather_impact': np.zeros(len(times))}
+
+        query_keys, event_keys = _shared_codes(states, self.weather['state'].to_numpy())
+        events = SortedEvents.for_queries(event_keys, self.weather['timestamp'].to_numpy(), times)
+        index = events.latest_before(query_keys, times)
+
+        found = index >= 0
+        age = _seconds(times) - _seconds(self.weather['timestamp'].to_numpy())[np.maximum(index, 0)]
+        found &= age <= self.max_weather_age
+        index = np.maximum(index, 0)
+
+        def take(column, fill):
+            return np.where(found, self.weather[column].to_numpy(dtype=np.float64)[index], fill)
+
+        return {
+            'temperature': take('temperature', self.temperature_fill),
+            'rainfall_1h': take('rainfall_1h', 0.0),
+            'weather_impact': take('weather_impact', 0.0)
+        }
+
+    def news_columns(self, commodities, times):
+        """Per-sentiment news counts for each row's commodity in the trailing window"""
+        query_keys, event_keys = _shared_codes(commodities, self.news['commodity'].to_numpy())
+        events = SortedEvents.for_queries(event_keys, self.news['published_at'].to_numpy(), times,
+                                          pad_seconds=self.news_window)
+
+        # Window count = difference of cumulative counts at its two edges
+        window_start = np.asarray(times, dtype='datetime64[s]') - np.timedelta64(self.news_window, 's')
+        upper = events.position(query_keys, times)
+        lower = events.position(query_keys, window_start)
+
+        columns = {}
+        for name in SENTIMENTS:
+            flags = self.news[name].to_numpy(dtype=np.int64)[events.order]
+            cumulative = np.concatenate([[0], np.cumsum(flags)])
+            columns[f'news_{name}'] = (cumulative[upper] - cumulative[lower]).astype(np.float64)
+        return columns
+
+    def columns(self, states, commodities, times):
+        """All exogenous feature columns for aligned state/commodity/time arrays"""
+        times = np.asarray(times, dtype='datetime64[ns]')
+        columns = self.weather_columns(states, times)
+        columns.update(self.news_columns(commodities, times))
+        return columns
+
+    def join(self, df):
+        """Feature frame with EXOGENOUS_FEATURES added (row order unchanged)"""
+        columns = self.columns(df['state'], df['commodity'], df['date'].to_numpy(dtype='datetime64[ns]'))
+        return df.assign(**columns)
+
+    def latest(self, keys, origin):
+        """
+        Exogenous columns for forecasting from each series' origin
+
+        Args:
+            keys: List of (commodity, state, market) tuples
+            origin: datetime64[D] array with each series' last observed date
+
+        Returns:
+            Dict of arrays aligned with keys, held fixed over the horizon
+        """
+        target = (np.asarray(origin, dtype='datetime64[D]') + 1).astype('datetime64[ns]')
+        return self.columns([k[1] for k in keys], [k[0] for k in keys], target)
@@ -0,0 +1,154 @@
+"""
+Vectorized Multi-Series Feature Engine
+Builds lag / rolling / calendar features for every (commodity, state, market)
+series in one sort and one pass over contiguous NumPy segments
+"""
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+SERIES_KEYS = ['commodity', 'state', 'market']
+ROLLING_WINDOW = 7
+
+
+def _as_categorical(df):
+    """Categorical series keys (missing keys become 'Unknown')"""
+    for key in SERIES_KEYS:
+        if key not in df:
+            df[key] = pd.Categorical(['Unknown'] * len(df))
+        elif not isinstance(df[key].dtype, pd.CategoricalDtype):
+            df[key] = df[key].fillna('Unknown').astype('category')
+    return df
+
+
+def sort_series(df):
+    """
+    Sort rows by series key then date with a single lexsort
+
+    Returns:
+        (sorted DataFrame, segment start flags)
+    """
+    df = _as_categorical(df.copy())
+    dates = pd.to_datetime(df['date']).to_numpy(dtype='datetime64[ns]')
+    codes = [df[key].cat.codes.to_numpy() for key in SERIES_KEYS]
+
+    # np.lexsort uses the last key as primary
+    order = np.lexsort([dates] + codes[::-1])
+    df = df.iloc[order].reset_index(drop=True)
+    df['date'] = dates[order]
+
+    sorted_codes = np.column_stack([c[order] for c in codes])
+    starts = np.ones(len(df), dtype=bool)
+    if len(df) > 1:
+        starts[1:] = (sorted_codes[1:] != sorted_codes[:-1]).any(axis=1)
+
+    return df, starts
+
+
+def series_bounds(df):
+    """
+    First and last row index of every series in a series-sorted frame
+
+    Returns:
+        (start indices, end indices)
+    """
+    if len(df) == 0:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty
+
+    codes = np.column_stack([df[key].cat.codes.to_numpy() for key in SERIES_KEYS])
+    change = np.flatnonzero((codes[1:] != codes[:-1]).any(axis=1)) + 1
+    starts = np.concatenate([[0], change])
+    ends = np.concatenate([change - 1, [len(df) - 1]])
+    return starts, ends
+
+
+def series_tails(df, window=ROLLING_WINDOW):
+    """
+    Latest `window` prices and last date of every series with enough rows
+
+    Args:
+        df: Feature frame sorted by series and date
+
+    Returns:
+        (keys list, histories (n_series, window), last dates datetime64[D],
+         number of series skipped for lack of history)
+    """
+    starts, ends = series_bounds(df)
+    enough = ends - starts + 1 >= window
+    ends = ends[enough]
+
+    keys = list(zip(*(df[key].to_numpy()[ends] for key in SERIES_KEYS)))
+    prices = df['modal_price'].to_numpy(dtype=np.float64)
+    histories = prices[ends[:, None] + np.arange(-window + 1, 1)].reshape(len(ends), window)
+    origin = df['date'].to_numpy(dtype='datetime64[D]')[ends]
+
+    return keys, histories, origin, int((~enough).sum())
+
+
+def _position_in_segment(starts):
+    """Row index within its own series (0 at each series start)"""
+    idx = np.arange(len(starts))
+    segment_start = np.maximum.accumulate(np.where(starts, idx, 0))
+    return idx - segment_start
+
+
+def _shift(values, k, position):
+    """Shift by k rows within each series (NaN where history is missing)"""
+    out = np.full(len(values), np.nan, dtype=values.dtype)
+    if len(values) > k:
+        out[k:] = values[:-k]
+    out[position < k] = np.nan
+    return out
+
+
+def build_features(df, window=ROLLING_WINDOW):
+    """
+    Compute every model feature for all series at once
+
+    Rolling statistics cover the `window` previous prices (lag_1..lag_window),
+    the same window RollingPriceState carries forward while forecasting.
+
+    Args:
+        df: Raw price rows (date, modal_price, commodity[, state, market])
+        window: Rolling window length in rows
+
+    Returns:
+        Feature DataFrame with rows lacking full history dropped
+    """
+    df, starts = sort_series(df)
+    prices = df['modal_price'].to_numpy(dtype=np.float32)
+    df['modal_price'] = prices
+    position = _position_in_segment(starts)
+
+    # Lag features
+    lag_1 = _shift(prices, 1, position)
+    df['price_lag_1'] = lag_1
+    df['price_lag_7'] = _shift(prices, 7, position)
+
+    # Rolling statistics over lag_1: window ending at the previous row
+    ma = np.full(len(df), np.nan, dtype=np.float32)
+    std = np.full(len(df), np.nan, dtype=np.float32)
+    if len(df) >= window:
+        windows = sliding_window_view(lag_1.astype(np.float64), window)
+        ma[window - 1:] = windows.mean(axis=1)
+        std[window - 1:] = windows.std(axis=1, ddof=1)
+    incomplete = position < window  # window would cross a series boundary
+    ma[incomplete] = np.nan
+    std[incomplete] = np.nan
+    df['price_ma_7'] = ma
+    df['price_std_7'] = std
+
+    # Time features
+    days = df['date'].to_numpy(dtype='datetime64[D]')
+    df['day_of_week'] = ((days.astype(np.int64) + 3) % 7).astype(np.int8)  # 1970-01-01 was a Thursday
+    df['month'] = (days.astype('datetime64[M]').astype(np.int64) % 12 + 1).astype(np.int8)
+
+    # Price change percentage
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df['pricechange_pct'] = prices / lag_1 - 1
+
+    feature_cols = ['price_lag_1', 'price_lag_7', 'price_ma_7', 'price_std_7', 'pricechange_pct']
+    valid = ~np.isnan(df[feature_cols].to_numpy()).any(axis=1) & ~np.isnan(prices)
+    return df[valid].reset_index(drop=True)
@@ -0,0 +1,132 @@
+"""
+Flat-Array Forest Inference
+Exports a fitted random forest into contiguous NumPy arrays and scores
+them vectorized over trees and rows, without sklearn's per-call overhead
+"""
+
+import sys
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+LEAF = -1  # sklearn's TREE_LEAF
+
+
+class FlatForest:
+    """
+    All trees of a forest packed into shared node arrays
+
+    Node i of the packed forest has feature[i], threshold[i], left[i],
+    right[i] and value[i]. Leaves point to themselves, so walking every
+    (row, tree) pair for max_depth steps lands each one on its leaf with
+    no per-tree Python loop. predict() matches sklearn's float32 input
+    casting, so results are identical to the source model.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_features_in_ = n_features
+
+    @classmethod
+    def supports(cls, model):
+        """Forests of single-output regression trees (RandomForest, ExtraTrees)"""
+        estimators = getattr(model, 'estimators_', None)
+        return (
+            isinstance(estimators, list) and len(estimators) > 0
+            and hasattr(estimators[0], 'tree_')
+            and getattr(model, 'n_outputs_', 1) == 1
+        )
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Pack a fitted sklearn forest"""
+        if not cls.supports(model):
+            raise TypeError(f"{type(model).__name__} is not a fitted single-output tree forest")
+
+        trees = [est.tree_ for est in model.estimators_]
+        sizes = np.array([tree.node_count for tree in trees])
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+        feature, threshold, left, right, value = [], [], [], [], []
+        for tree, offset in zip(trees, offsets):
+            nodes = np.arange(tree.node_count)
+            is_leaf = tree.children_left == LEAF
+
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+            left.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+            right.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+            value.append(tree.value[:, 0, 0])
+
+        # Leaves: threshold +inf keeps them on the self-pointing left branch
+        threshold = np.concatenate(threshold)
+        is_leaf_all = np.concatenate(left) == np.arange(sizes.sum())
+        threshold[is_leaf_all] = np.inf
+
+        return cls(
+            feature=np.concatenate(feature).astype(np.intp),
+            threshold=threshold.astype(np.float64),
+            left=np.concatenate(left).astype(np.intp),
+            right=np.concatenate(right).astype(np.intp),
+            value=np.concatenate(value).astype(np.float64),
+            roots=offsets.astype(np.intp),
+            max_depth=int(max(tree.max_depth for tree in trees)),
+            n_features=int(model.n_features_in_)
+        )
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    def leaf_values(self, X):
+        """
+        Per-tree predictions
+
+        Args:
+            X: Array (n_rows, n_features)
+
+        Returns:
+            Array (n_rows, n_trees)
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], len(self.roots))).copy()
+
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        return self.value[nodes]
+
+    def predict(self, X):
+        """Forest mean prediction (drop-in for RandomForestRegressor.predict)"""
+        return self.leaf_values(X).mean(axis=1)
+
+
+if __name__ == "__main__":
+    # Export flat arrays for the current model version
+    import joblib
+    from models.price_predictor import PricePredictor, model_versions
+
+    current = model_versions.current()
+    if current is None:
+        print("❌ No versioned model found. Train first.")
+        sys.exit(1)
+
+    model = joblib.load(current['path'])
+    if not FlatForest.supports(model):
+        print(f"ℹ️ {type(model).__name__} cannot be flattened")
+        sys.exit(0)
+
+    entry = PricePredictor.export_flat(model, current)
+    print(f"✅ Exported flat forest for v{current['version']}: {entry['flat_path']}")
@@ -0,0 +1,244 @@
+"""
+Global Cross-Series Price Model
+One gradient-boosted model trained over every (commodity, state, market)
+series, forecasting all of them in a single batched call
+"""
+
+import sys
+import os
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.metrics import mean_absolute_error, r2_score
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import GLOBAL_MODEL_PARAMS, GLOBAL_MAX_CATEGORIES
+from models.feature_engine import build_features, series_tails, SERIES_KEYS
+from models.model_registry import registry
+from models.model_versions import ModelVersionStore
+from models.price_predictor import MODEL_DIR, PricePredictor, recursive_forecast, format_forecasts
+
+GLOBAL_FEATURES = [
+    'rel_lag_1', 'rel_lag_7', 'rel_std_7', 'log_level', 'series_volatility',
+    'day_of_week', 'month', 'commodity_code', 'state_code'
+]
+CATEGORICAL_FEATURES = ['commodity_code', 'state_code']
+
+global_versions = ModelVersionStore(MODEL_DIR, 'global_price_model')
+
+
+def normalized_columns(columns):
+    """
+    Scale-free features shared by training and forecasting
+
+    Prices are expressed relative to the series' 7-day mean so one model
+    can serve ₹500 vegetables and ₹7000 cotton alike.
+    """
+    ma = np.maximum(np.asarray(columns['price_ma_7'], dtype=np.float64), 1e-6)
+    columns = dict(columns)
+    columns['rel_lag_1'] = columns['price_lag_1'] / ma - 1
+    columns['rel_lag_7'] = columns['price_lag_7'] / ma - 1
+    columns['rel_std_7'] = columns['price_std_7'] / ma
+    columns['log_level'] = np.log(ma)
+    return columns
+
+
+def decode_target(prediction, columns):
+    """Relative deviation from the 7-day mean back to a price"""
+    return columns['price_ma_7'] * (1 + prediction)
+
+
+class GlobalPricePredictor:
+    """
+    Single model for all market series
+
+    Series enter the model through encodings instead of separate model
+    files: native categorical codes for commodity and state, the current
+    price level, and each market's typical relative volatility learned at
+    training time (unseen markets fall back to their commodity's value).
+    """
+
+    def __init__(self):
+        self.model = HistGradientBoostingRegressor(
+            categorical_features=[GLOBAL_FEATURES.index(f) for f in CATEGORICAL_FEATURES],
+            **GLOBAL_MODEL_PARAMS
+        )
+        self.encodings = None
+
+    def fit_encodings(self, df):
+        """Category codes and per-series volatility from training rows"""
+        top_commodities = df['commodity'].value_counts().index[:GLOBAL_MAX_CATEGORIES]
+        top_states = df['state'].value_counts().index[:GLOBAL_MAX_CATEGORIES]
+
+        rel_std = (df['price_std_7'] / df['price_ma_7'].clip(lower=1e-6)).astype(np.float64)
+        keys = df[SERIES_KEYS].astype(object)
+
+        return {
+            'commodities': {value: code for code, value in enumerate(top_commodities)},
+            'states': {value: code for code, value in enumerate(top_states)},
+            'series_volatility': rel_std.groupby(pd.MultiIndex.from_frame(keys)).median(),
+            'commodity_volatility': rel_std.groupby(keys['commodity'].to_numpy()).median(),
+            'global_volatility': float(rel_std.median())
+        }
+
+    def encode(self, keys, encodings):
+        """
+        Static per-series encoding columns
+
+        Args:
+            keys: List of (commodity, state, market) tuples
+
+        Returns:
+            Dict of arrays aligned with keys
+        """
+        commodities = [k[0] for k in keys]
+        index = pd.MultiIndex.from_tuples(keys, names=SERIES_KEYS)
+
+        volatility = encodings['series_volatility'].reindex(index).to_numpy()
+        fallback = encodings['commodity_volatility'].reindex(commodities).to_numpy()
+        volatility = np.where(np.isnan(volatility), fallback, volatility)
+        volatility = np.where(np.isnan(volatility), encodings['global_volatility'], volatility)
+
+        return {
+            # Unknown categories become NaN, which the model treats as missing
+            'commodity_code': np.array([encodings['commodities'].get(c, np.nan) for c in commodities]),
+            'state_code': np.array([encodings['states'].get(k[1], np.nan) for k in keys]),
+            'series_volatility': volatility
+        }
+
+    def _row_encodings(self, df, encodings):
+        """Encoding columns for every training row (one lookup per series)"""
+        codes = df.groupby(SERIES_KEYS, observed=True, sort=False).ngroup().to_numpy()
+        first = np.unique(codes, return_index=True)[1]
+        keys = list(zip(*(df[key].to_numpy()[first] for key in SERIES_KEYS)))
+        static = self.encode(keys, encodings)
+        return {name: values[codes] for name, values in static.items()}
+
+    def training_matrix(self, df, encodings):
+        """Feature matrix and normalized target for feature rows"""
+        columns = {name: df[name].to_numpy(dtype=np.float64) for name in
+                   ['price_lag_1', 'price_lag_7', 'price_ma_7', 'price_std_7', 'day_of_week', 'month']}
+        columns.update(self._row_encodings(df, encodings))
+        columns = normalized_columns(columns)
+
+        X = np.column_stack([columns[name] for name in GLOBAL_FEATURES])
+        y = df['modal_price'].to_numpy(dtype=np.float64) / np.maximum(columns['price_ma_7'], 1e-6) - 1
+        return X, y
+
+    def train(self, df, featurized=False):
+        """
+        Train one model over every series
+
+        Args:
+            df: Raw price rows for all series (e.g. MarketDataLoader.load())
+            featurized: Input already holds FeatureStore rows
+
+        Returns:
+            Dict with holdout mae/r2 (in ₹) and the saved version
+        """
+        if not featurized:
+            print("📊 Preparing features for all series...")
+            df = build_features(df)
+
+        # Chronological holdout: the latest 20% of dates
+        dates = df['date'].to_numpy(dtype='datetime64[ns]')
+        unique_dates = np.unique(dates)
+        is_test = dates >= unique_dates[int(len(unique_dates) * 0.8)]
+
+        encodings = self.fit_encodings(df[~is_test])
+        X, y = self.training_matrix(df, encodings)
+
+        n_series = df.groupby(SERIES_KEYS, observed=True).ngroups
+        print(f"🎯 Training global model on {len(df):,} rows from {n_series:,} series...")
+        self.model.fit(X[~is_test], y[~is_test])
+
+        # Evaluate in rupees
+        ma = df['price_ma_7'].to_numpy(dtype=np.float64)[is_test]
+        predictions = ma * (1 + self.model.predict(X[is_test]))
+        actual = df['modal_price'].to_numpy(dtype=np.float64)[is_test]
+        mae = mean_absolute_error(actual, predictions)
+        r2 = r2_score(actual, predictions)
+        print(f"✅ Global Model Trained - MAE: ₹{mae:.2f}, R²: {r2:.3f}")
+
+        # Refit encodings on all rows so the artifact knows every market
+        self.encodings = self.fit_encodings(df)
+        os.makedirs(MODEL_DIR, exist_ok=True)
+        entry = global_versions.save(
+            {'model': self.model, 'encodings': self.encodings, 'features': GLOBAL_FEATURES},
+            mode='full', mae=mae, r2=r2, baseline_mae=mae, n_series=n_series,
+            trained_through=pd.Timestamp(df['date'].max()).isoformat(), n_rows=len(df)
+        )
+        print(f"💾 Saved global model v{entry['version']}")
+
+        return {'mae': mae, 'r2': r2, 'mode': 'full', 'version': entry['version']}
+
+    def load_artifact(self):
+        """Current global artifact through the shared registry"""
+        current = global_versions.current()
+        if current is None:
+            raise FileNotFoundError("No global model trained yet")
+        return registry.get(current['path'], version=current['version'])
+
+    def predict_batch(self, df, horizon=7, featurized=False, fallback=True, baseline_data=None):
+        """
+        Forecast every series in the data with one model call per step
+
+        Args:
+            fallback: Forecast series the model cannot with the closed-form
+                baselines
+            baseline_data: Raw price rows for the fallback (default: df);
+                needed with featurized=True, whose rows omit short series
+
+        Returns:
+            Dict of (commodity, state, market) -> list of prediction dicts
+        """
+        forecasts = self._predict_model(df, horizon, featurized)
+
+        if fallback:
+            baseline = PricePredictor.predict_baselines(df if baseline_data is None else baseline_data, horizon)
+            missing = {key: preds for key, preds in baseline.items() if key not in forecasts}
+            if missing:
+                print(f"📐 Baseline forecasts for {len(missing)} series without a model forecast")
+            forecasts.update(missing)
+
+        return forecasts
+
+    def _predict_model(self, df, horizon, featurized):
+        """Global-model forecasts for every series with enough history"""
+        try:
+            artifact = self.load_artifact()
+        except FileNotFoundError:
+            print("❌ Global model not found. Train with --global --train first.")
+            return {}
+
+        df = df if featurized else build_features(df)
+        keys, histories, origin, skipped = series_tails(df)
+
+        if skipped:
+            print(f"⚠️ Not enough data for prediction of {skipped} series (need >7 rows each)")
+        if not keys:
+            return {}
+
+        forecast, pred_dates = recursive_forecast(
+            artifact['model'], artifact['features'], histories, origin, horizon,
+            static_columns=self.encode(keys, artifact['encodings']),
+            derive=normalized_columns,
+            decode=decode_target
+        )
+
+        return format_forecasts(keys, forecast, pred_dates)
+
+
+if __name__ == "__main__":
+    from services.market_data_loader import MarketDataLoader
+
+    data = MarketDataLoader().load()
+    predictor = GlobalPricePredictor()
+
+    if '--train' in sys.argv:
+        predictor.train(data)
+
+    forecasts = predictor.predict_batch(data)
+    print(f"\n📈 Forecast {len(forecasts)} series in one batch")
@@ -0,0 +1,195 @@
+"""
+Hierarchical Forecast Reconciliation
+Market, state and national forecasts per commodity from one batch, made
+coherent with a sparse aggregation matrix (bottom-up or MinT/WLS)
+"""
+
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.linalg import spsolve
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models.baselines import price_matrix
+from models.feature_engine import SERIES_KEYS
+
+AGGREGATE = 'All'  # state/market value of aggregated series
+RECONCILE_METHODS = ('bottom_up', 'mint')
+
+
+def level_of(key):
+    """Hierarchy level of a (commodity, state, market) key"""
+    if key[1] == AGGREGATE:
+        return 'national'
+    if key[2] == AGGREGATE:
+        return 'state'
+    return 'market'
+
+
+def with_aggregates(df):
+    """
+    Price rows plus state- and national-level series
+
+    Aggregates are the daily mean modal price over the markets reporting
+    that day (equal weights; arrivals are not loaded). State series get
+    market='All', national series get state='All' and market='All'.
+    """
+    df = df[['date', 'modal_price'] + SERIES_KEYS].astype({key: str for key in SERIES_KEYS})
+
+    state = df.groupby(['commodity', 'state', 'date'], sort=False)['modal_price'].mean().reset_index()
+    state['market'] = AGGREGATE
+    national = df.groupby(['commodity', 'date'], sort=False)['modal_price'].mean().reset_index()
+    national['state'] = AGGREGATE
+    national['market'] = AGGREGATE
+
+    return pd.concat([df, state, national], ignore_index=True)
+
+
+class Hierarchy:
+    """
+    commodity -> state -> market tree over a set of market series
+
+    S maps the n_bottom market forecasts to every node (markets first,
+    then states, then national) and stays sparse: each aggregate row
+    holds 1/n for its n markets. Commodities never share a market, so the
+    normal equations of MinT are block diagonal and solve in one sparse
+    factorization.
+    """
+
+    def __init__(self, bottom_keys):
+        self.bottom = list(bottom_keys)
+        bottom = pd.DataFrame(self.bottom, columns=SERIES_KEYS)
+
+        state_codes, state_keys = pd.factorize(pd.MultiIndex.from_frame(bottom[['commodity', 'state']]))
+        national_codes, national_keys = pd.factorize(bottom['commodity'])
+
+        self.nodes = (
+            self.bottom
+            + [(commodity, state, AGGREGATE) for commodity, state in state_keys]
+            + [(commodity, AGGREGATE, AGGREGATE) for commodity in national_keys]
+        )
+        self.index = {key: i for i, key in enumerate(self.nodes)}
+
+        n_bottom = len(self.bottom)
+        columns = np.arange(n_bottom)
+        state_rows = n_bottom + state_codes
+        national_rows = n_bottom + len(state_keys) + national_codes
+
+        # Averaging weights: 1 / markets under the aggregate
+        state_weights = 1.0 / np.bincount(state_codes)[state_codes]
+        national_weights = 1.0 / np.bincount(national_codes)[national_codes]
+
+        self.S = sparse.csr_matrix((
+            np.concatenate([np.ones(n_bottom), state_weights, national_weights]),
+            (np.concatenate([columns, state_rows, national_rows]), np.tile(columns, 3))
+        ), shape=(len(self.nodes), n_bottom))
+
+    def reconcile(self, base, method='mint', variances=None):
+        """
+        Coherent forecasts for every node
+
+        Args:
+            base: Array (n_nodes, horizon) of base forecasts, NaN where a
+                node has none
+            method: 'bottom_up' (aggregate the market forecasts) or 'mint'
+                (weighted least squares projection using all levels)
+            variances: Per-node forecast variance for MinT weights
+                (None = equal weights, i.e. OLS)
+
+        Returns:
+            Array (n_nodes, horizon)
+        """
+        if method not in RECONCILE_METHODS:
+            raise ValueError(f"method must be one of {RECONCILE_METHODS}")
+
+        n_bottom = len(self.bottom)
+        if method == 'bottom_up':
+            return self.S @ base[:n_bottom]
+
+        # Nodes without a base forecast get zero weight
+        has_base = ~np.isnan(base).any(axis=1)
+        variances = np.ones(len(self.nodes)) if variances is None else np.asarray(variances, dtype=np.float64)
+        weights = np.where(has_base & (variances > 0), 1.0 / np.where(variances > 0, variances, 1.0), 0.0)
+
+        # Markets with no forecast of their own keep a tiny weight on the
+        # bottom-up identity so the system stays solvable
+        weights[:n_bottom] = np.maximum(weights[:n_bottom], 1e-9)
+
+        W_inv = sparse.diags(weights)
+        normal = (self.S.T @ W_inv @ self.S).tocsc()
+        rhs = self.S.T @ (W_inv @ np.nan_to_num(base))
+        bottom = spsolve(normal, rhs)
+        return self.S @ bottom.reshape(n_bottom, -1)
+
+
+def change_variances(df, keys):
+    """Variance of day-over-day price changes per series (MinT weights)"""
+    series_keys, Y, _ = price_matrix(df)
+    with np.errstate(invalid='ignore'):
+        variance = pd.Series(np.nanvar(np.diff(Y, axis=1), axis=1),
+                             index=pd.MultiIndex.from_tuples(series_keys))
+    variance = variance.reindex(pd.MultiIndex.from_tuples(keys)).to_numpy()
+    fallback = np.nanmedian(variance) if np.isfinite(variance).any() else 1.0
+    return np.where(np.isfinite(variance) & (variance > 0), variance, fallback)
+
+
+def forecast_hierarchy(predict, series_data, horizon=7, method='mint'):
+    """
+    Forecast and reconcile markets, states and the national series
+
+    Args:
+        predict: Batch forecaster callable(df, horizon) -> dict of series
+            forecasts (e.g. PricePredictor().predict_batch)
+        series_data: Raw price DataFrame, or dict of DataFrames
+        horizon: Number of days to forecast
+        method: 'bottom_up' or 'mint'
+
+    Returns:
+        Dict of (commodity, state, market) -> prediction dicts, with
+        aggregates keyed by 'All' and every dict tagged with its level
+    """
+    if isinstance(series_data, dict):
+        if not series_data:
+            return {}
+        series_data = pd.concat(series_data.values(), ignore_index=True)
+
+    df = with_aggregates(series_data)
+
+    # One batch covers every level
+    forecasts = predict(df, horizon)
+    bottom = [key for key in forecasts if level_of(key) == 'market']
+    if not bottom:
+        return forecasts
+
+    hierarchy = Hierarchy(bottom)
+    base = np.full((len(hierarchy.nodes), horizon), np.nan)
+    for key, i in hierarchy.index.items():
+        if key in forecasts:
+            base[i] = [pred['predicted_price'] for pred in forecasts[key]]
+
+    variances = change_variances(df, hierarchy.nodes) if method == 'mint' else None
+    reconciled = hierarchy.reconcile(base, method, variances)
+    print(f"🧮 Reconciled {len(hierarchy.nodes)} series ({len(bottom)} markets) with {method}")
+
+    results = {}
+    for key, i in hierarchy.index.items():
+        # Aggregates without a base forecast take dates from one of their markets
+        first_market = hierarchy.bottom[hierarchy.S.indices[hierarchy.S.indptr[i]]]
+        predictions = forecasts.get(key) or [
+            {'date': pred['date'], 'commodity': key[0], 'state': key[1], 'market': key[2],
+             'day': pred['day']} for pred in forecasts[first_market]
+        ]
+        for step, pred in enumerate(predictions):
+            price = round(float(reconciled[i, step]), 2)
+            # Keep the band width, centred on the reconciled forecast
+            shift = price - pred.get('predicted_price', price)
+            if 'lower_price' in pred:
+                pred['lower_price'] = round(pred['lower_price'] + shift, 2)
+                pred['upper_price'] = round(pred['upper_price'] + shift, 2)
+            pred['predicted_price'] = price
+            pred['level'] = level_of(key)
+        results[key] = predictions
+    return results
@@ -0,0 +1,96 @@
+"""
+In-memory Model Registry
+Keeps trained model artifacts loaded between predictions instead of
+unpickling them from disk on every call
+"""
+
+import os
+import threading
+from collections import OrderedDict
+import joblib
+from config import MODEL_CACHE_SIZE, MODEL_MMAP_MODE
+
+
+class ModelRegistry:
+    """
+    LRU cache of loaded model artifacts keyed by file path
+
+    An entry is reused as long as the artifact on disk is unchanged
+    (same mtime and size) and the requested version matches the one
+    that was loaded. With mmap_mode='r' the numpy arrays inside the
+    pickle are memory-mapped, so worker processes loading the same
+    artifact share the OS page cache instead of each holding a copy.
+    """
+
+    def __init__(self, max_models=MODEL_CACHE_SIZE, mmap_mode=MODEL_MMAP_MODE):
+        self.max_models = max_models
+        self.mmap_mode = mmap_mode
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+
+    def _signature(self, path):
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def get(self, path, version=None):
+        """
+        Return the model stored at path, loading it only if needed
+
+        Args:
+            path: Artifact path (joblib pickle)
+            version: Optional version tag; a different tag forces a reload
+
+        Returns:
+            Loaded model object
+
+        Raises:
+            FileNotFoundError: If the artifact does not exist
+        """
+        key = os.path.abspath(path)
+        signature = self._signature(key)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry['signature'] == signature and entry['version'] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry['model']
+
+        model = joblib.load(key, mmap_mode=self.mmap_mode)
+
+        with self._lock:
+            self._entries[key] = {
+                'model': model,
+                'signature': signature,
+                'version': version
+            }
+            self._entries.move_to_end(key)
+            self.loads += 1
+
+            while len(self._entries) > self.max_models:
+                self._entries.popitem(last=False)
+
+        return model
+
+    def invalidate(self, path=None):
+        """Drop one cached artifact (or all of them when path is None)"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(path), None)
+
+    def stats(self):
+        """Cache statistics for logging"""
+        with self._lock:
+            return {
+                'cached_models': len(self._entries),
+                'hits': self.hits,
+                'loads': self.loads
+            }
+
+
+# Process-wide registry shared by all predictors
+registry = ModelRegistry()
@@ -0,0 +1,158 @@
+"""
+Versioned Model Artifacts
+Every training run writes a new numbered artifact; a manifest points at the
+current one so a bad update can be rolled back without retraining
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+import joblib
+
+LOCK_TIMEOUT = 60  # seconds before a leftover lock file is treated as stale
+
+
+class ModelVersionStore:
+    """
+    Manifest-backed store of model versions for one model name
+
+    Layout:
+        <model_dir>/versions/<name>_v<N>.pkl
+        <model_dir>/<name>_manifest.json
+    """
+
+    def __init__(self, model_dir, name='price_model'):
+        self.model_dir = model_dir
+        self.name = name
+        self.versions_dir = os.path.join(model_dir, 'versions')
+        self.manifest_path = os.path.join(model_dir, f'{name}_manifest.json')
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        """
+        Exclusive manifest access across threads and processes
+
+        Pool workers may save versions at the same time, so besides the
+        thread lock an O_EXCL lock file serializes read-modify-write of
+        the manifest.
+        """
+        with self._lock:
+            os.makedirs(self.model_dir, exist_ok=True)
+            lock_path = self.manifest_path + '.lock'
+            while True:
+                try:
+                    fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                    break
+                except FileExistsError:
+                    try:
+                        if time.time() - os.path.getmtime(lock_path) > LOCK_TIMEOUT:
+                            os.remove(lock_path)  # left behind by a crashed process
+                    except FileNotFoundError:
+                        pass
+                    time.sleep(0.05)
+            try:
+                yield
+            finally:
+                os.close(fd)
+                os.remove(lock_path)
+
+    def _read_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {'current': None, 'versions': []}
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest):
+        # Write then rename so readers never see a half-written manifest
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2, default=str)
+        os.replace(tmp_path, self.manifest_path)
+
+    def current(self):
+        """Metadata of the current version (None if nothing saved yet)"""
+        manifest = self._read_manifest()
+        return self.get(manifest['current'], manifest)
+
+    def get(self, version, manifest=None):
+        """Metadata of one version"""
+        manifest = manifest or self._read_manifest()
+        for entry in manifest['versions']:
+            if entry['version'] == version:
+                return entry
+        return None
+
+    def list(self):
+        """All versions, oldest first"""
+        return self._read_manifest()['versions']
+
+    def save(self, model, **metadata):
+        """
+        Write a new version and make it current
+
+        Args:
+            model: Fitted model
+            **metadata: Extra fields stored in the manifest (mae, mode, ...)
+
+        Returns:
+            Manifest entry of the new version
+        """
+        with self._locked():
+            manifest = self._read_manifest()
+            version = max([v['version'] for v in manifest['versions']], default=0) + 1
+
+            os.makedirs(self.versions_dir, exist_ok=True)
+            path = os.path.join(self.versions_dir, f'{self.name}_v{version}.pkl')
+            joblib.dump(model, path)
+
+            entry = {'version': version, 'path': path, 'created_at': datetime.now().isoformat()}
+            entry.update(metadata)
+            manifest['versions'].append(entry)
+            manifest['current'] = version
+            self._write_manifest(manifest)
+
+        return entry
+
+    def update(self, version, **fields):
+        """Add or change manifest fields of an existing version"""
+        with self._locked():
+            manifest = self._read_manifest()
+            entry = self.get(version, manifest)
+            if entry is None:
+                raise ValueError(f"Model version {version} not found")
+            entry.update(fields)
+            self._write_manifest(manifest)
+        return entry
+
+    def rollback(self, version=None):
+        """
+        Point the manifest at an earlier version
+
+        Args:
+            version: Version to restore (None = the one before current)
+
+        Returns:
+            Manifest entry now current
+        """
+        with self._locked():
+            manifest = self._read_manifest()
+            versions = [v['version'] for v in manifest['versions']]
+
+            if version is None:
+                older = [v for v in versions if manifest['current'] and v < manifest['current']]
+                if not older:
+                    raise ValueError("No earlier version to roll back to")
+                version = older[-1]
+
+            entry = self.get(version, manifest)
+            if entry is None or not os.path.exists(entry['path']):
+                raise ValueError(f"Model version {version} not found")
+
+            manifest['current'] = version
+            self._write_manifest(manifest)
+
+        return entry
@@ -3,60 +3,280 @@ Price Prediction Model using Random Forest
 Chosen because: handles non-linear patterns, robust to outliers, explainable
 """
 
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestRegressor, HistGradientBoostingRegressor
 from sklearn.metrics import mean_absolute_error, r2_score
 import joblib
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
 import os
+import json
+from config import (INCREMENTAL_TREES, INCREMENTAL_MAX_TREES, DRIFT_REFIT_RATIO, FLAT_FOREST_MAX_ROWS,
+                    FORECAST_QUANTILES)
+from models.model_registry import registry
+from models.model_versions import ModelVersionStore
+from models.flat_forest import FlatForest
+from models.rolling_state import RollingPriceState
+from models.feature_engine import build_features, series_tails, SERIES_KEYS
+from models.exogenous_features import EXOGENOUS_FEATURES
+from models.baselines import BaselineForecaster
 
-class PricePredictor:
-    def __init__(self):
-        self.model = RandomForestRegressor(
-            n_estimators=100,
-            max_depth=15,
-            random_state=42,
-            n_jobs=-1
-        )
-        self.features = [
-            'price_lag_1', 'price_lag_7', 'price_ma_7',
-            'price_std_7', 'day_of_week', 'month'
-        ]
+MODEL_DIR = 'models/trained_models'
+MODEL_PATH = os.path.join(MODEL_DIR, 'price_model.pkl')
+FEATURES_PATH = os.path.join(MODEL_DIR, 'features.pkl')
+MODEL_CONFIG_PATH = os.path.join(MODEL_DIR, 'model_config.json')
+
+model_versions = ModelVersionStore(MODEL_DIR, 'price_model')
+
+# Parameter grown by warm_start to add trees / boosting rounds
+WARM_START_PARAMS = {
+    'RandomForestRegressor': 'n_estimators',
+    'HistGradientBoostingRegressor': 'max_iter'
+}
+
+ESTIMATORS = {
+    'RandomForestRegressor': RandomForestRegressor,
+    'HistGradientBoostingRegressor': HistGradientBoostingRegressor
+}
+
+BASE_FEATURES = [
+    'price_lag_1', 'price_lag_7', 'price_ma_7',
+    'price_std_7', 'day_of_week', 'month'
+]
+
+DEFAULT_MODEL_CONFIG = {
+    'estimator': 'RandomForestRegressor',
+    'params': {'n_estimators': 100, 'max_depth': 15, 'random_state': 42}
+}
+
+
+def load_model_config(path=MODEL_CONFIG_PATH):
+    """Tuned model config saved by models/tuner.py (or the default forest)"""
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return DEFAULT_MODEL_CONFIG
+
+
+def build_estimator(config, n_jobs=-1):
+    """Instantiate an unfitted regressor from a model config"""
+    estimator = ESTIMATORS[config['estimator']](**config['params'])
+    if 'n_jobs' in estimator.get_params():
+        estimator.set_params(n_jobs=n_jobs)
+    return estimator
+
+def per_tree_model(model):
+    """Model exposing leaf_values() for per-tree outputs, or None"""
+    if hasattr(model, 'leaf_values'):
+        return model
+    if FlatForest.supports(model):
+        return FlatForest.from_sklearn(model)
+    return None
+
+def interval_confidence(forecast, lower, upper):
+    """
+    Spread-based confidence in (0, 1]
+    
+    1 / (1 + band width relative to the forecast): a band spanning 20% of
+    the price scores ~0.83, a degenerate band scores 1.
+    """
+    width = (upper - lower) / np.maximum(np.abs(forecast), 1e-6)
+    return 1 / (1 + width)
+
+def recursive_forecast(model, features, histories, origin, horizon=7,
+                       static_columns=None, derive=None, decode=None, quantiles=None):
+    """
+    Multi-step forecast for many series, one model call per step
+    
+    Args:
+        model: Fitted regressor
+        features: Feature names in model column order
+        histories: Array (n_series, 7) of the latest observed prices
+        origin: datetime64[D] array with each series' last observed date
+        horizon: Number of days to forecast
+        static_columns: Optional dict of per-series feature arrays that stay
+            fixed over the horizon (e.g. series encodings)
+        derive: Optional callable(columns) -> columns adding derived features
+        decode: Optional callable(raw_prediction, columns) -> price, for
+            models trained on a normalized target
+        quantiles: Optional (low, high) quantiles of the per-tree predictions
+            to return as a forecast band (forests only)
+    
+    Returns:
+        (forecast array (n_series, horizon), target dates array), plus a
+        (lower, upper) pair of arrays when quantiles are requested (None if
+        the model has no per-tree outputs)
+    """
+    state = RollingPriceState(histories)
+    n_series = len(state)
+    forecast = np.empty((n_series, horizon))
+    pred_dates = np.empty((n_series, horizon), dtype='datetime64[D]')
+    
+    trees = per_tree_model(model) if quantiles else None
+    if trees is not None:
+        model = trees
+        lower = np.empty((n_series, horizon))
+        upper = np.empty((n_series, horizon))
     
-    def prepare_features(self, df):
-        """Create features for ML model"""
-        df = df.sort_values('date')
+    for step in range(horizon):
+        # Calendar features of each series' own target date
+        target = origin + (step + 1)
+        pred_dates[:, step] = target
+        columns = {
+            'price_lag_1': state.lag(1),
+            'price_lag_7': state.lag(7),
+            'price_ma_7': state.mean(),
+            'price_std_7': state.std(),
+            'day_of_week': (target.astype(np.int64) + 3) % 7,  # 1970-01-01 was a Thursday
+            'month': target.astype('datetime64[M]').astype(np.int64) % 12 + 1
+        }
+        if static_columns:
+            columns.update(static_columns)
+        if derive:
+            columns = derive(columns)
         
-        # Lag features
-        df['price_lag_1'] = df.groupby('commodity')['modal_price'].shift(1)
-        df['price_lag_7'] = df.groupby('commodity')['modal_price'].shift(7)
+        # One vectorized call scores every series for this step
+        X_pred = np.column_stack([columns[name] for name in features]).astype(np.float64)
+        if trees is not None:
+            # One (n_series, n_trees) matrix gives the mean and the band together
+            leaves = trees.leaf_values(X_pred)
+            prediction = leaves.mean(axis=1)
+            low, high = np.quantile(leaves, quantiles, axis=1)
+            # decode is monotonic, so decoding the quantiles is exact
+            lower[:, step] = decode(low, columns) if decode else low
+            upper[:, step] = decode(high, columns) if decode else high
+        else:
+            prediction = model.predict(X_pred)
+        forecast[:, step] = decode(prediction, columns) if decode else prediction
         
-        # Rolling statistics
-        df['price_ma_7'] = df.groupby('commodity')['modal_price'].rolling(7).mean().reset_index(0, drop=True)
-        df['price_std_7'] = df.groupby('commodity')['modal_price'].rolling(7).std().reset_index(0, drop=True)
+        # Feed the prediction back into lag and rolling features
+        state.push(forecast[:, step])
+    
+    if quantiles:
+        return forecast, pred_dates, (lower, upper) if trees is not None else None
+    return forecast, pred_dates
+
+def format_forecasts(keys, forecast, pred_dates, band=None, methods=None):
+    """
+    Prediction dicts per (commodity, state, market) series
+    
+    With a (lower, upper) band, each dict also carries lower_price,
+    upper_price and a spread-based confidence. With per-series method
+    names (baseline forecasts), each dict records its method.
+    """
+    results = {}
+    for i, (commodity, state, market) in enumerate(keys):
+        results[(commodity, state, market)] = [{
+            'date': pd.Timestamp(pred_dates[i, step]).isoformat(),
+            'predicted_price': round(float(forecast[i, step]), 2),
+            'commodity': commodity,
+            'state': state,
+            'market': market,
+            'day': step + 1
+        } for step in range(forecast.shape[1])]
+    
+    if band is not None:
+        lower, upper = band
+        confidence = interval_confidence(forecast, lower, upper)
+        for i, key in enumerate(keys):
+            for step, pred in enumerate(results[key]):
+                pred['lower_price'] = round(float(lower[i, step]), 2)
+                pred['upper_price'] = round(float(upper[i, step]), 2)
+                pred['confidence'] = round(float(confidence[i, step]), 3)
+    
+    if methods is not None:
+        for key, method in zip(keys, methods):
+            for pred in results[key]:
+                pred['method'] = method
+    return results
+
+def series_watermarks(df):
+    """
+    Latest training date of every series
+    
+    Returns:
+        Dict of 'commodity|state|market' -> ISO date (JSON-safe for the manifest)
+    """
+    last = df.groupby(SERIES_KEYS, observed=True, sort=False)['date'].max()
+    return {'|'.join(map(str, key)): pd.Timestamp(date).isoformat() for key, date in last.items()}
+
+def unseen_rows(df, current):
+    """
+    Rows newer than what the current version saw of their own series
+    
+    Series the version has never seen are new in full. Versions saved
+    before per-series tracking only know one overall date.
+    """
+    watermarks = current.get('series_trained_through')
+    dates = df['date'].to_numpy(dtype='datetime64[ns]')
+    if watermarks is None:
+        return dates > np.datetime64(current['trained_through'], 'ns')
+    
+    groups = df.groupby(SERIES_KEYS, observed=True, sort=False)
+    codes = groups.ngroup().to_numpy()
+    floor = np.array([
+        np.datetime64(watermarks.get('|'.join(map(str, key)), 'NaT'), 'ns') for key in groups.size().index
+    ], dtype='datetime64[ns]')
+    floor = floor[codes]
+    return np.isnat(floor) | (dates > floor)
+
+class PricePredictor:
+    def __init__(self, config=None, exogenous=None, n_jobs=-1):
+        """
+        Args:
+            config: Model config (default: tuned config or the default forest)
+            exogenous: Optional ExogenousFeatures; adds weather and news
+                sentiment columns to the price features
+            n_jobs: Training threads (a pool worker passes its CPU share)
+        """
+        self.config = config or load_model_config()
+        self.model = build_estimator(self.config, n_jobs=n_jobs)
+        self.exogenous = exogenous
+        self.features = BASE_FEATURES + (EXOGENOUS_FEATURES if exogenous else [])
+    
+    def prepare_features(self, df, featurized=False):
+        """Create features for ML model (per commodity/state/market series)"""
+        if not featurized:
+            df = build_features(df)
+        if self.exogenous:
+            df = self.exogenous.join(df)
+        return df
+    
+    def train(self, df, featurized=False, incremental=False, allow_full_refit=True):
+        """
+        Train the model and save it as a new artifact version
         
-        # Time features
-        df['day_of_week'] = pd.to_datetime(df['date']).dt.dayofweek
-        df['month'] = pd.to_datetime(df['date']).dt.month
+        Args:
+            df: Raw price rows, or precomputed features when featurized=True
+            featurized: Skip feature engineering (rows from the FeatureStore)
+            incremental: Extend the current model with rows it has not seen
+                instead of refitting (falls back to a full refit on drift)
+            allow_full_refit: With incremental=True, return None instead of
+                refitting when df is only a subset of the training data
+        """
+        if not featurized:
+            print("📊 Preparing features...")
+        df = self.prepare_features(df, featurized=featurized)
         
-        # Price change percentage
-        df['pricechange_pct'] = df.groupby('commodity')['modal_price'].pct_change()
+        if incremental:
+            results = self._train_incremental(df)
+            if results:
+                return results
+            if not allow_full_refit:
+                return None
         
-        return df.dropna()
+        return self._train_full(df)
     
-    def train(self, df):
-        """Train the model"""
-        print("📊 Preparing features...")
-        df = self.prepare_features(df)
+    def _train_full(self, df):
+        """Refit from scratch on all rows"""
+        X = df[self.features].to_numpy(dtype=np.float64)
+        y = df['modal_price'].to_numpy(dtype=np.float64)
         
-        X = df[self.features]
-        y = df['modal_price']
-        
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42
-        )
+        # Chronological holdout: the latest 20% of dates are never trained on
+        dates = df['date'].to_numpy(dtype='datetime64[ns]')
+        unique_dates = np.unique(dates)
+        cutoff = unique_dates[int(len(unique_dates) * 0.8)]
+        is_test = dates >= cutoff
+        X_train, X_test, y_train, y_test = X[~is_test], X[is_test], y[~is_test], y[is_test]
         
         print("🎯 Training model...")
         self.model.fit(X_train, y_train)
@@ -69,77 +289,242 @@ class PricePredictor:
         print(f"✅ Model Trained - MAE: ₹{mae:.2f}, R²: {r2:.3f}")
         
         # Save model
-        os.makedirs('models/trained_models', exist_ok=True)
-        joblib.dump(self.model, 'models/trained_models/price_model.pkl')
-        joblib.dump(self.features, 'models/trained_models/features.pkl')
+        entry = self._save(df, mode='full', mae=mae, r2=r2, baseline_mae=mae,
+                           series_trained_through=series_watermarks(df))
         
-        return {'mae': mae, 'r2': r2}
+        return {'mae': mae, 'r2': r2, 'mode': 'full', 'version': entry['version']}
     
-    def predict_next_7_days(self, commodity_data):
-        """Predict prices for next 7 days"""
-        try:
-            model = joblib.load('models/trained_models/price_model.pkl')
-            
-            #Prepare latest data
-            df = self.prepare_features(commodity_data)
-            
-            if len(df) < 7:
-                print(f"⚠️ Not enough data for prediction (need >7, have {len(df)})")
-                return []
-            
-            predictions = []
-            
-            # Use the last available features as a baseline
-            last_row = df.iloc[-1]
-            last_price = last_row['modal_price']
-            
-            for i in range(7):
-                # Simple prediction using last features
-                X_pred = pd.DataFrame([{
-                    'price_lag_1': last_price,
-                    'price_lag_7': last_row['price_lag_7'],
-                    'price_ma_7': last_row['price_ma_7'],
-                    'price_std_7': last_row['price_std_7'],
-                    'day_of_week': (datetime.now() + timedelta(days=i+1)).weekday(),
-                    'month': datetime.now().month
-                }])
-                
-                # Predict
-                pred_price = model.predict(X_pred)[0]
-                pred_date = datetime.now() + timedelta(days=i+1)
-                
-                predictions.append({
-                    'date': pred_date.isoformat(),
-                    'predicted_price': round(pred_price, 2),
-                    'commodity': commodity_data['commodity'].iloc[0] if 'commodity' in commodity_data else 'Unknown',
-                    'day': i+1
-                })
-                
-                # Update for next iteration
-                last_price = pred_price
-            
-            return predictions
+    def _train_incremental(self, df):
+        """
+        Add trees/boosting rounds fitted only on rows newer than the current
+        version. Returns None when a full refit is needed instead.
+        """
+        current = model_versions.current()
+        if current is None:
+            print("ℹ️ No saved model yet, running a full fit")
+            return None
+        
+        # Private copy: the registry's shared instance must stay untouched
+        model = joblib.load(current['path'])
+        size_param = WARM_START_PARAMS.get(type(model).__name__)
+        if size_param is None:
+            print(f"ℹ️ {type(model).__name__} cannot be extended, running a full fit")
+            return None
+        if current.get('features', BASE_FEATURES) != self.features:
+            print("ℹ️ Feature set changed, running a full fit")
+            return None
         
+        is_new = unseen_rows(df, current)
+        if not is_new.any():
+            print(f"ℹ️ Model v{current['version']} is up to date, nothing to add")
+            return {'mae': current['mae'], 'r2': current.get('r2'), 'mode': 'unchanged',
+                    'version': current['version']}
+        
+        X_new = df.loc[is_new, self.features].to_numpy(dtype=np.float64)
+        y_new = df.loc[is_new, 'modal_price'].to_numpy(dtype=np.float64)
+        
+        # The current model has never seen these rows: an honest error check
+        predictions = model.predict(X_new)
+        mae = mean_absolute_error(y_new, predictions)
+        r2 = r2_score(y_new, predictions) if len(y_new) > 1 else float('nan')
+        drift = mae / current['baseline_mae'] if current['baseline_mae'] else float('inf')
+        
+        if drift > DRIFT_REFIT_RATIO:
+            print(f"⚠️ Drift detected (MAE ₹{mae:.2f} is {drift:.2f}x baseline), running a full refit")
+            return None
+        
+        size = model.get_params()[size_param] + INCREMENTAL_TREES
+        if size > INCREMENTAL_MAX_TREES:
+            print(f"ℹ️ Model would grow to {size} trees, running a full refit instead")
+            return None
+        
+        print(f"🎯 Adding {INCREMENTAL_TREES} trees on {len(y_new)} new rows...")
+        model.set_params(warm_start=True, **{size_param: size})
+        model.fit(X_new, y_new)
+        model.set_params(warm_start=False)
+        self.model = model
+        
+        print(f"✅ Model Updated - MAE on new rows before update: ₹{mae:.2f} ({drift:.2f}x baseline)")
+        
+        # Series outside this batch keep the watermarks of the parent version
+        watermarks = dict(current.get('series_trained_through') or {})
+        watermarks.update(series_watermarks(df))
+        entry = self._save(df, mode='incremental', mae=mae, r2=r2,
+                           baseline_mae=current['baseline_mae'], parent=current['version'],
+                           new_rows=int(is_new.sum()), series_trained_through=watermarks)
+        
+        return {'mae': mae, 'r2': r2, 'mode': 'incremental', 'version': entry['version']}
+    
+    def _save(self, df, **metadata):
+        """Write the fitted model as a new version and make it current"""
+        os.makedirs(MODEL_DIR, exist_ok=True)
+        joblib.dump(self.features, FEATURES_PATH)
+        
+        entry = model_versions.save(
+            self.model,
+            estimator=type(self.model).__name__,
+            trained_through=pd.Timestamp(df['date'].max()).isoformat(),
+            n_rows=len(df),
+            features=self.features,
+            **metadata
+        )
+        print(f"💾 Saved model v{entry['version']} ({metadata.get('mode')})")
+        
+        if FlatForest.supports(self.model):
+            entry = self.export_flat(self.model, entry)
+        return entry
+    
+    @staticmethod
+    def export_flat(model, entry):
+        """Write the flat-array copy of a forest next to its version"""
+        flat_path = entry['path'].replace('.pkl', '.flat.pkl')
+        joblib.dump(FlatForest.from_sklearn(model), flat_path)
+        return model_versions.update(entry['version'], flat_path=flat_path)
+    
+    def load_model(self, n_rows=None, per_tree=False, version=None):
+        """
+        Current model version through the shared registry
+        
+        Args:
+            n_rows: Rows per predict call; small requests get the flat-array
+                forest (if exported), which skips sklearn's per-call overhead
+            per_tree: Prefer the flat forest regardless of size, since it
+                yields every tree's prediction in one pass (for intervals)
+            version: Load this version instead of the current one
+        """
+        current = model_versions.get(version) if version else model_versions.current()
+        if current is None:
+            if version:
+                raise FileNotFoundError(f"Model version {version} not found")
+            return registry.get(MODEL_PATH)  # artifact from before versioning
+        
+        flat_path = current.get('flat_path')
+        use_flat = per_tree or (n_rows is not None and n_rows <= FLAT_FOREST_MAX_ROWS)
+        if flat_path and use_flat and os.path.exists(flat_path):
+            return registry.get(flat_path, version=current['version'])
+        return registry.get(current['path'], version=current['version'])
+    
+    @staticmethod
+    def rollback(version=None):
+        """Make an earlier model version current (default: the previous one)"""
+        entry = model_versions.rollback(version)
+        print(f"↩️ Rolled back to model v{entry['version']} ({entry.get('mode')}, {entry['created_at']})")
+        return entry
+    
+    def predict_next_7_days(self, commodity_data, featurized=False):
+        """Predict prices for next 7 days for every series in the data"""
+        forecasts = self.predict_batch(commodity_data, horizon=7, featurized=featurized)
+        return [pred for predictions in forecasts.values() for pred in predictions]
+    
+    def predict_batch(self, series_data, horizon=7, featurized=False, intervals=True, fallback=True,
+                      version=None, baseline_data=None):
+        """
+        Forecast many series at once with one model call per horizon step
+        
+        Args:
+            series_data: Price DataFrame with any number of series, or a
+                dict of DataFrames (e.g. one per commodity)
+            horizon: Number of days to forecast
+            featurized: Input already holds FeatureStore rows
+            intervals: Add FORECAST_QUANTILES bands and confidence from the
+                per-tree predictions (forest models only)
+            fallback: Forecast series the model cannot (too little history,
+                no trained model) with the closed-form baselines
+            version: Forecast with this model version (default: current)
+            baseline_data: Raw price rows for the fallback (default:
+                series_data). Pass them with featurized=True: feature rows
+                omit the series too short to featurize, which are the ones
+                the baselines are for
+        
+        Returns:
+            Dict of (commodity, state, market) -> list of prediction dicts
+        """
+        if isinstance(series_data, dict):
+            if not series_data:
+                # Every series too short to featurize
+                return self.predict_baselines(baseline_data, horizon) if fallback and baseline_data is not None else {}
+            series_data = pd.concat(series_data.values(), ignore_index=True)
+            if featurized:
+                series_data = series_data.astype({key: 'category' for key in SERIES_KEYS})
+                series_data = series_data.sort_values(SERIES_KEYS + ['date'], ignore_index=True)
+        
+        forecasts = self._predict_model(series_data, horizon, featurized, intervals, version)
+        
+        if fallback:
+            baseline = self.predict_baselines(series_data if baseline_data is None else baseline_data, horizon)
+            missing = {key: preds for key, preds in baseline.items() if key not in forecasts}
+            if missing:
+                print(f"📐 Baseline forecasts for {len(missing)} series without a model forecast")
+            forecasts.update(missing)
+        
+        return forecasts
+    
+    @staticmethod
+    def predict_baselines(series_data, horizon=7):
+        """
+        Closed-form forecasts for every series (per-series method chosen by
+        backtest error); needs only one observed price per series
+        """
+        if isinstance(series_data, dict):
+            if not series_data:
+                return {}
+            series_data = pd.concat(series_data.values(), ignore_index=True)
+        keys, forecast, pred_dates, methods = BaselineForecaster().forecast(series_data, horizon)
+        return format_forecasts(keys, forecast, pred_dates, methods=methods)
+    
+    def _predict_model(self, series_data, horizon, featurized, intervals, version=None):
+        """Recursive ML forecasts for every series with enough history"""
+        # One feature pass over every series, then take each series' tail
+        df = series_data if featurized else build_features(series_data)
+        keys, histories, origin, skipped = series_tails(df)
+        
+        if skipped:
+            print(f"⚠️ Not enough data for prediction of {skipped} series (need >7 rows each)")
+        
+        if not keys:
+            return {}
+        
+        # Features the model version was trained with
+        entry = model_versions.get(version) if version else model_versions.current()
+        features = (entry or {}).get('features', BASE_FEATURES)
+        static_columns = None
+        if any(name in EXOGENOUS_FEATURES for name in features):
+            if not self.exogenous:
+                print("❌ Model uses weather/news features. Pass exogenous data (--exogenous).")
+                return {}
+            # Latest known weather and news, held fixed over the horizon
+            static_columns = self.exogenous.latest(keys, origin)
+        
+        try:
+            model = self.load_model(n_rows=len(keys), per_tree=intervals, version=version)
         except FileNotFoundError:
             print("❌ Model not found. Please train first.")
-            return []
+            return {}
+        
+        band = None
+        try:
+            if intervals:
+                forecast, pred_dates, band = recursive_forecast(
+                    model, features, histories, origin, horizon,
+                    static_columns=static_columns, quantiles=FORECAST_QUANTILES
+                )
+            else:
+                forecast, pred_dates = recursive_forecast(model, features, histories, origin, horizon,
+                                                          static_columns=static_columns)
         except Exception as e:
             print(f"❌ Prediction error: {e}")
-            return []
+            return {}
+        
+        return format_forecasts(keys, forecast, pred_dates, band)
 
 if __name__ == "__main__":
     # Demo usage
-    from pymongo import MongoClient
-    from config import MONGO_URI
-    
-    client = MongoClient(MONGO_URI)
-    db = client['techsprint']
+    from services.market_data_loader import MarketDataLoader
     
     # Get data
-    data = list(db.marketprices.find({'commodity': 'Tomato'}).sort('date', -1).limit(30))
+    df = MarketDataLoader().load(commodities=['Tomato'], limit=30)
     
-    if len(data) >= 20:
-        df = pd.DataFrame(data)
+    if len(df) >= 20:
         predictor = PricePredictor()
         
         # Train
@@ -149,6 +534,7 @@ if __name__ == "__main__":
         predictions = predictor.predict_next_7_days(df)
         print("\n📈 7-Day Predictions:")
         for p in predictions:
-            print(f"Day {p['day']}: ₹{p['predicted_price']}")
+            print(f"Day {p['day']}: ₹{p['predicted_price']} "
+                  f"(₹{p.get('lower_price')}–₹{p.get('upper_price')}, confidence {p.get('confidence')})")
     else:
         print("❌ Not enough data. Run scraper first.")
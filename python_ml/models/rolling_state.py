@@ -0,0 +1,66 @@
+"""
+Rolling Price State for Recursive Forecasting
+Fixed-size NumPy ring buffer holding the last N prices of many series
+"""
+
+import numpy as np
+
+
+class RollingPriceState:
+    """
+    Ring buffer of the most recent `window` prices for every series
+
+    All series advance in lockstep (one push per forecast step), so a
+    single write position is shared. Running sum and sum-of-squares make
+    lag, mean and std available in O(1) per series after each push.
+    """
+
+    def __init__(self, history):
+        """
+        Args:
+            history: Array (n_series, window) of observed prices, oldest first
+        """
+        self.buffer = np.array(history, dtype=np.float64)
+        if self.buffer.ndim != 2 or self.buffer.shape[1] < 2:
+            raise ValueError("history must be a 2-D array with a window of at least 2")
+
+        self.window = self.buffer.shape[1]
+        self.pos = 0  # column holding the oldest price
+        self._recompute()
+
+    def _recompute(self):
+        """Exact sums from the buffer (resets floating point drift)"""
+        self.total = self.buffer.sum(axis=1)
+        self.total_sq = np.square(self.buffer).sum(axis=1)
+
+    def __len__(self):
+        return self.buffer.shape[0]
+
+    def lag(self, k):
+        """Price observed k steps ago (1 = latest, window = oldest)"""
+        if not 1 <= k <= self.window:
+            raise ValueError(f"lag must be between 1 and {self.window}")
+        return self.buffer[:, (self.pos - k) % self.window]
+
+    def mean(self):
+        """Rolling mean over the window"""
+        return self.total / self.window
+
+    def std(self):
+        """Rolling sample standard deviation (ddof=1, same as pandas)"""
+        var = (self.total_sq - np.square(self.total) / self.window) / (self.window - 1)
+        return np.sqrt(np.maximum(var, 0.0))
+
+    def push(self, values):
+        """Append one new price per series, evicting the oldest"""
+        values = np.asarray(values, dtype=np.float64)
+        oldest = self.buffer[:, self.pos]
+
+        self.total += values - oldest
+        self.total_sq += np.square(values) - np.square(oldest)
+        self.buffer[:, self.pos] = values
+        self.pos = (self.pos + 1) % self.window
+
+        # Once per full rotation, refresh the running sums
+        if self.pos == 0:
+            self._recompute()
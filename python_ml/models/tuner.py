@@ -0,0 +1,158 @@
+"""
+Hyperparameter Tuning with Successive Halving
+Searches forest and gradient-boosting settings on rolling-origin folds and
+saves the winning config next to the model artifact
+"""
+
+import sys
+import json
+import math
+import time
+from pathlib import Path
+from datetime import datetime
+import numpy as np
+from sklearn.model_selection import ParameterSampler
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import TUNING_CANDIDATES, TUNING_FOLDS, TUNING_ETA, TUNING_LATENCY_WEIGHT
+from models.backtest import Backtester
+from models.price_predictor import build_estimator, MODEL_CONFIG_PATH, MODEL_DIR
+
+SEARCH_SPACE = {
+    'RandomForestRegressor': {
+        'n_estimators': [50, 100, 200, 400],
+        'max_depth': [6, 10, 15, 20, None],
+        'min_samples_leaf': [1, 2, 5, 10],
+        'max_features': [1.0, 0.7, 0.5, 'sqrt'],
+        'random_state': [42]
+    },
+    'HistGradientBoostingRegressor': {
+        'max_iter': [100, 200, 400],
+        'learning_rate': [0.03, 0.05, 0.1, 0.2],
+        'max_leaf_nodes': [15, 31, 63],
+        'min_samples_leaf': [10, 20, 50],
+        'l2_regularization': [0.0, 0.1, 1.0],
+        'random_state': [42]
+    }
+}
+
+
+def sample_candidates(n_candidates, seed=42):
+    """Random configs split evenly between model families"""
+    candidates = []
+    per_family = math.ceil(n_candidates / len(SEARCH_SPACE))
+
+    for estimator, space in SEARCH_SPACE.items():
+        for params in ParameterSampler(space, per_family, random_state=seed):
+            candidates.append({'estimator': estimator, 'params': params})
+
+    return candidates[:n_candidates]
+
+
+class SuccessiveHalvingTuner:
+    """
+    Successive halving over time-series folds
+
+    Rung r scores the surviving candidates on the most recent
+    eta**r folds (reusing scores from earlier rungs), then keeps the best
+    1/eta. Score = MAE + latency_weight * predict ms per 1k rows, so a
+    slower model must buy its latency with accuracy.
+    """
+
+    def __init__(self, backtester, n_candidates=TUNING_CANDIDATES, eta=TUNING_ETA,
+                 latency_weight=TUNING_LATENCY_WEIGHT):
+        self.backtester = backtester
+        self.n_candidates = n_candidates
+        self.eta = eta
+        self.latency_weight = latency_weight
+        self._results = {}  # (candidate index, fold) -> fold result
+
+    def _score(self, index, folds):
+        results = [self._results[(index, fold)] for fold in folds]
+        abs_error = np.vstack([r['abs_error'] for r in results])
+        mae = float(abs_error.mean()) if len(abs_error) else float('inf')
+        latency = float(np.mean([r['predict_ms_per_1k'] for r in results]))
+        return {
+            'mae': mae,
+            'predict_ms_per_1k': latency,
+            'score': mae + self.latency_weight * latency
+        }
+
+    def run(self):
+        """
+        Run the search
+
+        Returns:
+            Winning config dict (estimator, params, metrics)
+        """
+        start = time.perf_counter()
+        candidates = sample_candidates(self.n_candidates)
+        alive = list(range(len(candidates)))
+        n_folds = self.backtester.n_folds
+        rung = 0
+
+        while True:
+            # Most recent folds first: they matter most for tomorrow's forecast
+            k = min(n_folds, self.eta ** rung)
+            folds = list(range(n_folds - k, n_folds))
+
+            tasks = [(i, fold) for i in alive for fold in folds if (i, fold) not in self._results]
+            results = self.backtester.map_folds([
+                (build_estimator(candidates[i], n_jobs=1), fold) for i, fold in tasks
+            ])
+            self._results.update(zip(tasks, results))
+
+            scores = {i: self._score(i, folds) for i in alive}
+            alive.sort(key=lambda i: scores[i]['score'])
+
+            best = scores[alive[0]]
+            print(f"  Rung {rung}: {len(alive)} candidates on {k} folds, "
+                  f"best MAE=₹{best['mae']:.2f} ({best['predict_ms_per_1k']:.1f} ms/1k rows)")
+
+            if len(alive) == 1 or k == n_folds:
+                break
+
+            alive = alive[:max(1, math.ceil(len(alive) / self.eta))]
+            rung += 1
+
+        winner = dict(candidates[alive[0]])
+        winner.update(scores[alive[0]])
+        winner['folds'] = k
+        winner['tuned_at'] = datetime.now().isoformat()
+        winner['duration'] = time.perf_counter() - start
+        return winner
+
+
+def save_config(config, path=MODEL_CONFIG_PATH):
+    """Store the winning config alongside the model artifact"""
+    Path(MODEL_DIR).mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(config, f, indent=2, default=str)
+
+
+def tune(df, featurized=False, n_candidates=TUNING_CANDIDATES):
+    """
+    Tune on price history and save the winning config
+
+    Args:
+        df: Raw price rows (or feature rows when featurized=True)
+
+    Returns:
+        Winning config dict
+    """
+    print(f"🔧 Tuning {n_candidates} candidates with successive halving...")
+    backtester = Backtester(df, n_folds=TUNING_FOLDS, featurized=featurized)
+    winner = SuccessiveHalvingTuner(backtester, n_candidates=n_candidates).run()
+    save_config(winner)
+
+    print(f"✅ Best: {winner['estimator']} {winner['params']}")
+    print(f"   MAE=₹{winner['mae']:.2f}, {winner['predict_ms_per_1k']:.1f} ms per 1k rows "
+          f"({winner['duration']:.1f}s)")
+    return winner
+
+
+if __name__ == "__main__":
+    from services.market_data_loader import MarketDataLoader
+
+    tune(MarketDataLoader().load())
@@ -2,6 +2,7 @@
 Clean old demo data and re-populate with real scraped data
 """
 
+import os
 import sys
 from pathlib import Path
 from pymongo import MongoClient
@@ -54,13 +55,21 @@ def main():
     print("🔄 RUNNING DATA AGGREGATOR")
     print("="*60 + "\n")
     
-    import subprocess
-    result = subprocess.run(
-        [sys.executable, "scrapers/data_aggregator.py"],
-        cwd=Path(__file__).parent
-    )
+    # In-process: no second interpreter paying the imports again. Relative
+    # paths resolve from this directory, as when it ran as a subprocess here
+    previous_cwd = os.getcwd()
+    os.chdir(Path(__file__).parent)
+    try:
+        from scrapers.data_aggregator import DataAggregator
+        DataAggregator().run_full_collection()
+        succeeded = True
+    except Exception as e:
+        print(f"❌ Aggregator failed: {e}")
+        succeeded = False
+    finally:
+        os.chdir(previous_cwd)
     
-    if result.returncode == 0:
+    if succeeded:
         print("\n" + "="*60)
         print("✅ SUCCESS - Database Updated!")
         print("="*60)
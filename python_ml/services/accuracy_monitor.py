@@ -0,0 +1,250 @@
+"""
+Forecast Accuracy Monitor
+Scores stored forecasts against the prices scrapers record later, keeps
+running error per series and horizon, and retrains only where the model
+has drifted
+
+Usage:
+    python services/accuracy_monitor.py [--retrain]
+"""
+
+import sys
+from pathlib import Path
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from pymongo import MongoClient, UpdateOne, ASCENDING
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import (MONGO_URI, MARKET_LOADER_BATCH_SIZE, ACCURACY_EWMA_ALPHA, ACCURACY_DRIFT_MAPE,
+                    ACCURACY_MIN_SAMPLES, ACCURACY_HISTORY_DAYS)
+from models.feature_engine import SERIES_KEYS
+from models.price_predictor import PricePredictor
+from services.market_data_loader import MarketDataLoader
+
+STATE_KEYS = SERIES_KEYS + ['day']
+
+
+class AccuracyMonitor:
+    """
+    Incremental forecast evaluation
+
+    A watermark remembers the latest price day already scored, so each
+    update loads only prices from that day on and the forecasts that
+    target them, joins them in one hash merge, and folds the errors into
+    one small state document per (series, horizon day) in
+    `forecastaccuracy`: evaluation count, running MAE, an EWMA of the
+    absolute % error that reacts to recent degradation, and the last
+    target date scored. Rows up to that date are skipped, so reloading
+    the watermark day (for prices that landed late) never scores a day
+    twice. State per key is O(1) no matter how much history has been
+    scored.
+    """
+
+    def __init__(self, db=None, alpha=ACCURACY_EWMA_ALPHA, drift_mape=ACCURACY_DRIFT_MAPE,
+                 min_samples=ACCURACY_MIN_SAMPLES):
+        if db is None:
+            self.client = MongoClient(MONGO_URI)
+            db = self.client['techsprint']  # Match Node.js database name
+        self.db = db
+        self.forecasts = db['forecasts']
+        self.collection = db['forecastaccuracy']
+        self.meta = db['accuracymonitor']
+        self.loader = MarketDataLoader(db)
+        self.alpha = alpha
+        self.drift_mape = drift_mape
+        self.min_samples = min_samples
+
+    def ensure_indexes(self):
+        self.collection.create_index([(key, ASCENDING) for key in STATE_KEYS], unique=True)
+
+    def watermark(self):
+        """Latest price day already evaluated (None before the first run)"""
+        doc = self.meta.find_one({'_id': 'watermark'})
+        return doc['last_date'] if doc else None
+
+    def _realized_prices(self, since):
+        """Prices from the watermark day on, one per series and day"""
+        start = since
+        if start is None:
+            first_run = self.forecasts.find_one({}, {'run_date': 1}, sort=[('run_date', ASCENDING)])
+            if first_run is None:
+                return None
+            start = first_run['run_date']
+
+        prices = self.loader.load(start=start)
+        if prices.empty:
+            return prices
+        prices = prices.astype({key: object for key in SERIES_KEYS})
+        prices['date'] = prices['date'].dt.normalize()
+        return prices.drop_duplicates(SERIES_KEYS + ['date'], keep='last')
+
+    def _forecast_rows(self, first_date, last_date, horizon=7):
+        """
+        Stored model predictions whose target dates fall in [first_date, last_date]
+
+        Baseline forecasts (predictions tagged with a `method`) are left
+        out: their error says nothing about the model's drift.
+        """
+        cursor = self.forecasts.find(
+            {'run_date': {'$gte': first_date - timedelta(days=horizon), '$lte': last_date},
+             'level': 'market', 'predictions.method': {'$exists': False}},
+            {'_id': 0, 'commodity': 1, 'state': 1, 'market': 1, 'predictions': 1},
+            batch_size=MARKET_LOADER_BATCH_SIZE
+        )
+
+        columns = {key: [] for key in SERIES_KEYS + ['date', 'day', 'predicted_price']}
+        for doc in cursor:
+            for pred in doc['predictions']:
+                for key in SERIES_KEYS:
+                    columns[key].append(doc[key])
+                columns['date'].append(pred['date'])
+                columns['day'].append(pred['day'])
+                columns['predicted_price'].append(pred['predicted_price'])
+
+        rows = pd.DataFrame(columns)
+        rows['date'] = pd.to_datetime(rows['date']).dt.normalize()
+        return rows
+
+    def _load_state(self, keys):
+        """Current state documents for (series, day) keys, by key"""
+        commodities = sorted({key[0] for key in keys})
+        docs = self.collection.find({'commodity': {'$in': commodities}}, {'_id': 0})
+        return {tuple(doc[k] for k in STATE_KEYS): doc for doc in docs}
+
+    def update(self):
+        """
+        Score newly realized prices against stored forecasts
+
+        Returns:
+            Dict with evaluated forecast count and drifting series keys
+        """
+        self.ensure_indexes()
+        since = self.watermark()
+        prices = self._realized_prices(since)
+        if prices is None or prices.empty:
+            print("ℹ️ Accuracy monitor: no new prices to evaluate")
+            return {'evaluated': 0, 'drifting': self.drifting_series()}
+
+        first, last = prices['date'].min(), prices['date'].max()
+        forecasts = self._forecast_rows(first.to_pydatetime(), last.to_pydatetime())
+        joined = forecasts.merge(prices[SERIES_KEYS + ['date', 'modal_price']], on=SERIES_KEYS + ['date'])
+
+        if not joined.empty:
+            state = self._load_state(joined[SERIES_KEYS].drop_duplicates().itertuples(index=False))
+            joined = self._unscored(joined, state)
+
+        if not joined.empty:
+            actual = joined['modal_price'].to_numpy(dtype=np.float64)
+            abs_error = np.abs(joined['predicted_price'].to_numpy(dtype=np.float64) - actual)
+            joined['abs_error'] = abs_error
+            joined['ape'] = np.where(actual > 0, abs_error / np.where(actual > 0, actual, 1), np.nan)
+
+            batch = joined.groupby(STATE_KEYS, sort=False).agg(
+                n=('abs_error', 'size'), sum_abs=('abs_error', 'sum'), mape=('ape', 'mean'),
+                scored_through=('date', 'max')
+            )
+            self._fold(batch, state)
+
+        self.meta.update_one({'_id': 'watermark'},
+                             {'$set': {'last_date': last.to_pydatetime(), 'updated_at': datetime.now()}},
+                             upsert=True)
+
+        drifting = self.drifting_series()
+        print(f"📏 Accuracy monitor: {len(joined)} forecasts scored, {len(drifting)} series drifting")
+        return {'evaluated': len(joined), 'drifting': drifting}
+
+    @staticmethod
+    def _unscored(joined, state):
+        """Joined rows newer than the last target date scored for their key"""
+        if not state:
+            return joined
+        scored = pd.DataFrame([key + (doc.get('scored_through'),) for key, doc in state.items()],
+                              columns=STATE_KEYS + ['scored_through'])
+        scored['scored_through'] = pd.to_datetime(scored['scored_through'])
+        joined = joined.merge(scored, on=STATE_KEYS, how='left')
+        keep = joined['scored_through'].isna() | (joined['date'] > joined['scored_through'])
+        return joined[keep].drop(columns='scored_through')
+
+    def _fold(self, batch, state):
+        """Merge one batch of grouped errors into the running state"""
+        now = datetime.now()
+        operations = []
+
+        for key, row in zip(batch.index, batch.itertuples(index=False)):
+            doc = state.get(key) or {'n': 0, 'mae': 0.0, 'ewma_ape': None, 'n_since_retrain': 0}
+            n = doc['n'] + int(row.n)
+            mae = doc['mae'] + (float(row.sum_abs) - int(row.n) * doc['mae']) / n
+
+            ewma = doc['ewma_ape']
+            if not np.isnan(row.mape):
+                ewma = float(row.mape) if ewma is None else (1 - self.alpha) * ewma + self.alpha * float(row.mape)
+
+            update = dict(zip(STATE_KEYS, key))
+            update['day'] = int(update['day'])
+            update.update({'n': n, 'mae': mae, 'ewma_ape': ewma,
+                           'n_since_retrain': doc['n_since_retrain'] + int(row.n),
+                           'scored_through': row.scored_through.to_pydatetime(), 'updated_at': now})
+            operations.append(UpdateOne({k: update[k] for k in STATE_KEYS}, {'$set': update}, upsert=True))
+
+        for i in range(0, len(operations), MARKET_LOADER_BATCH_SIZE):
+            self.collection.bulk_write(operations[i:i + MARKET_LOADER_BATCH_SIZE], ordered=False)
+
+    def drifting_series(self):
+        """Series with any horizon whose recent error is past the threshold"""
+        docs = self.collection.find({
+            'ewma_ape': {'$gt': self.drift_mape},
+            'n_since_retrain': {'$gte': self.min_samples}
+        }, {'_id': 0, 'commodity': 1, 'state': 1, 'market': 1})
+        return sorted({tuple(doc[k] for k in SERIES_KEYS) for doc in docs})
+
+    def retrain(self, drifting, predictor=None, history_days=ACCURACY_HISTORY_DAYS):
+        """
+        Retrain the price model on the drifting series only
+
+        Adds trees fitted on those series' new rows; when an incremental
+        update is not possible the model is refit on all recent history.
+
+        Returns:
+            Training result dict (None when nothing drifted); the error
+            window is reset only when a new version was saved
+        """
+        if not drifting:
+            return None
+
+        predictor = predictor or PricePredictor()
+        start = datetime.now() - timedelta(days=history_days)
+        commodities = sorted({key[0] for key in drifting})
+
+        data = self.loader.load(commodities=commodities, start=start)
+        keys = pd.MultiIndex.from_frame(data[SERIES_KEYS].astype(object))
+        subset = data[keys.isin(pd.MultiIndex.from_tuples(drifting, names=SERIES_KEYS))]
+
+        print(f"🎯 Retraining on {len(drifting)} drifting series ({len(subset)} rows)...")
+        results = predictor.train(subset, incremental=True, allow_full_refit=False)
+        if results is None:
+            print("ℹ️ Incremental update not possible, refitting on all recent history")
+            results = predictor.train(self.loader.load(start=start))
+        if results['mode'] == 'unchanged':
+            print("ℹ️ No new rows for the drifting series, keeping their error window")
+            return results
+
+        # Fresh error window for retrained series
+        self.collection.update_many(
+            {'$or': [dict(zip(SERIES_KEYS, key)) for key in drifting]},
+            {'$set': {'n_since_retrain': 0, 'ewma_ape': None, 'retrained_at': datetime.now(),
+                      'retrained_version': results['version']}}
+        )
+        return results
+
+
+if __name__ == "__main__":
+    monitor = AccuracyMonitor()
+    report = monitor.update()
+
+    for key in report['drifting']:
+        print(f"   ⚠️ {' / '.join(key)}")
+
+    if '--retrain' in sys.argv:
+        monitor.retrain(report['drifting'])
@@ -0,0 +1,106 @@
+"""
+Columnar Weather and News Loader
+Reads weatherdata and newsalerts into typed columns for the exogenous
+feature stage (see models/exogenous_features.py)
+"""
+
+import numpy as np
+import pandas as pd
+from pymongo import MongoClient
+from config import MONGO_URI, MARKET_LOADER_BATCH_SIZE
+
+IMPACT_CODES = {'negative': -1, 'neutral': 0, 'positive': 1}
+SENTIMENTS = ('bullish', 'bearish', 'neutral')
+
+
+class ExogenousDataLoader:
+    """
+    Projected, batched reads of the weather and news collections
+
+    Both loaders return frames sorted by (key, time), which is the order
+    the as-of joins search in.
+    """
+
+    def __init__(self, db=None, batch_size=MARKET_LOADER_BATCH_SIZE):
+        if db is None:
+            self.client = MongoClient(MONGO_URI)
+            db = self.client['techsprint']  # Match Node.js database name
+        self.db = db
+        self.batch_size = batch_size
+
+    @staticmethod
+    def _window(field, start=None, end=None):
+        query = {}
+        if start or end:
+            query[field] = {}
+            if start:
+                query[field]['$gte'] = start
+            if end:
+                query[field]['$lt'] = end
+        return query
+
+    def load_weather(self, states=None, start=None, end=None):
+        """
+        State-level weather readings
+
+        Returns:
+            DataFrame with state, timestamp, temperature, rainfall_1h and
+            weather_impact (-1 negative, 0 neutral, 1 positive)
+        """
+        query = self._window('timestamp', start, end)
+        if states:
+            query['state'] = {'$in': list(states)}
+
+        projection = {'_id': 0, 'state': 1, 'timestamp': 1, 'temperature': 1,
+                      'rainfall_1h': 1, 'impact_analysis.overall_impact': 1}
+
+        states_col, times, temperature, rainfall, impact = [], [], [], [], []
+        for doc in self.db['weatherdata'].find(query, projection, batch_size=self.batch_size):
+            if not doc.get('state') or doc.get('timestamp') is None:
+                continue
+            states_col.append(doc['state'])
+            times.append(doc['timestamp'])
+            temperature.append(doc.get('temperature', np.nan))
+            rainfall.append(doc.get('rainfall_1h') or 0.0)
+            overall = (doc.get('impact_analysis') or {}).get('overall_impact', 'neutral')
+            impact.append(IMPACT_CODES.get(overall, 0))
+
+        df = pd.DataFrame({
+            'state': pd.Series(states_col, dtype=object),
+            'timestamp': pd.to_datetime(pd.Series(times, dtype=object)).to_numpy(dtype='datetime64[ns]'),
+            'temperature': np.array(temperature, dtype=np.float32),
+            'rainfall_1h': np.array(rainfall, dtype=np.float32),
+            'weather_impact': np.array(impact, dtype=np.int8)
+        })
+        return df.sort_values(['state', 'timestamp'], kind='stable', ignore_index=True)
+
+    def load_news(self, commodities=None, start=None, end=None):
+        """
+        News sentiment events per commodity
+
+        Returns:
+            DataFrame with commodity, published_at and one 0/1 column per
+            sentiment (bullish, bearish, neutral)
+        """
+        query = self._window('published_at', start, end)
+        if commodities:
+            query['commodity'] = {'$in': list(commodities)}
+
+        projection = {'_id': 0, 'commodity': 1, 'published_at': 1, 'sentiment': 1}
+
+        commodities_col, times, sentiment = [], [], []
+        for doc in self.db['newsalerts'].find(query, projection, batch_size=self.batch_size):
+            if not doc.get('commodity') or doc.get('published_at') is None:
+                continue
+            commodities_col.append(doc['commodity'])
+            times.append(doc['published_at'])
+            sentiment.append(doc.get('sentiment', 'neutral'))
+
+        sentiment = np.array(sentiment, dtype=object)
+        df = pd.DataFrame({
+            'commodity': pd.Series(commodities_col, dtype=object),
+            'published_at': pd.to_datetime(pd.Series(times, dtype=object)).to_numpy(dtype='datetime64[ns]')
+        })
+        for name in SENTIMENTS:
+            df[name] = (sentiment == name).astype(np.int32)
+        return df.sort_values(['commodity', 'published_at'], kind='stable', ignore_index=True)
@@ -0,0 +1,216 @@
+"""
+Materialized Feature Store
+Keeps engineered price features per (commodity, state, market, date) in
+MongoDB and extends them incrementally as scrapers add new days
+"""
+
+import sys
+from pathlib import Path
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from pymongo import MongoClient, UpdateOne, ASCENDING
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import (MONGO_URI, COMMODITIES, FEATURE_STORE_LOOKBACK_DAYS, MARKET_LOADER_BATCH_SIZE,
+                    LATEST_ROWS_PER_SERIES, LATEST_ROWS_WINDOW_DAYS)
+from models.feature_engine import build_features, SERIES_KEYS, ROLLING_WINDOW
+from services.market_data_loader import MarketDataLoader, run_latest_rows
+
+FEATURE_COLUMNS = [
+    'modal_price', 'price_lag_1', 'price_lag_7', 'price_ma_7',
+    'price_std_7', 'day_of_week', 'month', 'pricechange_pct'
+]
+
+
+class FeatureStore:
+    """
+    Precomputed feature rows in the `marketfeatures` collection
+
+    An update only loads raw prices from the oldest series' stored date
+    minus a lookback window (enough to refill lag/rolling windows),
+    computes features for that tail and writes rows newer than what each
+    series already has. Series that report too sparsely for the lookback
+    to hold ROLLING_WINDOW rows get their full history reloaded. Daily
+    runs therefore cost O(new rows), not O(history).
+    """
+
+    def __init__(self, db=None, lookback_days=FEATURE_STORE_LOOKBACK_DAYS):
+        if db is None:
+            self.client = MongoClient(MONGO_URI)
+            db = self.client['techsprint']  # Match Node.js database name
+        self.db = db
+        self.collection = db['marketfeatures']
+        self.loader = MarketDataLoader(db)
+        self.lookback_days = lookback_days
+
+    def ensure_indexes(self):
+        """One feature row per series and date"""
+        self.collection.create_index(
+            [(key, ASCENDING) for key in SERIES_KEYS] + [('date', ASCENDING)],
+            unique=True
+        )
+
+    def latest_dates(self, commodities=None):
+        """
+        Most recent stored feature date per series
+
+        Returns:
+            Dict of (commodity, state, market) -> datetime
+        """
+        pipeline = []
+        if commodities:
+            pipeline.append({'$match': {'commodity': {'$in': list(commodities)}}})
+        pipeline.append({
+            '$group': {
+                '_id': {key: f'${key}' for key in SERIES_KEYS},
+                'last_date': {'$max': '$date'}
+            }
+        })
+
+        return {
+            tuple(row['_id'][key] for key in SERIES_KEYS): row['last_date']
+            for row in self.collection.aggregate(pipeline)
+        }
+
+    def update(self, commodities=None, rebuild=False):
+        """
+        Compute and store features for rows not yet in the store
+
+        Args:
+            commodities: List of commodities (None = all tracked)
+            rebuild: Recompute from the full history
+
+        Returns:
+            Number of feature rows written
+        """
+        commodities = commodities or COMMODITIES
+        self.ensure_indexes()
+        latest = {} if rebuild else self.latest_dates(commodities)
+
+        # Only the tail needed to refill the rolling windows is reloaded,
+        # from the series that is furthest behind
+        start = min(latest.values()) - timedelta(days=self.lookback_days) if latest else None
+        raw = self.loader.load(commodities=commodities, start=start)
+
+        short = self.short_series(raw, latest) if latest else []
+        if short:
+            reload = sorted({key[0] for key in short})
+            print(f"🔁 Feature store: {len(short)} series lack {ROLLING_WINDOW} rows in the lookback, "
+                  f"reloading all history of {', '.join(reload)}")
+            raw = pd.concat([raw[~raw['commodity'].isin(reload)], self.loader.load(commodities=reload)],
+                            ignore_index=True)
+
+        if raw.empty:
+            print("ℹ️ Feature store: no price data to process")
+            return 0
+
+        features = build_features(raw)
+
+        # Keep rows newer than what each series already has
+        if latest:
+            series = pd.MultiIndex.from_frame(features[SERIES_KEYS].astype(object))
+            cutoff = pd.Series(latest).reindex(series).fillna(pd.Timestamp.min)
+            features = features[features['date'].to_numpy() > cutoff.to_numpy(dtype='datetime64[ns]')]
+
+        written = self.write(features)
+        print(f"✅ Feature store: {written} rows written ({len(raw)} raw rows scanned)")
+        return written
+
+    @staticmethod
+    def short_series(raw, latest):
+        """
+        Stored series with new rows but fewer than ROLLING_WINDOW rows up
+        to their stored date, whose windows the reload cannot refill
+        """
+        series = pd.MultiIndex.from_frame(raw[SERIES_KEYS].astype(object))
+        stored = pd.Series(latest).reindex(series).to_numpy(dtype='datetime64[ns]')
+        dates = raw['date'].to_numpy(dtype='datetime64[ns]')
+
+        # Comparisons with NaT (series not stored yet) are False
+        counts = pd.DataFrame({'before': dates <= stored, 'after': dates > stored},
+                              index=series).groupby(level=SERIES_KEYS).sum()
+        return list(counts.index[(counts['after'] > 0) & (counts['before'] < ROLLING_WINDOW)])
+
+    def write(self, features):
+        """Bulk upsert feature rows"""
+        if features.empty:
+            return 0
+
+        now = datetime.now()
+        records = features[SERIES_KEYS + ['date'] + FEATURE_COLUMNS].astype({
+            key: object for key in SERIES_KEYS
+        }).to_dict('records')
+
+        operations = []
+        for record in records:
+            record['date'] = record['date'].to_pydatetime()
+            record['updated_at'] = now
+            key = {k: record[k] for k in SERIES_KEYS + ['date']}
+            operations.append(UpdateOne(key, {'$set': record}, upsert=True))
+
+        for i in range(0, len(operations), MARKET_LOADER_BATCH_SIZE):
+            self.collection.bulk_write(operations[i:i + MARKET_LOADER_BATCH_SIZE], ordered=False)
+
+        return len(operations)
+
+    def load(self, commodities=None, start=None, end=None, limit=None):
+        """
+        Read precomputed features, sorted by series and date
+
+        Args:
+            commodities: List of commodities (None = all)
+            start: Inclusive lower date bound
+            end: Exclusive upper date bound
+            limit: Keep only the latest N rows
+
+        Returns:
+            Feature DataFrame ready for PricePredictor (featurized=True)
+        """
+        projection = {'_id': 0}
+        projection.update({field: 1 for field in SERIES_KEYS + ['date'] + FEATURE_COLUMNS})
+
+        cursor = self.collection.find(
+            self.loader.build_query(commodities, start, end),
+            projection,
+            batch_size=self.loader.batch_size
+        )
+        if limit:
+            cursor = cursor.sort('date', -1).limit(limit)
+
+        return self.from_documents(cursor)
+
+    def load_latest(self, commodities=None, n=LATEST_ROWS_PER_SERIES, start=None):
+        """
+        Latest `n` feature rows of every series in one aggregation round trip
+
+        Args:
+            commodities: List of commodities (None = all)
+            n: Rows kept per series
+            start: Ignore rows before this date (default: the last
+                LATEST_ROWS_WINDOW_DAYS days)
+
+        Returns:
+            Feature DataFrame ready for PricePredictor (featurized=True)
+        """
+        start = start or datetime.now() - timedelta(days=LATEST_ROWS_WINDOW_DAYS)
+        query = self.loader.build_query(commodities, start)
+        return self.from_documents(run_latest_rows(self.collection, query, ['date'] + FEATURE_COLUMNS, n))
+
+    @staticmethod
+    def from_documents(documents):
+        """Typed feature DataFrame sorted by series and date"""
+        df = pd.DataFrame(list(documents), columns=SERIES_KEYS + ['date'] + FEATURE_COLUMNS)
+        for key in SERIES_KEYS:
+            df[key] = df[key].astype('category')
+        df['date'] = pd.to_datetime(df['date'])
+        df[FEATURE_COLUMNS] = df[FEATURE_COLUMNS].astype(np.float32)
+
+        return df.sort_values(SERIES_KEYS + ['date'], ignore_index=True)
+
+
+if __name__ == "__main__":
+    store = FeatureStore()
+    rebuild = '--rebuild' in sys.argv
+    store.update(rebuild=rebuild)
@@ -0,0 +1,157 @@
+"""
+Forecast Read API
+Serves the pre-serialized forecast snapshots over HTTP with ETag / 304
+support. Requests never touch a model or build JSON.
+
+Usage:
+    python services/forecast_api.py
+
+    GET /forecasts/<commodity>           every state and market
+    GET /forecasts/<commodity>/<state>   one state
+    GET /health
+"""
+
+import sys
+import json
+import threading
+from pathlib import Path
+from urllib.parse import unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import FORECAST_API_HOST, FORECAST_API_PORT, FORECAST_API_REFRESH_SECONDS
+from services.forecast_store import ForecastStore, snapshot_key
+
+
+class SnapshotCache:
+    """
+    In-memory copy of the snapshot collection
+
+    A background thread pulls only snapshots of the last seen generation
+    or newer, so readers always hit a dict of ready-to-send bytes. The
+    last generation is pulled again in case it was still being written;
+    entries whose ETag did not change are skipped and tombstones evict.
+    """
+
+    def __init__(self, store, refresh_seconds=FORECAST_API_REFRESH_SECONDS):
+        self.store = store
+        self.refresh_seconds = refresh_seconds
+        self.entries = {}  # key -> (body bytes, quoted etag)
+        self.generation = None
+        self._stop = threading.Event()
+
+    def refresh(self):
+        """Pull changed snapshots; returns how many were replaced or evicted"""
+        changed = 0
+        for snapshot in self.store.load_snapshots(since=self.generation):
+            key, generation = snapshot['key'], snapshot.get('generation')
+            if generation is not None and (self.generation is None or generation > self.generation):
+                self.generation = generation
+
+            if snapshot['body'] is None:
+                changed += self.entries.pop(key, None) is not None
+                continue
+            etag = f'"{snapshot["etag"]}"'
+            current = self.entries.get(key)
+            if current is None or current[1] != etag:
+                self.entries[key] = (snapshot['body'].encode('utf-8'), etag)
+                changed += 1
+        return changed
+
+    def _poll(self):
+        while not self._stop.wait(self.refresh_seconds):
+            try:
+                changed = self.refresh()
+                if changed:
+                    print(f"🔄 Forecast API: {changed} snapshots refreshed")
+            except Exception as e:
+                print(f"⚠️ Forecast API refresh failed: {e}")
+
+    def start(self):
+        self.refresh()
+        threading.Thread(target=self._poll, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def get(self, key):
+        return self.entries.get(key)
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Whether an If-None-Match header matches a quoted ETag
+
+    The header is a comma-separated list of entity tags or `*`; the
+    comparison is weak (RFC 7232), so a W/ prefix is ignored.
+    """
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    if '*' in tags:
+        return True
+    etag = etag.removeprefix('W/')
+    return any(tag.removeprefix('W/') == etag for tag in tags)
+
+
+class ForecastRequestHandler(BaseHTTPRequestHandler):
+    cache = None  # SnapshotCache, set by serve()
+
+    def _send(self, status, body=b'', etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')  # revalidate; a 304 is nearly free
+        if status != 304:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        if status != 304 and self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def do_GET(self):
+        parts = [unquote(part) for part in self.path.split('?')[0].strip('/').split('/') if part]
+
+        if parts == ['health']:
+            body = json.dumps({'status': 'ok', 'snapshots': len(self.cache.entries)}).encode()
+            return self._send(200, body)
+
+        if not parts or parts[0] != 'forecasts' or len(parts) not in (2, 3):
+            return self._send(404, b'{"error":"not found"}')
+
+        entry = self.cache.get(snapshot_key(*parts[1:]))
+        if entry is None:
+            return self._send(404, b'{"error":"no forecast for this commodity/state"}')
+
+        body, etag = entry
+        if etag_matches(self.headers.get('If-None-Match'), etag):
+            return self._send(304, etag=etag)
+        return self._send(200, body, etag)
+
+    do_HEAD = do_GET
+
+    def log_message(self, format, *args):
+        pass  # polling dashboards would flood the console
+
+
+def serve(host=FORECAST_API_HOST, port=FORECAST_API_PORT, store=None):
+    """Run the API until interrupted"""
+    cache = SnapshotCache(store or ForecastStore())
+    cache.start()
+    ForecastRequestHandler.cache = cache
+
+    server = ThreadingHTTPServer((host, port), ForecastRequestHandler)
+    print(f"🌐 Forecast API on http://{host}:{port} ({len(cache.entries)} snapshots)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cache.stop()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,172 @@
+"""
+Forecast Store
+Persists every pipeline run's forecasts in MongoDB and publishes
+pre-serialized JSON snapshots per commodity and state for the read API
+"""
+
+import sys
+import json
+import hashlib
+from pathlib import Path
+from datetime import datetime
+from pymongo import MongoClient, UpdateOne, ASCENDING, ReturnDocument
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import MONGO_URI, MARKET_LOADER_BATCH_SIZE
+from models.feature_engine import SERIES_KEYS
+
+PREDICTION_FIELDS = ('date', 'day', 'predicted_price', 'lower_price', 'upper_price', 'confidence', 'method')
+
+
+def snapshot_key(commodity, state=None):
+    """Snapshot id for a commodity (all states) or one commodity/state pair"""
+    return commodity if state is None else f'{commodity}|{state}'
+
+
+class ForecastStore:
+    """
+    `forecasts`: one document per (series, run date), rewritten if the
+    pipeline runs again the same day.
+    `forecastsnapshots`: the serving copy, one JSON string plus its ETag
+    per commodity and per commodity/state, so the API never serializes
+    or queries per request. Every publish stamps its snapshots with the
+    next generation number; keys of a published commodity that the run
+    no longer covers become tombstones (body None) of that generation.
+    """
+
+    def __init__(self, db=None):
+        if db is None:
+            self.client = MongoClient(MONGO_URI)
+            db = self.client['techsprint']  # Match Node.js database name
+        self.db = db
+        self.collection = db['forecasts']
+        self.snapshots = db['forecastsnapshots']
+        self.meta = db['forecastsnapshotmeta']
+
+    def ensure_indexes(self):
+        """One forecast per series and run date; snapshots by key"""
+        self.collection.create_index(
+            [(key, ASCENDING) for key in SERIES_KEYS] + [('run_date', ASCENDING)],
+            unique=True
+        )
+        self.collection.create_index([('run_date', ASCENDING)])
+        self.snapshots.create_index([('key', ASCENDING)], unique=True)
+        self.snapshots.create_index([('generation', ASCENDING)])
+
+    @staticmethod
+    def _document(key, predictions, run_date, created_at):
+        commodity, state, market = key
+        return {
+            'commodity': commodity,
+            'state': state,
+            'market': market,
+            'level': predictions[0].get('level', 'market') if predictions else 'market',
+            'run_date': run_date,
+            'predictions': [
+                {field: pred[field] for field in PREDICTION_FIELDS if field in pred}
+                for pred in predictions
+            ],
+            'created_at': created_at
+        }
+
+    def write(self, forecasts, run_date=None):
+        """
+        Bulk upsert one run's forecasts
+
+        Args:
+            forecasts: Dict of (commodity, state, market) -> prediction dicts
+            run_date: Day of the run (default: today)
+
+        Returns:
+            List of stored documents
+        """
+        now = datetime.now()
+        run_date = run_date or datetime(now.year, now.month, now.day)
+        documents = [self._document(key, predictions, run_date, now)
+                     for key, predictions in forecasts.items()]
+
+        operations = [
+            UpdateOne({k: doc[k] for k in SERIES_KEYS + ['run_date']}, {'$set': doc}, upsert=True)
+            for doc in documents
+        ]
+        for i in range(0, len(operations), MARKET_LOADER_BATCH_SIZE):
+            self.collection.bulk_write(operations[i:i + MARKET_LOADER_BATCH_SIZE], ordered=False)
+
+        return documents
+
+    def next_generation(self):
+        """Atomically take the next snapshot generation number"""
+        doc = self.meta.find_one_and_update({'_id': 'generation'}, {'$inc': {'value': 1}},
+                                            upsert=True, return_document=ReturnDocument.AFTER)
+        return doc['value']
+
+    def publish_snapshots(self, documents, run_date):
+        """Serialize the run once per commodity and commodity/state"""
+        groups = {}
+        for doc in documents:
+            entry = {'market': doc['market'], 'state': doc['state'], 'level': doc['level'],
+                     'predictions': doc['predictions']}
+            groups.setdefault(snapshot_key(doc['commodity']), []).append(entry)
+            groups.setdefault(snapshot_key(doc['commodity'], doc['state']), []).append(entry)
+
+        generation = self.next_generation()
+        now = datetime.now()
+        operations = []
+        for key, series in groups.items():
+            commodity, _, state = key.partition('|')
+            body = json.dumps({
+                'commodity': commodity,
+                'state': state or None,
+                'run_date': run_date.isoformat(),
+                'series': series
+            }, ensure_ascii=False, separators=(',', ':'), default=str)
+            etag = hashlib.sha1(body.encode('utf-8')).hexdigest()
+            operations.append(UpdateOne(
+                {'key': key},
+                {'$set': {'key': key, 'commodity': commodity, 'body': body, 'etag': etag, 'run_date': run_date,
+                          'generation': generation, 'updated_at': now}},
+                upsert=True
+            ))
+
+        if operations:
+            self.snapshots.bulk_write(operations, ordered=False)
+
+        # States a published commodity no longer has forecasts for
+        self.snapshots.update_many(
+            {'commodity': {'$in': sorted({doc['commodity'] for doc in documents})},
+             'key': {'$nin': list(groups)}, 'body': {'$ne': None}},
+            {'$set': {'body': None, 'etag': None, 'generation': generation, 'updated_at': now}}
+        )
+        return len(operations)
+
+    def publish(self, forecasts, run_date=None):
+        """
+        Store a run and refresh the serving snapshots
+
+        Returns:
+            Number of forecast documents written
+        """
+        if not forecasts:
+            return 0
+
+        self.ensure_indexes()
+        documents = self.write(forecasts, run_date)
+        n_snapshots = self.publish_snapshots(documents, documents[0]['run_date'])
+        print(f"💾 Stored {len(documents)} forecasts and {n_snapshots} API snapshots")
+        return len(documents)
+
+    def load_snapshots(self, since=None):
+        """
+        Snapshots of generation `since` or newer (all when None)
+
+        The `since` generation itself is included because a reader may
+        have polled while that publish was still being written.
+
+        Returns:
+            List of {key, body, etag, generation} dicts (body None for
+            a removed key)
+        """
+        query = {'generation': {'$gte': since}} if since is not None else {}
+        projection = {'_id': 0, 'key': 1, 'body': 1, 'etag': 1, 'generation': 1}
+        return list(self.snapshots.find(query, projection))
@@ -0,0 +1,237 @@
+"""
+Columnar Market Price Loader
+Streams marketprices documents from MongoDB into typed NumPy columns
+"""
+
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from pymongo import MongoClient, ASCENDING
+from pymongo.errors import OperationFailure
+from config import MONGO_URI, MARKET_LOADER_BATCH_SIZE, LATEST_ROWS_PER_SERIES, LATEST_ROWS_WINDOW_DAYS
+from models.feature_engine import SERIES_KEYS
+
+
+def latest_rows_pipeline(query, fields, n, top_n=True):
+    """
+    Aggregation returning the latest `n` rows of every matching series
+
+    With `top_n` the server keeps a bounded heap per series ($topN,
+    MongoDB 5.2+). Otherwise rows are sorted by series and date (served
+    backwards by the (commodity, state, market, date) index) and each
+    series' pushed list is sliced to `n`.
+
+    Args:
+        query: $match filter, normally a commodity list and date window
+        fields: Row fields to return besides the series keys
+        n: Rows kept per series
+
+    Returns:
+        Pipeline yielding one {_id: series keys, rows: [...]} per series
+    """
+    row = {field: f'${field}' for field in fields}
+    group_id = {key: f'${key}' for key in SERIES_KEYS}
+
+    if top_n:
+        return [
+            {'$match': query},
+            {'$group': {'_id': group_id, 'rows': {'$topN': {'n': n, 'sortBy': {'date': -1}, 'output': row}}}}
+        ]
+    return [
+        {'$match': query},
+        {'$sort': {key: -1 for key in SERIES_KEYS + ['date']}},
+        {'$group': {'_id': group_id, 'rows': {'$push': row}}},
+        {'$project': {'rows': {'$slice': ['$rows', n]}}}
+    ]
+
+
+def unwind_series(groups):
+    """Flatten grouped series back into row dicts carrying their keys"""
+    for group in groups:
+        for row in group['rows']:
+            row.update(group['_id'])
+            yield row
+
+
+def run_latest_rows(collection, query, fields, n):
+    """
+    Run the latest-rows pipeline, falling back to $push/$slice on servers
+    without $topN
+
+    Returns:
+        Iterator of row dicts (one round trip, batched cursor)
+    """
+    try:
+        groups = collection.aggregate(latest_rows_pipeline(query, fields, n), allowDiskUse=True)
+    except OperationFailure:
+        groups = collection.aggregate(latest_rows_pipeline(query, fields, n, top_n=False), allowDiskUse=True)
+    return unwind_series(groups)
+
+
+class MarketDataLoader:
+    """
+    Loads training/prediction data without materializing full documents
+
+    Only the projected fields are requested, the cursor is read in
+    batches of `batch_size`, and every batch is written directly into
+    preallocated arrays: datetime64 dates, float32 prices and int32 codes
+    for commodity/market/state, which become pandas categoricals.
+    """
+
+    CATEGORICAL_FIELDS = ('commodity', 'market', 'state')
+
+    def __init__(self, db=None, batch_size=MARKET_LOADER_BATCH_SIZE):
+        if db is None:
+            self.client = MongoClient(MONGO_URI)
+            db = self.client['techsprint']  # Match Node.js database name
+        self.db = db
+        self.collection = db['marketprices']
+        self.batch_size = batch_size
+
+    def ensure_indexes(self):
+        """
+        Series-then-date index behind the latest-rows and current-price
+        aggregations: $match on commodity, per-series date order
+        """
+        self.collection.create_index([(key, ASCENDING) for key in SERIES_KEYS] + [('date', ASCENDING)])
+
+    def build_query(self, commodities=None, start=None, end=None):
+        """Mongo filter for a commodity list and an optional date window"""
+        query = {}
+
+        if commodities:
+            query['commodity'] = {'$in': list(commodities)}
+
+        if start or end:
+            query['date'] = {}
+            if start:
+                query['date']['$gte'] = start
+            if end:
+                query['date']['$lt'] = end
+
+        return query
+
+    def load(self, commodities=None, start=None, end=None, limit=None):
+        """
+        Load price rows as a columnar DataFrame
+
+        Args:
+            commodities: List of commodities (None = all)
+            start: Inclusive lower date bound (None = unbounded)
+            end: Exclusive upper date bound (None = unbounded)
+            limit: Keep only the latest N rows (None = whole window)
+
+        Returns:
+            DataFrame with date, modal_price, commodity, market, state
+        """
+        projection = {'_id': 0, 'date': 1, 'modal_price': 1}
+        projection.update({field: 1 for field in self.CATEGORICAL_FIELDS})
+
+        cursor = self.collection.find(
+            self.build_query(commodities, start, end),
+            projection,
+            batch_size=self.batch_size
+        )
+
+        if limit:
+            cursor = cursor.sort('date', -1).limit(limit)
+
+        return self.from_documents(cursor)
+
+    def load_latest(self, commodities=None, n=LATEST_ROWS_PER_SERIES, start=None):
+        """
+        Latest `n` rows of every series in one aggregation round trip
+
+        Args:
+            commodities: List of commodities (None = all)
+            n: Rows kept per series
+            start: Ignore rows before this date (default: the last
+                LATEST_ROWS_WINDOW_DAYS days)
+
+        Returns:
+            DataFrame with date, modal_price, commodity, market, state
+        """
+        start = start or datetime.now() - timedelta(days=LATEST_ROWS_WINDOW_DAYS)
+        query = self.build_query(commodities, start)
+        return self.from_documents(run_latest_rows(self.collection, query, ['date', 'modal_price'], n))
+
+    def current_prices(self, commodities=None, start=None):
+        """
+        Most recent modal price of every series, in one aggregation
+
+        Args:
+            commodities: List of commodities (None = all)
+            start: Ignore rows before this date (default: the last
+                LATEST_ROWS_WINDOW_DAYS days)
+
+        Returns:
+            Dict of (commodity, state, market) -> (modal_price, date)
+        """
+        start = start or datetime.now() - timedelta(days=LATEST_ROWS_WINDOW_DAYS)
+        rows = run_latest_rows(self.collection, self.build_query(commodities, start),
+                               ['date', 'modal_price'], 1)
+        return {
+            tuple(row.get(key) or 'Unknown' for key in SERIES_KEYS): (row['modal_price'], row['date'])
+            for row in rows
+        }
+
+    def from_documents(self, documents):
+        """
+        Convert an iterable of price documents into typed columns
+
+        Args:
+            documents: Cursor or iterable of dicts
+
+        Returns:
+            DataFrame sorted by date
+        """
+        size = self.batch_size
+        categories = {field: {} for field in self.CATEGORICAL_FIELDS}
+        chunks = []
+
+        dates = np.empty(size, dtype='datetime64[ms]')
+        prices = np.empty(size, dtype=np.float32)
+        codes = {field: np.empty(size, dtype=np.int32) for field in self.CATEGORICAL_FIELDS}
+        filled = 0
+
+        for doc in documents:
+            date = doc.get('date')
+            if not isinstance(date, datetime):
+                continue
+
+            dates[filled] = date
+            prices[filled] = doc.get('modal_price') or np.nan
+
+            for field in self.CATEGORICAL_FIELDS:
+                lookup = categories[field]
+                value = doc.get(field) or 'Unknown'
+                code = lookup.get(value)
+                if code is None:
+                    code = lookup[value] = len(lookup)
+                codes[field][filled] = code
+
+            filled += 1
+
+            # Batch full: keep it and start a new one
+            if filled == size:
+                chunks.append((dates, prices, codes))
+                dates = np.empty(size, dtype='datetime64[ms]')
+                prices = np.empty(size, dtype=np.float32)
+                codes = {field: np.empty(size, dtype=np.int32) for field in self.CATEGORICAL_FIELDS}
+                filled = 0
+
+        chunks.append((dates[:filled], prices[:filled], {f: c[:filled] for f, c in codes.items()}))
+
+        columns = {
+            'date': np.concatenate([chunk[0] for chunk in chunks]).astype('datetime64[ns]'),
+            'modal_price': np.concatenate([chunk[1] for chunk in chunks])
+        }
+
+        for field in self.CATEGORICAL_FIELDS:
+            columns[field] = pd.Categorical.from_codes(
+                np.concatenate([chunk[2][field] for chunk in chunks]),
+                categories=list(categories[field])
+            )
+
+        df = pd.DataFrame(columns)
+        return df.sort_values('date', kind='stable', ignore_index=True)
@@ -0,0 +1,279 @@
+"""
+Streaming Price Alerts
+Tails the marketprices change stream and raises spike/drop alerts within
+seconds of a scraper writing an unusual price, without waiting for the
+next pipeline run. Change streams need a replica set; a single-node
+replica set works locally (mongod --replSet rs0, then rs.initiate()).
+
+Usage:
+    python services/price_stream.py
+"""
+
+import sys
+import time
+from pathlib import Path
+from datetime import datetime
+import numpy as np
+from pymongo import MongoClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import (MONGO_URI, PRICE_DROP_THRESHOLD, PRICE_SPIKE_THRESHOLD, BASELINE_HISTORY,
+                    STREAM_EWMA_ALPHA, STREAM_Z_THRESHOLD, STREAM_MIN_OBSERVATIONS, STREAM_BATCH_SIZE,
+                    STREAM_BATCH_SECONDS)
+from models.baselines import price_matrix
+from models.feature_engine import SERIES_KEYS
+from services.market_data_loader import MarketDataLoader
+
+WATCHED_OPERATIONS = ['insert', 'update', 'replace']  # scrapers upsert
+
+
+class SeriesStats:
+    """
+    Exponentially weighted mean and variance of every series
+
+    State lives in flat NumPy arrays indexed by series number, so folding
+    a micro-batch in is a handful of vector operations however many
+    series it touches.
+    """
+
+    def __init__(self, alpha=STREAM_EWMA_ALPHA, capacity=1024):
+        self.alpha = alpha
+        self.index = {}  # (commodity, state, market) -> row
+        self.mean = np.full(capacity, np.nan)
+        self.var = np.zeros(capacity)
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self.last_day = np.full(capacity, np.datetime64('NaT'), dtype='datetime64[D]')
+
+    def __len__(self):
+        return len(self.index)
+
+    def _grow(self, size):
+        capacity = len(self.mean)
+        if size <= capacity:
+            return
+        extra = max(size, 2 * capacity) - capacity
+        self.mean = np.concatenate([self.mean, np.full(extra, np.nan)])
+        self.var = np.concatenate([self.var, np.zeros(extra)])
+        self.count = np.concatenate([self.count, np.zeros(extra, dtype=np.int64)])
+        self.last_day = np.concatenate([self.last_day, np.full(extra, np.datetime64('NaT'), dtype='datetime64[D]')])
+
+    def rows(self, keys):
+        """Row number of every key, adding unseen series"""
+        rows = np.empty(len(keys), dtype=np.int64)
+        for i, key in enumerate(keys):
+            row = self.index.get(key)
+            if row is None:
+                row = self.index[key] = len(self.index)
+            rows[i] = row
+        self._grow(len(self.index))
+        return rows
+
+    def fold(self, rows, prices, days):
+        """Update unique rows with one new price each"""
+        mean = self.mean[rows]
+        first = self.count[rows] == 0
+        diff = prices - mean
+        step = self.alpha * diff
+
+        self.mean[rows] = np.where(first, prices, mean + step)
+        self.var[rows] = np.where(first, 0.0, (1 - self.alpha) * (self.var[rows] + diff * step))
+        self.count[rows] += 1
+        self.last_day[rows] = days
+
+    def seed(self, df, history=BASELINE_HISTORY):
+        """Warm the state from the latest stored prices of every series"""
+        keys, Y, origin = price_matrix(df, history)
+        if not keys:
+            return
+        rows = self.rows(keys)
+        for column in Y.T:
+            has = ~np.isnan(column)
+            self.fold(rows[has], column[has], origin[has])
+
+
+class PriceStream:
+    """
+    Change stream consumer
+
+    Events are pulled into micro-batches of up to STREAM_BATCH_SIZE or
+    STREAM_BATCH_SECONDS. Each batch is scored against the state before
+    it and then folded in, and its alerts go through AlertGenerator.publish
+    (suppression, targeting, outbox). The resume token is stored after
+    each batch, so a restart continues where it stopped.
+    """
+
+    def __init__(self, db=None, alert_gen=None, alpha=STREAM_EWMA_ALPHA, z_threshold=STREAM_Z_THRESHOLD,
+                 min_observations=STREAM_MIN_OBSERVATIONS, batch_size=STREAM_BATCH_SIZE,
+                 batch_seconds=STREAM_BATCH_SECONDS):
+        if db is None:
+            self.client = MongoClient(MONGO_URI)
+            db = self.client['techsprint']  # Match Node.js database name
+        self.db = db
+        self.collection = db['marketprices']
+        self.meta = db['streamstate']
+        self.stats = SeriesStats(alpha)
+        self.alert_gen = alert_gen
+        self.z_threshold = z_threshold
+        self.min_observations = min_observations
+        self.batch_size = batch_size
+        self.batch_seconds = batch_seconds
+
+    def warm_start(self):
+        df = MarketDataLoader(self.db).load_latest()
+        self.stats.seed(df)
+        print(f"🔥 Stream state warmed with {len(self.stats)} series")
+
+    def resume_token(self):
+        doc = self.meta.find_one({'_id': 'marketprices'})
+        return doc['resume_token'] if doc else None
+
+    def save_token(self, token):
+        self.meta.update_one({'_id': 'marketprices'},
+                             {'$set': {'resume_token': token, 'updated_at': datetime.now()}}, upsert=True)
+
+    @staticmethod
+    def _events(documents):
+        """Key, price and day arrays of usable price documents"""
+        keys, prices, days = [], [], []
+        for doc in documents:
+            price, date = doc.get('modal_price'), doc.get('date')
+            if not price or price <= 0 or not isinstance(date, datetime):
+                continue
+            keys.append(tuple(doc.get(key) or 'Unknown' for key in SERIES_KEYS))
+            prices.append(price)
+            days.append(date)
+        return keys, np.array(prices, dtype=np.float64), np.array(days, dtype='datetime64[D]')
+
+    def process(self, documents):
+        """
+        Score and fold in one micro-batch of price documents
+
+        Returns:
+            List of alert dicts
+        """
+        keys, prices, days = self._events(documents)
+        if not keys:
+            return []
+
+        rows = self.stats.rows(keys)
+        # Oldest first, then one pass per repeat of a series within the batch
+        order = np.lexsort((days, rows))
+        rows, prices, days = rows[order], prices[order], days[order]
+        keys = [keys[i] for i in order]
+        repeat = np.arange(len(rows)) - np.searchsorted(rows, rows)
+
+        alerts = []
+        for r in range(repeat.max() + 1):
+            take = np.flatnonzero(repeat == r)
+            # Only newer days count; re-scrapes of a known day are corrections
+            last = self.stats.last_day[rows[take]]
+            take = take[np.isnat(last) | (days[take] > last)]
+            if not len(take):
+                continue
+
+            r_rows, r_prices = rows[take], prices[take]
+            mean = self.stats.mean[r_rows]
+            std = np.sqrt(self.stats.var[r_rows])
+            with np.errstate(divide='ignore', invalid='ignore'):
+                change = r_prices / mean - 1
+                z = np.abs(r_prices - mean) / std
+
+            unusual = ((self.stats.count[r_rows] >= self.min_observations) & (z >= self.z_threshold)
+                       & ((change <= -PRICE_DROP_THRESHOLD) | (change >= PRICE_SPIKE_THRESHOLD)))
+            for i in np.flatnonzero(unusual):
+                alerts.append(self._build_alert(keys[take[i]], float(r_prices[i]), float(mean[i]),
+                                                float(change[i]), float(z[i])))
+
+            self.stats.fold(r_rows, r_prices, days[take])
+
+        return alerts
+
+    @staticmethod
+    def _build_alert(key, price, mean, change_pct, z):
+        commodity, state, market = key
+        price = round(price, 2)
+
+        if change_pct < 0:
+            alert = {
+                'type': 'PRICE_DROP',
+                'severity': 'HIGH' if change_pct <= -0.15 else 'MEDIUM',
+                'title': f"{commodity} Price Crash at {market}",
+                'message': f"{commodity} at {market} fell {abs(change_pct)*100:.1f}% below its recent average to ₹{price}/quintal.",
+                'messageHindi': f"{market} में {commodity} का भाव {abs(change_pct)*100:.1f}% गिरकर ₹{price}/क्विंटल हो गया।"
+            }
+        else:
+            alert = {
+                'type': 'PRICE_SPIKE',
+                'severity': 'MEDIUM',
+                'title': f"{commodity} Price Jump at {market}",
+                'message': f"{commodity} at {market} rose {change_pct*100:.1f}% above its recent average to ₹{price}/quintal.",
+                'messageHindi': f"{market} में {commodity} का भाव {change_pct*100:.1f}% बढ़कर ₹{price}/क्विंटल हो गया।"
+            }
+
+        alert.update({
+            'commodity': commodity,
+            'state': state,
+            'market': market,
+            'current_price': price,
+            'average_price': round(mean, 2),
+            'change_percentage': round(change_pct * 100, 1),
+            'targetUsers': [],
+            'targetStates': [],
+            'metadata': {
+                'source': 'Price_Stream',
+                # Chebyshev: at most 1/z² of prices stray this far by chance
+                'confidence': round(1 - 1 / z ** 2, 3) if np.isfinite(z) else 1.0,
+                'actionable': True
+            },
+            'createdAt': datetime.now()
+        })
+        return alert
+
+    def batches(self):
+        """
+        Micro-batches of changed price documents
+
+        Yields:
+            (documents list, resume token after the batch)
+        """
+        pipeline = [{'$match': {'operationType': {'$in': WATCHED_OPERATIONS}}}]
+        with self.collection.watch(pipeline, full_document='updateLookup', resume_after=self.resume_token(),
+                                   max_await_time_ms=int(self.batch_seconds * 1000)) as stream:
+            while stream.alive:
+                batch = []
+                deadline = time.monotonic() + self.batch_seconds
+                while len(batch) < self.batch_size and time.monotonic() < deadline:
+                    change = stream.try_next()
+                    if change is None:
+                        break
+                    if change.get('fullDocument'):
+                        batch.append(change['fullDocument'])
+                yield batch, stream.resume_token
+
+    def run(self):
+        """Warm up, then alert on the stream until interrupted"""
+        if self.alert_gen is None:
+            from alert_engine.alert_generator import AlertGenerator
+            self.alert_gen = AlertGenerator()
+        self.warm_start()
+        print("📡 Watching marketprices for price shocks...")
+
+        try:
+            for batch, token in self.batches():
+                if batch:
+                    started = time.perf_counter()
+                    alerts = self.process(batch)
+                    published = self.alert_gen.publish(alerts) if alerts else []
+                    print(f"📥 {len(batch)} price updates in {(time.perf_counter() - started) * 1000:.0f}ms, "
+                          f"{len(published)} alerts")
+                    self.save_token(token)
+        finally:
+            self.alert_gen.close()
+
+
+if __name__ == "__main__":
+    try:
+        PriceStream().run()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,219 @@
+"""
+Pipeline Scheduler Daemon
+Runs scraping, weather, news and forecasting on their own schedules in
+one long-lived process, so imports, Mongo connections, scraper sessions
+and cached models stay warm between runs
+
+Usage:
+    python services/scheduler.py [--run-now]
+
+    GET /status   every job's schedule, last run and next run
+    GET /health
+"""
+
+import sys
+import json
+import time
+import threading
+import traceback
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import schedule
+from pymongo import MongoClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import (MONGO_URI, SCHEDULE_SCRAPE_HOURS, SCHEDULE_WEATHER_MINUTES, SCHEDULE_NEWS_MINUTES,
+                    SCHEDULE_FORECAST_AT, SCHEDULER_STATUS_HOST, SCHEDULER_STATUS_PORT)
+
+
+class ScheduledJob:
+    """
+    One named task plus its run history
+
+    A non-blocking lock guards the task: when a run is still going at the
+    next trigger, that trigger is recorded as skipped instead of starting
+    a second, overlapping run.
+    """
+
+    def __init__(self, name, task, every):
+        self.name = name
+        self.task = task
+        self.every = every  # human-readable schedule
+        self.schedule_job = None
+        self._lock = threading.Lock()
+        self.status = {
+            'running': False, 'runs': 0, 'failures': 0, 'skipped': 0,
+            'last_start': None, 'last_end': None, 'last_duration': None,
+            'last_result': None, 'last_error': None
+        }
+
+    def run(self):
+        if not self._lock.acquire(blocking=False):
+            self.status['skipped'] += 1
+            print(f"⏭️ {self.name}: previous run still in progress, skipping")
+            return
+
+        started = time.perf_counter()
+        self.status.update(running=True, last_start=datetime.now())
+        try:
+            result = self.task()
+            self.status.update(last_result=result, last_error=None)
+            print(f"✅ {self.name} finished in {time.perf_counter() - started:.1f}s")
+        except Exception as e:
+            self.status['failures'] += 1
+            self.status['last_error'] = f"{type(e).__name__}: {e}"
+            print(f"❌ {self.name} failed: {e}")
+            traceback.print_exc()
+        finally:
+            self.status['runs'] += 1
+            self.status.update(running=False, last_end=datetime.now(),
+                               last_duration=round(time.perf_counter() - started, 2))
+            self._lock.release()
+
+    def describe(self):
+        next_run = self.schedule_job.next_run if self.schedule_job else None
+        return dict(self.status, name=self.name, every=self.every, next_run=next_run)
+
+
+class PipelineScheduler:
+    """
+    Owns the warm state shared by every job: one Mongo client, the data
+    aggregator with its scraper sessions, the alert generator with its
+    subscription index and outbox dispatcher, and the process-wide model
+    registry that PricePredictor loads through
+
+    The schedule loop only dispatches; jobs run on a thread pool with one
+    thread per job, so a long forecast never delays the news poll.
+    """
+
+    def __init__(self, db=None):
+        # Heavy imports once per process, not once per run
+        from scrapers.data_aggregator import DataAggregator
+        from alert_engine.alert_outbox import OutboxDispatcher
+        from alert_engine.alert_generator import AlertGenerator
+        from main import run_pipeline
+
+        if db is None:
+            self.client = MongoClient(MONGO_URI)
+            db = self.client['techsprint']  # Match Node.js database name
+        self.db = db
+        self.aggregator = DataAggregator()
+        self.run_pipeline = run_pipeline
+        # One generator for every forecast run, on this client (alerts live in 'test')
+        self.alert_gen = AlertGenerator(db.client['test'], users_db=db)
+        # Retries alerts the backend has not acknowledged yet, between runs too
+        self.dispatcher = OutboxDispatcher(self.alert_gen.outbox).start()
+        self.alert_gen.dispatcher = self.dispatcher
+
+        self.scheduler = schedule.Scheduler()
+        self.jobs = {}
+        self.add_job('scrape', self.scrape, f'every {SCHEDULE_SCRAPE_HOURS} hours',
+                     self.scheduler.every(SCHEDULE_SCRAPE_HOURS).hours)
+        self.add_job('weather', self.aggregator.weather_service.run, f'every {SCHEDULE_WEATHER_MINUTES} minutes',
+                     self.scheduler.every(SCHEDULE_WEATHER_MINUTES).minutes)
+        self.add_job('news', self.aggregator.news_parser.run, f'every {SCHEDULE_NEWS_MINUTES} minutes',
+                     self.scheduler.every(SCHEDULE_NEWS_MINUTES).minutes)
+        self.add_job('forecast', self.forecast, f'daily at {SCHEDULE_FORECAST_AT}',
+                     self.scheduler.every().day.at(SCHEDULE_FORECAST_AT))
+
+        self.pool = ThreadPoolExecutor(max_workers=len(self.jobs), thread_name_prefix='job')
+        self._stop = threading.Event()
+
+    def add_job(self, name, task, every, trigger):
+        """Register a task under a `schedule` trigger"""
+        job = ScheduledJob(name, task, every)
+        job.schedule_job = trigger.do(self.dispatch, job)
+        self.jobs[name] = job
+        return job
+
+    def dispatch(self, job):
+        """Hand a due job to the pool (returns at once)"""
+        self.pool.submit(job.run)
+
+    def scrape(self):
+        stats = self.aggregator.collect_market_data()
+        return stats['total_market_records']
+
+    def forecast(self):
+        # Prices come from the scrape job. The pipeline trains one version on
+        # every commodity, and each series contributes only the rows newer
+        # than its own watermark, so the model extends incrementally
+        summary = self.run_pipeline(train=True, incremental=True, monitor=True, db=self.db, scrape=False,
+                                    alert_gen=self.alert_gen)
+        training = summary['training'] or {}
+        return dict(summary, training={key: training.get(key) for key in ('mode', 'version', 'mae')})
+
+    def status(self):
+        status = {name: job.describe() for name, job in self.jobs.items()}
+        try:
+            status['alert_outbox'] = self.dispatcher.outbox.counts()
+        except Exception as e:
+            status['alert_outbox'] = {'error': str(e)}
+        return status
+
+    def run_all(self):
+        """Trigger every job now"""
+        for job in self.jobs.values():
+            self.dispatch(job)
+
+    def run_forever(self, poll_seconds=1):
+        while not self._stop.wait(poll_seconds):
+            self.scheduler.run_pending()
+
+    def stop(self):
+        self._stop.set()
+        self.pool.shutdown(wait=True)
+        self.dispatcher.stop()
+
+
+class StatusRequestHandler(BaseHTTPRequestHandler):
+    scheduler = None  # PipelineScheduler, set by serve_status()
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split('?')[0].rstrip('/')
+        if path == '/health':
+            return self._send(200, {'status': 'ok'})
+        if path == '/status':
+            return self._send(200, self.scheduler.status())
+        return self._send(404, {'error': 'not found'})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_status(scheduler, host=SCHEDULER_STATUS_HOST, port=SCHEDULER_STATUS_PORT):
+    """Start the status endpoint on a background thread"""
+    StatusRequestHandler.scheduler = scheduler
+    server = ThreadingHTTPServer((host, port), StatusRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"🌐 Scheduler status on http://{host}:{port}/status")
+    return server
+
+
+if __name__ == "__main__":
+    scheduler = PipelineScheduler()
+    server = serve_status(scheduler)
+
+    for job in scheduler.jobs.values():
+        print(f"🗓️ {job.name}: {job.every}")
+    if '--run-now' in sys.argv:
+        scheduler.run_all()
+
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        scheduler.stop()
@@ -0,0 +1,28 @@
+import pytest
+from pymongo.errors import OperationFailure
+
+
+@pytest.fixture
+def mongo_db(monkeypatch):
+    """
+    In-memory database (skips when mongomock is not installed)
+
+    Behaves like a server older than MongoDB 5.2: stages mongomock does
+    not implement, such as $topN, fail with OperationFailure.
+    """
+    mongomock = pytest.importorskip('mongomock')
+    # Newer pymongo passes `sort` to bulk updates, which mongomock predates
+    add_update = mongomock.collection.BulkOperationBuilder.add_update
+    monkeypatch.setattr(mongomock.collection.BulkOperationBuilder, 'add_update',
+                        lambda self, *args, sort=None, **kwargs: add_update(self, *args, **kwargs))
+
+    aggregate = mongomock.collection.Collection.aggregate
+
+    def old_server_aggregate(self, pipeline, *args, **kwargs):
+        try:
+            return aggregate(self, pipeline, *args, **kwargs)
+        except NotImplementedError as e:
+            raise OperationFailure(str(e), code=15952)
+
+    monkeypatch.setattr(mongomock.collection.Collection, 'aggregate', old_server_aggregate)
+    return mongomock.MongoClient()['techsprint']
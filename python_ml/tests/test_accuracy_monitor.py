@@ -0,0 +1,90 @@
+"""
+Forecast accuracy monitor
+Each (series, horizon day, target date) is scored once however often
+update runs
+"""
+
+import sys
+from pathlib import Path
+from datetime import datetime, timedelta
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.accuracy_monitor import AccuracyMonitor
+
+RUN_DATE = datetime(2024, 3, 1, 6, 30)
+SERIES = {'commodity': 'Tomato', 'state': 'Maharashtra', 'market': 'Pune'}
+
+
+@pytest.fixture
+def db(mongo_db):
+    mongo_db['forecasts'].insert_one(dict(SERIES, run_date=RUN_DATE, level='market', predictions=[
+        {'date': (RUN_DATE + timedelta(days=day)).date().isoformat(), 'day': day, 'predicted_price': 1000.0}
+        for day in range(1, 8)
+    ]))
+    return mongo_db
+
+
+def add_prices(db, days, price=1100.0, hour=9):
+    db['marketprices'].insert_many([
+        dict(SERIES, date=datetime(2024, 3, 1 + day, hour), modal_price=price) for day in days
+    ])
+
+
+def state(db):
+    return {doc['day']: doc for doc in db['forecastaccuracy'].find({}, {'_id': 0})}
+
+
+def test_update_without_new_prices_scores_nothing_twice(db):
+    add_prices(db, [1, 2])
+    monitor = AccuracyMonitor(db)
+
+    assert monitor.update()['evaluated'] == 2
+    before = state(db)
+    assert monitor.update()['evaluated'] == 0
+    assert state(db) == before
+    assert {day: doc['n'] for day, doc in state(db).items()} == {1: 1, 2: 1}
+
+
+def test_late_price_on_the_watermark_day_is_still_scored(db):
+    add_prices(db, [1, 2])
+    monitor = AccuracyMonitor(db)
+    monitor.update()
+
+    # Another market reports for the last scored day after the run
+    db['forecasts'].insert_one(dict(SERIES, market='Nashik', run_date=RUN_DATE, level='market', predictions=[
+        {'date': '2024-03-03', 'day': 2, 'predicted_price': 1000.0}
+    ]))
+    db['marketprices'].insert_one(dict(SERIES, market='Nashik', date=datetime(2024, 3, 3, 18), modal_price=900.0))
+
+    assert monitor.update()['evaluated'] == 1
+    assert db['forecastaccuracy'].count_documents({}) == 3
+    assert monitor.update()['evaluated'] == 0
+
+
+class UnchangedPredictor:
+    def train(self, df, **kwargs):
+        return {'mae': 10.0, 'r2': 0.9, 'mode': 'unchanged', 'version': 3}
+
+
+def test_retrain_without_new_version_keeps_error_window(db):
+    add_prices(db, [1, 2])
+    monitor = AccuracyMonitor(db)
+    monitor.update()
+    before = state(db)
+
+    key = tuple(SERIES.values())
+    assert monitor.retrain([key], predictor=UnchangedPredictor())['mode'] == 'unchanged'
+    assert state(db) == before
+
+
+def test_baseline_forecasts_are_not_scored(db):
+    db['forecasts'].insert_one(dict(SERIES, market='Satara', run_date=RUN_DATE, level='market', predictions=[
+        {'date': '2024-03-02', 'day': 1, 'predicted_price': 500.0, 'method': 'naive'}
+    ]))
+    db['marketprices'].insert_one(dict(SERIES, market='Satara', date=datetime(2024, 3, 2, 9), modal_price=1100.0))
+    add_prices(db, [1])
+
+    assert AccuracyMonitor(db).update()['evaluated'] == 1
+    assert db['forecastaccuracy'].count_documents({'market': 'Satara'}) == 0
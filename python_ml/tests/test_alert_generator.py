@@ -0,0 +1,40 @@
+"""
+Alert generator
+A generator kept across pipeline runs compares forecasts with the prices
+of the current run
+"""
+
+import sys
+from pathlib import Path
+from datetime import datetime
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from alert_engine.alert_generator import AlertGenerator
+
+KEY = ('Tomato', 'Maharashtra', 'Pune')
+
+
+def forecast(price):
+    commodity, state, market = KEY
+    return {KEY: [{'commodity': commodity, 'state': state, 'market': market, 'date': '2024-03-05',
+                   'day': 1, 'predicted_price': price}]}
+
+
+def add_price(db, day, price):
+    commodity, state, market = KEY
+    db['marketprices'].insert_one({'commodity': commodity, 'state': state, 'market': market,
+                                   'date': datetime(2024, 3, day), 'modal_price': price})
+
+
+def test_evaluate_reloads_current_prices_every_run(mongo_db, monkeypatch):
+    monkeypatch.setattr('services.market_data_loader.datetime', type('Clock', (datetime,), {
+        'now': classmethod(lambda cls: datetime(2024, 3, 10))
+    }))
+    generator = AlertGenerator(mongo_db, users_db=mongo_db)
+    add_price(mongo_db, 1, 1000.0)
+    assert [alert['type'] for alert in generator.evaluate(forecast(800.0))] == ['PRICE_DROP']
+
+    # The price fell in the meantime; 800 is no longer a drop from it
+    add_price(mongo_db, 2, 820.0)
+    assert generator.evaluate(forecast(800.0)) == []
@@ -0,0 +1,106 @@
+"""
+Alert outbox
+Claimed entries are leased to one dispatcher, acknowledged entries are
+done, and failed sends come back after their backoff
+"""
+
+import sys
+from pathlib import Path
+from datetime import datetime, timedelta
+from bson import ObjectId
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from alert_engine import alert_outbox
+from alert_engine.alert_outbox import AlertOutbox, OutboxDispatcher, PENDING, SENDING, DELIVERED, FAILED
+
+T0 = datetime(2024, 3, 1, 9)
+
+
+class Clock:
+    now_value = T0
+
+    @classmethod
+    def now(cls):
+        return cls.now_value
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    Clock.now_value = T0
+    monkeypatch.setattr(alert_outbox, 'datetime', Clock)
+    return Clock
+
+
+@pytest.fixture
+def outbox(mongo_db, clock):
+    outbox = AlertOutbox(mongo_db)
+    # mongomock has no sessions, so entries are stored without enqueue's transaction
+    outbox.collection.insert_many([AlertOutbox._entry({'_id': ObjectId(), 'title': f'alert {i}'}, T0)
+                                   for i in range(3)])
+    return outbox
+
+
+def test_claimed_entries_are_not_claimed_again_before_the_lease_expires(outbox, clock):
+    first = outbox.claim(limit=2, lease_seconds=60)
+    assert len(first) == 2
+    assert {entry['status'] for entry in first} == {SENDING}
+
+    clock.now_value = T0 + timedelta(seconds=30)
+    second = outbox.claim(limit=10, lease_seconds=60)
+    assert len(second) == 1
+    assert second[0]['_id'] not in {entry['_id'] for entry in first}
+
+    # The first dispatcher died; its lease runs out
+    clock.now_value = T0 + timedelta(seconds=61)
+    third = outbox.claim(limit=10, lease_seconds=60)
+    assert {entry['_id'] for entry in third} == {entry['_id'] for entry in first}
+
+
+def test_acknowledged_entries_are_done(outbox):
+    entries = outbox.claim(limit=10)
+    outbox.mark_delivered([entry['_id'] for entry in entries])
+
+    assert outbox.counts() == {DELIVERED: 3}
+    assert outbox.claim(limit=10) == []
+
+
+def test_failed_entries_come_back_after_their_backoff(outbox, clock):
+    entries = outbox.claim(limit=10)
+    outbox.mark_failed(entries, 'HTTP 503', max_attempts=3, backoff=10, max_backoff=100)
+    assert outbox.counts() == {PENDING: 3}
+
+    clock.now_value = T0 + timedelta(seconds=7)  # before the earliest jittered retry (8s)
+    assert outbox.claim(limit=10) == []
+
+    clock.now_value = T0 + timedelta(seconds=13)  # after the latest (12s)
+    retried = outbox.claim(limit=10)
+    assert len(retried) == 3
+    assert {entry['last_error'] for entry in retried} == {'HTTP 503'}
+
+    # Backoff doubles; the last allowed attempt parks the entries
+    outbox.mark_failed(retried, 'HTTP 503', max_attempts=3, backoff=10, max_backoff=100)
+    clock.now_value = T0 + timedelta(seconds=13 + 25)
+    outbox.mark_failed(outbox.claim(limit=10), 'HTTP 503', max_attempts=3, backoff=10, max_backoff=100)
+    assert outbox.counts() == {FAILED: 3}
+    clock.now_value = T0 + timedelta(days=1)
+    assert outbox.claim(limit=10) == []
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+def test_dispatcher_marks_batches_by_response(outbox):
+    dispatcher = OutboxDispatcher(outbox, url='http://backend/broadcast')
+    responses = iter([FakeResponse(500), FakeResponse(200)])
+    dispatcher.session.post = lambda url, data, timeout: next(responses)
+
+    assert dispatcher.dispatch_once() == 0
+    assert outbox.counts() == {PENDING: 3}
+
+    outbox.collection.update_many({}, {'$set': {'next_attempt_at': T0}})
+    assert dispatcher.dispatch_once() == 3
+    assert outbox.counts() == {DELIVERED: 3}
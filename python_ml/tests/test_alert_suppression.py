@@ -0,0 +1,54 @@
+"""
+Alert suppression
+The cooldown starts only once an alert is queued for delivery
+"""
+
+import sys
+from pathlib import Path
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from alert_engine.alert_generator import AlertGenerator
+from alert_engine.alert_suppression import AlertSuppressor
+
+
+def make_alert(change=-12.0):
+    return {'type': 'PRICE_DROP', 'commodity': 'Tomato', 'state': 'Maharashtra', 'severity': 'MEDIUM',
+            'market': 'Pune', 'change_percentage': change}
+
+
+@pytest.fixture
+def generator(mongo_db):
+    gen = AlertGenerator()
+    gen.suppressor = AlertSuppressor(mongo_db)
+    gen.assign_targets = lambda alerts: None
+    gen.dispatcher = type('IdleDispatcher', (), {'wake': lambda self: None})()
+    return gen
+
+
+def test_duplicates_collapse_to_the_largest_change(mongo_db):
+    kept = AlertSuppressor(mongo_db).filter([make_alert(-12.0), make_alert(-20.0)])
+    assert len(kept) == 1
+    assert kept[0]['change_percentage'] == -20.0
+    assert kept[0]['duplicates_collapsed'] == 1
+
+
+def test_failed_enqueue_does_not_start_the_cooldown(generator):
+    queued = []
+
+    def enqueue(alerts, archive=None):
+        if not queued:
+            queued.append(None)
+            raise ConnectionError('outbox unavailable')
+        queued.extend(alerts)
+        return len(alerts)
+
+    # mongomock has no sessions, so the outbox write itself is replaced
+    generator.outbox.enqueue = enqueue
+    with pytest.raises(ConnectionError):
+        generator.publish([make_alert()])
+
+    assert len(generator.publish([make_alert()])) == 1
+    assert len(queued) == 2
+    assert generator.publish([make_alert()]) == []
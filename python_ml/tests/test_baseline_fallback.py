@@ -0,0 +1,57 @@
+"""
+Baseline fallback
+Series too short for the model still get a baseline forecast, with raw
+prices and with feature store rows
+"""
+
+import sys
+from pathlib import Path
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from main import forecast_series, split_by_commodity
+from models.price_predictor import PricePredictor
+from models.model_registry import registry
+from services.feature_store import FeatureStore
+from test_incremental_training import make_prices, SMALL_FOREST
+
+ONE_ROW = ('Tomato', 'Maharashtra', 'Satara')
+
+
+@pytest.fixture
+def predictor(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    registry.invalidate()
+    predictor = PricePredictor(config=SMALL_FOREST, n_jobs=1)
+    predictor.train(make_prices())
+    yield predictor
+    registry.invalidate()
+
+
+@pytest.fixture
+def store(mongo_db):
+    prices = make_prices()
+    records = [dict(record, date=record['date'].to_pydatetime()) for record in prices.to_dict('records')]
+    records.append({'date': records[-1]['date'], 'modal_price': 1500.0,
+                    'commodity': ONE_ROW[0], 'state': ONE_ROW[1], 'market': ONE_ROW[2]})
+    mongo_db['marketprices'].insert_many(records)
+
+    store = FeatureStore(mongo_db)
+    store.update(commodities=['Tomato', 'Onion', 'Rice'])
+    return store
+
+
+@pytest.mark.parametrize('featurized', [False, True])
+def test_one_row_series_gets_a_baseline_forecast(predictor, store, featurized):
+    raw = split_by_commodity(store.loader.load(commodities=['Tomato', 'Onion', 'Rice']))
+    if featurized:
+        features = split_by_commodity(store.load(commodities=['Tomato', 'Onion', 'Rice']))
+        forecasts = forecast_series(predictor, features, featurized=True, raw_data=raw)
+    else:
+        forecasts = forecast_series(predictor, raw)
+
+    assert len(forecasts) == 7
+    assert len(forecasts[ONE_ROW]) == 7
+    assert forecasts[ONE_ROW][0]['method']
+    assert all('method' not in forecasts[key][0] for key in forecasts if key != ONE_ROW)
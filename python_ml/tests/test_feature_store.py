@@ -0,0 +1,51 @@
+"""
+Incremental feature store updates
+Series behind the newest one, or too sparse for the lookback, get the
+same features as a full rebuild
+"""
+
+import sys
+from pathlib import Path
+from datetime import datetime, timedelta
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.feature_store import FeatureStore, FEATURE_COLUMNS
+from models.feature_engine import SERIES_KEYS
+
+START = datetime(2024, 1, 1)
+
+
+def add_prices(db, commodity, market, days, every=1):
+    rng = np.random.default_rng(len(market))
+    db['marketprices'].insert_many([
+        {'commodity': commodity, 'state': 'Maharashtra', 'market': market,
+         'date': START + timedelta(days=day), 'modal_price': float(1000 + rng.normal(0, 30))}
+        for day in range(days.start, days.stop, every)
+    ])
+
+
+def stored(store):
+    return store.load(commodities=['Tomato', 'Onion']).sort_values(SERIES_KEYS + ['date'], ignore_index=True)
+
+
+def test_update_refills_windows_of_lagging_and_sparse_series(mongo_db):
+    store = FeatureStore(mongo_db, lookback_days=10)
+    add_prices(mongo_db, 'Tomato', 'Pune', range(0, 100))
+    add_prices(mongo_db, 'Onion', 'Nashik', range(0, 60), every=5)  # reports every 5 days
+    store.update(commodities=['Tomato', 'Onion'])
+
+    # Tomato is 40 days ahead of Onion when both get new prices
+    add_prices(mongo_db, 'Tomato', 'Pune', range(100, 110))
+    add_prices(mongo_db, 'Onion', 'Nashik', range(60, 110), every=5)
+    assert store.update(commodities=['Tomato', 'Onion']) == 10 + 10
+    incremental = stored(store)
+
+    store.update(commodities=['Tomato', 'Onion'], rebuild=True)
+    rebuilt = stored(store)
+
+    assert len(incremental) == len(rebuilt)
+    for column in FEATURE_COLUMNS:
+        np.testing.assert_allclose(incremental[column].to_numpy(dtype=np.float64),
+                                   rebuilt[column].to_numpy(dtype=np.float64), err_msg=column)
@@ -0,0 +1,60 @@
+"""
+Flat forest
+Predictions equal the sklearn forest they were packed from
+"""
+
+import sys
+from pathlib import Path
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor, ExtraTreesRegressor
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models.flat_forest import FlatForest
+
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(42)
+    X = rng.normal(size=(2000, 6))
+    y = X[:, 0] * 100 + np.sin(X[:, 1]) * 50 + rng.normal(size=2000)
+    return X, y, rng.normal(size=(500, 6))
+
+
+@pytest.mark.parametrize('estimator, params', [
+    (RandomForestRegressor, {'n_estimators': 20, 'max_depth': 15}),
+    (RandomForestRegressor, {'n_estimators': 5, 'max_depth': 1}),
+    (ExtraTreesRegressor, {'n_estimators': 10, 'max_depth': 8}),
+])
+def test_predictions_match_sklearn(data, estimator, params):
+    X, y, X_check = data
+    model = estimator(random_state=0, n_jobs=1, **params).fit(X, y)
+    flat = FlatForest.from_sklearn(model)
+
+    np.testing.assert_allclose(flat.predict(X_check), model.predict(X_check))
+    np.testing.assert_allclose(flat.leaf_values(X_check),
+                               np.column_stack([tree.predict(X_check) for tree in model.estimators_]))
+
+
+def test_single_row_input(data):
+    X, y, X_check = data
+    model = RandomForestRegressor(n_estimators=10, max_depth=6, random_state=0).fit(X, y)
+    flat = FlatForest.from_sklearn(model)
+
+    np.testing.assert_allclose(flat.predict(X_check[:1]), model.predict(X_check[:1]))
+    np.testing.assert_allclose(flat.predict(X_check[0]), model.predict(X_check[:1]))
+
+
+def test_constant_target_trees_are_single_leaves(data):
+    X, _, X_check = data
+    model = RandomForestRegressor(n_estimators=3, random_state=0).fit(X, np.full(len(X), 42.0))
+    flat = FlatForest.from_sklearn(model)
+
+    assert flat.max_depth == 0
+    np.testing.assert_allclose(flat.predict(X_check), 42.0)
+
+
+def test_rejects_unfitted_model():
+    with pytest.raises(TypeError):
+        FlatForest.from_sklearn(RandomForestRegressor())
@@ -0,0 +1,98 @@
+"""
+Forecast snapshot cache
+Polls pick up every snapshot of a publish, including ones written after
+a poll that ran mid-publish, and drop keys a publish removed; requests
+revalidate with If-None-Match
+"""
+
+import sys
+import threading
+from pathlib import Path
+from datetime import datetime
+from http.client import HTTPConnection
+from http.server import ThreadingHTTPServer
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.forecast_store import ForecastStore
+from services.forecast_api import SnapshotCache, ForecastRequestHandler, etag_matches
+
+RUN_DATE = datetime(2024, 3, 1)
+
+
+def forecasts(states, price=1000.0):
+    return {
+        ('Tomato', state, 'Market'): [{'date': '2024-03-02', 'day': 1, 'predicted_price': price}]
+        for state in states
+    }
+
+
+def test_poll_during_publish_sees_the_rest_of_it(mongo_db):
+    store = ForecastStore(mongo_db)
+    cache = SnapshotCache(store)
+    store.publish(forecasts(['Gujarat', 'Punjab']), RUN_DATE)
+    assert cache.refresh() == 3
+
+    # Snapshot of the same generation that landed after the poll
+    mongo_db['forecastsnapshots'].update_one({'key': 'Tomato|Punjab'},
+                                             {'$set': {'body': '{"late":true}', 'etag': 'late'}})
+    assert cache.refresh() == 1
+    assert cache.get('Tomato|Punjab') == (b'{"late":true}', '"late"')
+    assert cache.refresh() == 0
+
+
+def test_keys_missing_from_a_publish_are_evicted(mongo_db):
+    store = ForecastStore(mongo_db)
+    cache = SnapshotCache(store)
+    store.publish(forecasts(['Gujarat', 'Punjab']), RUN_DATE)
+    cache.refresh()
+
+    store.publish(forecasts(['Gujarat'], price=1200.0), RUN_DATE)
+    assert cache.refresh() == 3  # Tomato and Tomato|Gujarat replaced, Tomato|Punjab evicted
+    assert cache.get('Tomato|Punjab') is None
+    assert b'1200' in cache.get('Tomato')[0]
+
+    # A fresh reader never serves the tombstone
+    fresh = SnapshotCache(store)
+    fresh.refresh()
+    assert set(fresh.entries) == {'Tomato', 'Tomato|Gujarat'}
+
+
+def test_etag_matches_parses_the_header():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"old", "abc"', '"abc"')
+    assert etag_matches('"old",W/"abc"', '"abc"')
+    assert etag_matches('*', '"abc"')
+    assert not etag_matches(None, '"abc"')
+    assert not etag_matches('', '"abc"')
+    assert not etag_matches('"abcd"', '"abc"')  # not a substring test
+    assert not etag_matches('"xabc", "ab"', '"abc"')
+
+
+def test_requests_revalidate_with_if_none_match(mongo_db):
+    store = ForecastStore(mongo_db)
+    store.publish(forecasts(['Gujarat']), RUN_DATE)
+    cache = SnapshotCache(store)
+    cache.refresh()
+    body, etag = cache.get('Tomato|Gujarat')
+
+    handler = type('Handler', (ForecastRequestHandler,), {'cache': cache})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def get(headers):
+        connection = HTTPConnection(*server.server_address, timeout=5)
+        connection.request('GET', '/forecasts/Tomato/Gujarat', headers=headers)
+        response = connection.getresponse()
+        result = response.status, response.getheader('ETag'), response.read()
+        connection.close()
+        return result
+
+    try:
+        assert get({}) == (200, etag, body)
+        assert get({'If-None-Match': f'"stale", W/{etag}'}) == (304, etag, b'')
+        assert get({'If-None-Match': '*'}) == (304, etag, b'')
+        assert get({'If-None-Match': etag[:-2] + '"'}) == (200, etag, body)
+    finally:
+        server.shutdown()
+        server.server_close()
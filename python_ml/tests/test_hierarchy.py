@@ -0,0 +1,64 @@
+"""
+Hierarchical reconciliation
+Reconciled forecasts are coherent (every aggregate is the mean of its
+markets, as with_aggregates defines it), and coherent input comes back
+unchanged
+"""
+
+import sys
+from pathlib import Path
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models.hierarchy import Hierarchy, forecast_hierarchy, level_of, AGGREGATE
+from models.price_predictor import PricePredictor
+from test_incremental_training import make_prices
+
+BOTTOM = [
+    ('Tomato', 'Maharashtra', 'Pune'), ('Tomato', 'Maharashtra', 'Nashik'), ('Tomato', 'Gujarat', 'Surat'),
+    ('Onion', 'Maharashtra', 'Pune'), ('Onion', 'Karnataka', 'Hubli'), ('Onion', 'Karnataka', 'Bellary'),
+    ('Onion', 'Karnataka', 'Mysore'),
+]
+
+
+def assert_coherent(hierarchy, forecasts, atol=1e-9):
+    markets = np.asarray(forecasts[:len(hierarchy.bottom)])
+    for key, i in hierarchy.index.items():
+        if level_of(key) == 'market':
+            continue
+        children = [j for j, (commodity, state, _) in enumerate(hierarchy.bottom)
+                    if commodity == key[0] and (key[1] == AGGREGATE or state == key[1])]
+        np.testing.assert_allclose(forecasts[i], markets[children].mean(axis=0), atol=atol, err_msg=str(key))
+
+
+@pytest.mark.parametrize('method', ['bottom_up', 'mint'])
+def test_reconciled_forecasts_are_coherent(method):
+    rng = np.random.default_rng(0)
+    hierarchy = Hierarchy(BOTTOM)
+    base = rng.normal(1000, 100, (len(hierarchy.nodes), 7))
+    base[hierarchy.index[('Onion', 'Karnataka', AGGREGATE)]] = np.nan  # aggregate without a base forecast
+    variances = rng.uniform(10, 100, len(hierarchy.nodes))
+
+    assert_coherent(hierarchy, hierarchy.reconcile(base, method, variances))
+
+
+@pytest.mark.parametrize('method', ['bottom_up', 'mint'])
+def test_coherent_input_is_unchanged(method):
+    rng = np.random.default_rng(1)
+    hierarchy = Hierarchy(BOTTOM)
+    base = hierarchy.S @ rng.normal(1000, 100, (len(BOTTOM), 7))
+    variances = rng.uniform(10, 100, len(hierarchy.nodes))
+
+    np.testing.assert_allclose(hierarchy.reconcile(base, method, variances), base)
+
+
+def test_forecast_hierarchy_output_is_coherent():
+    forecasts = forecast_hierarchy(PricePredictor.predict_baselines, make_prices(), 7, 'mint')
+    bottom = [key for key in forecasts if level_of(key) == 'market']
+    hierarchy = Hierarchy(bottom)
+
+    prices = np.array([[pred['predicted_price'] for pred in forecasts[key]] for key in hierarchy.nodes])
+    assert_coherent(hierarchy, prices, atol=0.01)  # prices are rounded to paise
+    assert {forecasts[key][0]['level'] for key in hierarchy.nodes} == {'market', 'state', 'national'}
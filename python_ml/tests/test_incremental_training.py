@@ -0,0 +1,105 @@
+"""
+Incremental training over several commodities
+Every series keeps its own training watermark, so one version covers all
+commodities and the batch forecast uses it for each of them
+"""
+
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models import price_predictor
+from models.price_predictor import PricePredictor
+from models.model_registry import registry
+
+COMMODITIES = ['Tomato', 'Onion', 'Rice']
+SMALL_FOREST = {'estimator': 'RandomForestRegressor',
+                'params': {'n_estimators': 10, 'max_depth': 6, 'random_state': 0}}
+
+
+def make_prices(commodities=COMMODITIES, days=120, seed=0):
+    """Daily prices of two markets per commodity"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i, commodity in enumerate(commodities):
+        for market in ['Pune', 'Nashik']:
+            frames.append(pd.DataFrame({
+                'date': pd.date_range('2024-01-01', periods=days, freq='D'),
+                'modal_price': 1500 + 200 * i + rng.normal(0, 20, days).cumsum(),
+                'commodity': commodity,
+                'state': 'Maharashtra',
+                'market': market
+            }))
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.fixture
+def predictor(tmp_path, monkeypatch):
+    # Model artifacts live under a relative directory
+    monkeypatch.chdir(tmp_path)
+    registry.invalidate()
+    yield PricePredictor(config=SMALL_FOREST, n_jobs=1)
+    registry.invalidate()
+
+
+def test_incremental_train_on_fresh_store_fits_every_commodity(predictor):
+    df = make_prices()
+    result = predictor.train(df, incremental=True)
+    assert result['mode'] == 'full'
+
+    entry = price_predictor.model_versions.current()
+    assert len(entry['series_trained_through']) == 6
+
+    forecasts = predictor.predict_batch(df, fallback=False)
+    assert {key[0] for key in forecasts} == set(COMMODITIES)
+
+
+def test_incremental_train_picks_up_series_behind_the_newest(predictor):
+    df = make_prices()
+    # Tomato is scraped ahead of the other commodities
+    lagging = df[(df['commodity'] == 'Tomato') | (df['date'] < '2024-04-01')]
+    predictor.train(lagging, incremental=True)
+
+    # The new rows continue the same random walks (about 0.7x the baseline
+    # MAE), well inside DRIFT_REFIT_RATIO, so trees are added
+    result = predictor.train(df, incremental=True)
+    assert result['mode'] == 'incremental'
+    entry = price_predictor.model_versions.current()
+    assert entry['parent'] == result['version'] - 1
+    assert entry['new_rows'] == int(((df['commodity'] != 'Tomato') & (df['date'] >= '2024-04-01')).sum())
+    assert set(entry['series_trained_through'].values()) == {pd.Timestamp(df['date'].max()).isoformat()}
+
+    assert predictor.train(df, incremental=True)['mode'] == 'unchanged'
+
+    forecasts = predictor.predict_batch(df, fallback=False, version=result['version'])
+    assert len(forecasts) == 6
+    assert {key[0] for key in forecasts} == set(COMMODITIES)
+
+
+def test_drifted_rows_trigger_a_full_refit(predictor):
+    df = make_prices()
+    predictor.train(df[df['date'] < '2024-04-01'], incremental=True)
+
+    # Prices triple overnight: the current model's error on them is far
+    # beyond DRIFT_REFIT_RATIO times its baseline
+    df.loc[df['date'] >= '2024-04-01', 'modal_price'] *= 3
+    result = predictor.train(df, incremental=True)
+    assert result['mode'] == 'full'
+    assert 'parent' not in price_predictor.model_versions.current()
+
+
+def test_new_commodity_is_trained_incrementally(predictor):
+    predictor.train(make_prices(), incremental=True)
+
+    df = make_prices(COMMODITIES + ['Wheat'])
+    result = predictor.train(df, incremental=True)
+    assert result['mode'] != 'unchanged'
+    entry = price_predictor.model_versions.current()
+    assert any(key.startswith('Wheat|') for key in entry['series_trained_through'])
+
+    forecasts = predictor.predict_batch(df, fallback=False)
+    assert {key[0] for key in forecasts} == set(COMMODITIES + ['Wheat'])
@@ -0,0 +1,81 @@
+"""
+Latest rows per series
+Servers without $topN (older than MongoDB 5.2) are served by the
+$sort/$push/$slice pipeline with the same result
+"""
+
+import sys
+from pathlib import Path
+from datetime import datetime, timedelta
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.market_data_loader import MarketDataLoader, latest_rows_pipeline
+
+TODAY = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+SERIES = [('Onion', 'Delhi', 'Azadpur'), ('Onion', 'Maharashtra', 'Lasalgaon'), ('Potato', 'Delhi', 'Azadpur')]
+
+
+@pytest.fixture
+def loader(mongo_db):
+    docs = []
+    for s, (commodity, state, market) in enumerate(SERIES):
+        for day in range(10):
+            docs.append({'commodity': commodity, 'state': state, 'market': market,
+                         'date': TODAY - timedelta(days=day), 'modal_price': 1000.0 * (s + 1) + day})
+    # Outside the default window
+    docs.append({'commodity': 'Garlic', 'state': 'Delhi', 'market': 'Azadpur',
+                 'date': TODAY - timedelta(days=400), 'modal_price': 5000.0})
+    mongo_db['marketprices'].insert_many(docs[::-1])
+
+    loader = MarketDataLoader(mongo_db)
+    pipelines = loader.pipelines = []
+    aggregate = loader.collection.aggregate
+
+    def recording_aggregate(pipeline, *args, **kwargs):
+        pipelines.append(pipeline)
+        return aggregate(pipeline, *args, **kwargs)
+
+    loader.collection.aggregate = recording_aggregate
+    return loader
+
+
+def stages(pipeline):
+    return [next(iter(stage)) for stage in pipeline]
+
+
+def test_fallback_pipeline_slices_sorted_rows():
+    pipeline = latest_rows_pipeline({'commodity': 'Onion'}, ['date', 'modal_price'], 3, top_n=False)
+    assert stages(pipeline) == ['$match', '$sort', '$group', '$project']
+    assert pipeline[1]['$sort'] == {'commodity': -1, 'state': -1, 'market': -1, 'date': -1}
+    assert pipeline[3]['$project'] == {'rows': {'$slice': ['$rows', 3]}}
+
+
+def test_load_latest_falls_back_to_push_and_slice(loader):
+    df = loader.load_latest(n=3)
+
+    # $topN first, then the fallback once the server rejects it
+    assert stages(loader.pipelines[0]) == ['$match', '$group']
+    assert '$topN' in loader.pipelines[0][1]['$group']['rows']
+    assert stages(loader.pipelines[1]) == ['$match', '$sort', '$group', '$project']
+
+    assert len(df) == 3 * len(SERIES)
+    for s, (commodity, state, market) in enumerate(SERIES):
+        series = df[(df['commodity'] == commodity) & (df['state'] == state) & (df['market'] == market)]
+        assert sorted(series['date']) == [TODAY - timedelta(days=day) for day in (2, 1, 0)]
+        assert sorted(series['modal_price']) == [1000.0 * (s + 1) + day for day in (0, 1, 2)]
+    assert 'Garlic' not in set(df['commodity'])
+
+
+def test_load_latest_filters_commodities(loader):
+    df = loader.load_latest(['Potato'], n=5)
+    assert set(df['commodity']) == {'Potato'}
+    assert len(df) == 5
+
+
+def test_current_prices_falls_back_to_push_and_slice(loader):
+    prices = loader.current_prices()
+
+    assert '$slice' in str(loader.pipelines[-1])
+    assert prices == {key: (1000.0 * (s + 1), TODAY) for s, key in enumerate(SERIES)}
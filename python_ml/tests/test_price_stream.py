@@ -0,0 +1,88 @@
+"""
+Streaming price alerts
+Repeats of a series inside one micro-batch are folded in day order, and
+change events replayed after a restart do not alert a second time
+"""
+
+import sys
+from pathlib import Path
+from datetime import datetime, timedelta
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.price_stream import PriceStream
+
+TODAY = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+STEADY = [2000, 2020, 1990, 2010, 1980, 2005, 1995, 2015]
+
+
+def doc(day, price, market='Azadpur'):
+    return {'commodity': 'Onion', 'state': 'Delhi', 'market': market,
+            'date': TODAY - timedelta(days=day), 'modal_price': price}
+
+
+def history():
+    return [doc(len(STEADY) - i, price) for i, price in enumerate(STEADY)]
+
+
+class FakeAlertGenerator:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, alerts):
+        self.published.extend(alerts)
+        return alerts
+
+    def close(self):
+        pass
+
+
+def test_repeats_within_a_batch_are_folded_in_day_order():
+    stream = PriceStream(db={'marketprices': None, 'streamstate': None})
+    # Shuffled, with a second series mixed in: the spike is still scored last
+    batch = history()[::-1] + [doc(0, 2700), doc(3, 1500, market='Lasalgaon')]
+    alerts = stream.process(batch)
+
+    assert [(a['market'], a['type']) for a in alerts] == [('Azadpur', 'PRICE_SPIKE')]
+    assert alerts[0]['current_price'] == 2700
+    row = stream.stats.index[('Onion', 'Delhi', 'Azadpur')]
+    assert stream.stats.count[row] == len(STEADY) + 1
+    assert stream.stats.last_day[row] == TODAY.date()
+
+
+def test_replayed_events_do_not_alert_twice():
+    stream = PriceStream(db={'marketprices': None, 'streamstate': None})
+    stream.process(history())
+    assert len(stream.process([doc(0, 2700)])) == 1
+
+    # Same events again, e.g. the batch before the last saved resume token
+    assert stream.process(history() + [doc(0, 2700)]) == []
+    row = stream.stats.index[('Onion', 'Delhi', 'Azadpur')]
+    assert stream.stats.count[row] == len(STEADY) + 1
+
+
+def test_restart_resumes_without_repeating_alerts(mongo_db):
+    mongo_db['marketprices'].insert_many(history())
+
+    alert_gen = FakeAlertGenerator()
+    stream = PriceStream(db=mongo_db, alert_gen=alert_gen)
+    spike = doc(0, 2700)
+
+    def batches():
+        # The scraper writes the spike while the consumer is watching
+        mongo_db['marketprices'].insert_one(dict(spike))
+        yield [spike], {'_data': 'token-1'}
+
+    stream.batches = batches
+    stream.run()
+    assert len(alert_gen.published) == 1
+
+    # The restarted consumer resumes from the saved token, warms up from
+    # the stored prices and is handed the spike again
+    restarted = PriceStream(db=mongo_db, alert_gen=alert_gen)
+    assert restarted.resume_token() == {'_data': 'token-1'}
+    restarted.batches = lambda: iter([([spike], {'_data': 'token-2'})])
+    restarted.run()
+    assert len(alert_gen.published) == 1
+    assert restarted.resume_token() == {'_data': 'token-2'}
@@ -0,0 +1,66 @@
+"""
+Recursive forecasting
+The lag and rolling features the ring buffer feeds the model at every
+step equal build_features on the history extended by the forecasts
+"""
+
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models.feature_engine import build_features, series_tails, SERIES_KEYS
+from models.price_predictor import recursive_forecast, BASE_FEATURES
+from models.rolling_state import RollingPriceState
+from test_incremental_training import make_prices
+
+
+class RecordingModel:
+    """Returns a price derived from the features and keeps every input"""
+
+    def __init__(self):
+        self.inputs = []
+
+    def predict(self, X):
+        self.inputs.append(X.copy())
+        return 0.6 * X[:, 0] + 0.3 * X[:, 2] + 0.1 * X[:, 1] + 5 * X[:, 4]
+
+
+def test_step_features_match_build_features_on_extended_frame():
+    df = make_prices(days=30)
+    horizon = 10
+    keys, histories, origin, _ = series_tails(build_features(df))
+
+    model = RecordingModel()
+    forecast, pred_dates = recursive_forecast(model, BASE_FEATURES, histories, origin, horizon)
+
+    predicted = pd.DataFrame({
+        'date': pred_dates.ravel().astype('datetime64[ns]'),
+        'modal_price': forecast.ravel(),
+        **{key: np.repeat([k[i] for k in keys], horizon) for i, key in enumerate(SERIES_KEYS)}
+    })
+    extended = build_features(pd.concat([df, predicted], ignore_index=True))
+    extended = extended.set_index(SERIES_KEYS + ['date'])
+
+    for step, X in enumerate(model.inputs):
+        rows = [key + (pd.Timestamp(pred_dates[i, step]),) for i, key in enumerate(keys)]
+        expected = extended.loc[rows, BASE_FEATURES].to_numpy(dtype=np.float64)
+        np.testing.assert_allclose(X, expected, rtol=1e-5, err_msg=f'step {step + 1}')
+
+
+def test_rolling_state_matches_numpy_after_full_rotations():
+    rng = np.random.default_rng(0)
+    history = rng.normal(1000, 50, (4, 7))
+    state = RollingPriceState(history)
+    window = history.copy()
+
+    for _ in range(20):
+        values = rng.normal(1000, 50, 4)
+        state.push(values)
+        window = np.column_stack([window[:, 1:], values])
+        np.testing.assert_allclose(state.lag(1), window[:, -1])
+        np.testing.assert_allclose(state.lag(7), window[:, 0])
+        np.testing.assert_allclose(state.mean(), window.mean(axis=1))
+        np.testing.assert_allclose(state.std(), window.std(axis=1, ddof=1))
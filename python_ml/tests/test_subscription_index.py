@@ -0,0 +1,91 @@
+"""
+Subscription index
+Incremental refreshes keep the postings equal to a full rebuild, and
+alerts are targeted by commodity, state and market
+"""
+
+import sys
+from pathlib import Path
+from datetime import datetime, timedelta
+from bson import ObjectId
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from alert_engine.subscription_index import SubscriptionIndex
+from alert_engine.alert_generator import AlertGenerator
+
+T0 = datetime(2024, 3, 1)
+
+
+def add_user(db, crop, district='', state='Maharashtra', role='farmer', hours=0):
+    user_id = ObjectId()
+    db['users'].insert_one({'_id': user_id, 'cropType': crop, 'state': state, 'district': district,
+                            'role': role, 'updatedAt': T0 + timedelta(hours=hours)})
+    return user_id
+
+
+def change_user(db, user_id, hours, **fields):
+    db['users'].update_one({'_id': user_id}, {'$set': dict(fields, updatedAt=T0 + timedelta(hours=hours))})
+
+
+def postings(index):
+    return {field: {term: array.tolist() for term, array in terms.items() if len(array)}
+            for field, terms in index.postings.items()}
+
+
+def test_refresh_applies_only_changes_and_matches_a_rebuild(mongo_db):
+    pune = add_user(mongo_db, 'Tomato, Onion', 'Pune')
+    nashik = add_user(mongo_db, 'Tomato', 'Nashik')
+    anywhere = add_user(mongo_db, 'tomato')
+    add_user(mongo_db, 'Tomato', 'Pune', role='buyer')
+
+    index = SubscriptionIndex(mongo_db)
+    index.refresh()
+    assert index.targets('Tomato', 'Maharashtra', 'Pune') == [pune, anywhere]
+    assert index.targets('Tomato', 'Maharashtra') == [pune, nashik, anywhere]
+
+    # Nashik farmer switches crop and district, the Pune farmer leaves farming
+    change_user(mongo_db, nashik, 1, cropType='Onion', district='Pune')
+    change_user(mongo_db, pune, 1, role='buyer')
+    late = add_user(mongo_db, 'Onion', 'Pune', hours=2)
+    index.refresh()
+
+    assert index.targets('Tomato', 'Maharashtra', 'Pune') == [anywhere]
+    assert index.targets('Onion', 'Maharashtra', 'Pune') == [nashik, late]
+    for terms in index.postings.values():
+        for array in terms.values():
+            assert array.dtype == np.int32
+            assert np.all(np.diff(array) > 0)
+
+    # Users are numbered in the same order, so the postings compare directly
+    rebuilt = SubscriptionIndex(mongo_db)
+    rebuilt.refresh()
+    assert postings(rebuilt) == postings(index)
+
+
+def test_unchanged_users_are_skipped(mongo_db):
+    user = add_user(mongo_db, 'Rice', 'Pune')
+    index = SubscriptionIndex(mongo_db)
+    index.refresh()
+    before = postings(index)
+
+    # Touched without a change to crop, state or district
+    change_user(mongo_db, user, 1, name='Asha')
+    index.refresh()
+    assert postings(index) == before
+    assert index.watermark == T0 + timedelta(hours=1)
+
+
+def test_alerts_target_farmers_of_their_market(mongo_db):
+    pune = add_user(mongo_db, 'Tomato', 'Pune')
+    add_user(mongo_db, 'Tomato', 'Nashik')
+
+    generator = AlertGenerator()
+    generator.subscriptions = SubscriptionIndex(mongo_db)
+    alerts = [{'commodity': 'Tomato', 'state': 'Maharashtra', 'market': 'Pune'},
+              {'commodity': 'Tomato', 'state': 'Maharashtra', 'market': 'Mumbai'}]
+    generator.assign_targets(alerts)
+
+    assert alerts[0]['targetUsers'] == [pune]
+    assert 'targetUsers' not in alerts[1]
@@ -1,5 +1,19 @@
 import Alert from '../models/Alert.js';
 
+// Targeted alerts reach only their farmers' rooms; untargeted ones go to
+// the commodity room and everyone
+const emitMarketAlert = (io, alert) => {
+    if (alert.targetUsers && alert.targetUsers.length > 0) {
+        io.to(alert.targetUsers.map(userId => `user_${userId}`)).emit('new_market_alert', alert);
+        return;
+    }
+    
+    if (alert.commodity) {
+        io.to(`commodity_${alert.commodity}`).emit('new_market_alert', alert);
+    }
+    io.emit('new_market_alert_global', alert);
+};
+
 // @desc    Get alerts for user
 // @route   GET /api/market-alerts
 // @access  Private
@@ -117,20 +131,64 @@ export const broadcastAlert = async (req, res) => {
         const alert = await Alert.create(alertData);
         
         // Broadcast via Socket.io
-        const io = req.app.get('io');
+        emitMarketAlert(req.app.get('io'), alert);
         
-        // Emit to commodity-specific rooms
-        if (alert.commodity) {
-            io.to(`commodity_${alert.commodity}`).emit('new_market_alert', alert);
+        res.json({
+            success: true,
+            message: 'Alert broadcasted',
+            data: alert
+        });
+    } catch (error) {
+        res.status(500).json({
+            success: false,
+            error: error.message
+        });
+    }
+};
+
+// @desc    Broadcast a batch of alerts (called by the Python outbox dispatcher)
+// @route   POST /api/market-alerts/broadcast/batch
+// @access  Public (should add API key)
+export const broadcastAlerts = async (req, res) => {
+    try {
+        const alerts = Array.isArray(req.body.alerts) ? req.body.alerts : [];
+        
+        if (alerts.length === 0) {
+            return res.status(400).json({
+                success: false,
+                error: 'No alerts provided'
+            });
         }
         
-        // Emit globally
-        io.emit('new_market_alert_global', alert);
+        // Upsert by outbox id: a retried batch must not create duplicates
+        const operations = alerts.map(({ createdAt, updatedAt, ...alertData }) => (
+            alertData.outboxId
+                ? {
+                    updateOne: {
+                        filter: { outboxId: alertData.outboxId },
+                        update: { $setOnInsert: alertData },
+                        upsert: true
+                    }
+                }
+                : { insertOne: { document: alertData } }
+        ));
+        const result = await Alert.bulkWrite(operations, { ordered: false });
+        
+        // Only alerts stored for the first time are broadcast
+        const newIds = [
+            ...Object.values(result.upsertedIds || {}),
+            ...Object.values(result.insertedIds || {})
+        ];
+        const created = await Alert.find({ _id: { $in: newIds } });
+        
+        const io = req.app.get('io');
+        created.forEach(alert => emitMarketAlert(io, alert));
         
         res.json({
             success: true,
-            message: 'Alert broadcasted',
-            data: alert
+            message: 'Alerts broadcasted',
+            received: alerts.length,
+            created: created.length
         });
     } catch (error) {
         res.status(500).json({
@@ -44,6 +44,12 @@ const AlertSchema = new mongoose.Schema({
         source: String,
         confidence: Number,
         actionable: Boolean
+    },
+    // Id of the Python outbox entry, makes redelivered batches idempotent
+    outboxId: {
+        type: String,
+        unique: true,
+        sparse: true
     }
 }, {
     timestamps: true
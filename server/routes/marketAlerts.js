@@ -5,6 +5,7 @@ import {
     createAlert,
     markAsRead,
     broadcastAlert,
+    broadcastAlerts,
     getAlertStats
 } from '../controllers/marketAlertController.js';
 
@@ -14,6 +15,7 @@ router.get('/', protect, getAlerts);
 router.get('/stats', protect, getAlertStats);
 router.post('/', createAlert); // Admin/Python
 router.post('/broadcast', broadcastAlert); // Python
+router.post('/broadcast/batch', broadcastAlerts); // Python outbox dispatcher
 router.put('/:id/read', protect, markAsRead);
 
 export default router;